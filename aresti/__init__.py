@@ -4,7 +4,13 @@ from .json import JsonYhteys
 from .rajapinta import Rajapinta
 from .rest import RestYhteys
 from .sanoma import RestKentta, RestValintakentta, RestSanoma
-from .sivutus import SivutettuYhteys
+from .sivutus import (
+  AvainSivutus,
+  LinkkiSivutus,
+  SivunumeroSivutus,
+  SivutettuYhteys,
+  Sivutus,
+)
 from .tyokalut import (
   ei_syotetty,
   mittaa,
@@ -13,6 +19,16 @@ from .tyokalut import (
   sisaluokka,
   Valinnainen,
 )
+from .mittaus import Mittaus
+from .rajoitin import Nopeusrajoitin
+from .tarkistuspiste import (
+  MuistiTarkistuspisteet,
+  SqliteTarkistuspisteet,
+  Tarkistuspisteet,
+  TiedostoTarkistuspisteet,
+)
+from .toisto import Toistokaytanto
+from .valimuisti import HttpValimuisti
 from .yhteys import AsynkroninenYhteys
 
 
@@ -1,15 +1,35 @@
+import codecs
 from dataclasses import dataclass
+import functools
+import io
 import json
-from typing import Any, Sequence
+import re
+from typing import (
+  Any,
+  AsyncIterable,
+  AsyncIterator,
+  Callable,
+  Iterable,
+  Iterator,
+  Optional,
+  Sequence,
+  Union,
+)
 
 import aiohttp
 
+from .sanoma import RestKentta
 from .yhteys import AsynkroninenYhteys
 
 
 @dataclass(kw_only=True)
 class JsonYhteys(AsynkroninenYhteys):
-  ''' JSON-muotoista dataa lähettävä ja vastaanottava yhteys. '''
+  '''
+  JSON-muotoista dataa lähettävä ja vastaanottava yhteys.
+
+  Mikäli `virtautus` on asetettu, `tuota_data` tulkitsee saapuvan
+  JSON-taulukon alkio kerrallaan sitä mukaa, kuin dataa saapuu.
+  '''
 
   # Sanoman otsakkeina annettavat sisältötyypit.
   accept: str = 'application/json'
@@ -21,23 +41,386 @@ class JsonYhteys(AsynkroninenYhteys):
     'text/json',
   )
 
+  # JSON-muunnoksiin käytettävä kirjasto: `json`, `orjson`, `ujson`
+  # tai `msgspec`. Mikäli kirjastoa ei ole asennettu, käytetään
+  # vakiokirjaston `json`-toteutusta.
+  # Huomaa, että virtaava tulkinta (`virtautus`) käyttää aina
+  # vakiokirjaston toteutusta.
+  json_kirjasto: str = 'json'
+
+  def _json_sisalto(self, sanoma: aiohttp.ClientResponse) -> bool:
+    return sanoma.content_type.split('+')[0].split(';')[0] \
+    in self.json_sisalto
+    # def _json_sisalto -> bool
+
   async def tulkitse_data(
     self,
     sanoma: aiohttp.ClientResponse
   ) -> Any:
     ''' Tulkitse data JSON-muodossa. '''
-    if sanoma.content_type.split('+')[0].split(';')[0] \
-    not in self.json_sisalto:
+    if not self._json_sisalto(sanoma):
       return await super().tulkitse_data(sanoma)
-    return await sanoma.json()
+    data = await sanoma.read()
+    if not data or data.isspace():
+      return None
+    return _json_kirjasto(self.json_kirjasto)[1](data)
     # async def tulkitse_data
 
   async def muodosta_data(
     self,
     data: Any
-  ) -> bytes:
-    ''' Muodosta JSON-data sisällön mukaan. '''
-    return json.dumps(data).encode()
-    # async def _tulkitse_data
+  ) -> Union[bytes, AsyncIterable[bytes]]:
+    '''
+    Muodosta JSON-data sisällön mukaan.
+
+    Iteraattori ja riittävän pitkä luettelo (ks. `lohkoittain_alkaen`)
+    muodostetaan JSON-taulukoksi alkio kerrallaan ja lähetetään
+    lohkoittain; `RestSanoma`-alkiot muunnetaan tällöin `lahteva`-
+    metodilla.
+    '''
+    if isinstance(data, (AsyncIterable, io.IOBase)):
+      return await super().muodosta_data(data)
+    elif self._lahetetaan_lohkoittain(data):
+      return self._lohkoittain(self._json_osat(data))
+    return _json_kirjasto(self.json_kirjasto)[0](data)
+    # async def muodosta_data
+
+  def _json_osat(self, alkiot: Iterable) -> Iterator[bytes]:
+    ''' Muodosta JSON-taulukko alkio kerrallaan. '''
+    muodosta = _json_kirjasto(self.json_kirjasto)[0]
+    erotin = b'['
+    for alkio in alkiot:
+      yield erotin
+      yield muodosta(
+        alkio.lahteva() if isinstance(alkio, RestKentta) else alkio
+      )
+      erotin = b','
+    yield b']' if erotin == b',' else b'[]'
+    # def _json_osat -> Iterator[bytes]
+
+  async def tuota_data(
+    self,
+    polku: str,
+    *,
+    avain: Optional[str] = None,
+    muut: Optional[dict] = None,
+    suhteellinen: bool = True,
+    headers: Optional[dict[str, str]] = None,
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Tuota JSON-taulukon alkiot virtaavasti, mikäli `virtautus`
+    on asetettu (ks. `AsynkroninenYhteys.virtautus`).
+
+    Sanoma luetaan lohkoittain, eikä koko dokumenttia
+    pidetä muistissa kerralla.
+
+    Keskeytynyt pyyntö yritetään tarvittaessa uudelleen `toisto`-
+    käytännön mukaisesti; jo tuotetut alkiot ohitetaan tällöin.
+    '''
+    if self._virtaava_haku():
+      async for era in self._tuota_toistaen(functools.partial(
+        self._tuota_virtaavasti,
+        polku,
+        avain=avain,
+        muut=muut,
+        suhteellinen=suhteellinen,
+        headers=headers,
+        **kwargs
+      )):
+        for alkio in era:
+          yield alkio
+      return
+    async for alkio in super().tuota_data(
+      polku,
+      avain=avain,
+      muut=muut,
+      suhteellinen=suhteellinen,
+      headers=headers,
+      **kwargs
+    ):
+      yield alkio
+    # async def tuota_data
+
+  async def _tuota_virtaavasti(
+    self,
+    polku: str,
+    *,
+    avain: Optional[str],
+    muut: Optional[dict],
+    suhteellinen: bool,
+    headers: Optional[dict[str, str]],
+    **kwargs
+  ) -> AsyncIterable[list]:
+    try:
+      async with self._pyynto as vapauta, self._istunto.get(
+        self.palvelin + polku if suhteellinen else polku,
+        headers=await self._pyynnon_otsakkeet(
+          metodi='GET',
+          polku=polku,
+          **headers or {},
+        ),
+        **kwargs,
+      ) as sanoma:
+        # Otsakkeet on luettu: vapautetaan rajoittimen paikka, sillä
+        # kutsuja voi tehdä uusia pyyntöjä tietueita käsitellessään.
+        vapauta()
+        if sanoma.status >= 400 or not self._json_sisalto(sanoma):
+          yield list(self._poimi_alkiot(
+            await self._tulkitse_sanoma('GET', sanoma),
+            avain=avain,
+            muut=muut,
+          ))
+          return
+        async for era in _JsonVirta(
+          sanoma.content.iter_any(),
+          merkisto=sanoma.charset or 'utf-8',
+        ).tuota_erat(avain=avain, muut=muut):
+          yield era
+        # async with self._istunto.get
+    except aiohttp.ClientError as exc:
+      raise self.Poikkeus from exc
+    # async def _tuota_virtaavasti
 
   # class JsonYhteys
+
+
+@functools.cache
+def _json_kirjasto(nimi: str) -> tuple[
+  Callable[[Any], bytes],
+  Callable[[bytes], Any],
+]:
+  '''
+  Poimi nimetyn JSON-kirjaston muunnosrutiinit: tavuiksi ja tavuista.
+
+  Kirjaston puuttuessa palautetaan vakiokirjaston mukaiset rutiinit.
+  '''
+  # pylint: disable=import-outside-toplevel
+  try:
+    if nimi == 'orjson':
+      import orjson
+      return orjson.dumps, orjson.loads
+    elif nimi == 'ujson':
+      import ujson
+      return (lambda data: ujson.dumps(data).encode()), ujson.loads
+    elif nimi == 'msgspec':
+      import msgspec.json
+      return msgspec.json.encode, msgspec.json.decode
+    elif nimi != 'json':
+      raise ValueError(f'Tuntematon JSON-kirjasto: {nimi!r}')
+  except ImportError:
+    pass
+  return (lambda data: json.dumps(data).encode()), json.loads
+  # def _json_kirjasto
+
+
+class _JsonVirta:
+  '''
+  Lohkoittain saapuvan JSON-dokumentin tulkinta.
+
+  Ylimmän tason taulukon (tai kuvauksen sisältämän taulukon) alkiot
+  tulkitaan `json.JSONDecoder.raw_decode`-metodilla ja tuotetaan
+  erinä: kustakin saapuneesta lohkosta kaikki valmiit alkiot kerralla.
+  Puskurissa pidetään vain tulkitsematon osa dokumentista, eikä jo
+  tulkittuja alkioita tulkita uudelleen.
+  '''
+
+  _ei_tyhja = re.compile(r'[^ \t\n\r]')
+  _tyhja = re.compile(r'[ \t\n\r]*')
+  _erotin = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+  _luvun_merkit = frozenset('0123456789+-.eE')
+
+  def __init__(self, lohkot: AsyncIterable[bytes], *, merkisto: str):
+    self._lohkot: AsyncIterator[bytes] = aiter(lohkot)
+    self._purkaja = codecs.getincrementaldecoder(merkisto)()
+    self._tulkki = json.JSONDecoder()
+    self._puskuri = ''
+    self._kohta = 0
+    self._loppu = False
+
+  async def _lue(self) -> bool:
+    ''' Lue seuraava lohko puskuriin; palauta epätosi datan loputtua. '''
+    if self._loppu:
+      return False
+    try:
+      lohko = await anext(self._lohkot)
+    except StopAsyncIteration:
+      self._loppu = True
+      lisays = self._purkaja.decode(b'', final=True)
+    else:
+      lisays = self._purkaja.decode(lohko)
+    self._puskuri = self._puskuri[self._kohta:] + lisays
+    self._kohta = 0
+    return True
+    # async def _lue -> bool
+
+  async def _merkki(self) -> str:
+    '''
+    Ohita tyhjä tila ja palauta seuraava merkki sitä kuluttamatta.
+
+    Palautetaan tyhjä merkkijono datan loputtua.
+    '''
+    while (
+      osuma := self._ei_tyhja.search(self._puskuri, self._kohta)
+    ) is None:
+      self._kohta = len(self._puskuri)
+      if not await self._lue():
+        return ''
+    self._kohta = osuma.start()
+    return osuma.group()
+    # async def _merkki -> str
+
+  async def _kuluta(self, *odotettu: str) -> str:
+    ''' Kuluta seuraava merkki, jonka on oltava jokin odotetuista. '''
+    if (merkki := await self._merkki()) not in odotettu:
+      raise json.JSONDecodeError(
+        f'Odotettiin {" / ".join(odotettu)}',
+        self._puskuri,
+        self._kohta,
+      )
+    self._kohta += 1
+    return merkki
+    # async def _kuluta -> str
+
+  async def _arvo(self) -> Any:
+    '''
+    Tulkitse seuraava kokonainen JSON-arvo.
+
+    Arvo hyväksytään vasta, kun sen perässä on jokin muu kuin luvun
+    merkki (tai data on loppunut), jottei kesken katkennutta lukua
+    tulkita väärin.
+    Epäonnistunut tulkinta yritetään uudelleen vasta, kun puskurin
+    tulkitsematon osa on kasvanut kaksinkertaiseksi.
+    '''
+    await self._merkki()
+    tarve = 0
+    while True:
+      if self._loppu or len(self._puskuri) - self._kohta >= tarve:
+        try:
+          arvo, loppu = self._tulkki.raw_decode(self._puskuri, self._kohta)
+        except json.JSONDecodeError:
+          if self._loppu:
+            raise
+        else:
+          if self._loppu or (
+            loppu < len(self._puskuri)
+            and self._puskuri[loppu] not in self._luvun_merkit
+          ):
+            self._kohta = loppu
+            return arvo
+        tarve = 2 * (len(self._puskuri) - self._kohta)
+        # if self._loppu or len
+      await self._lue()
+      # while True
+    # async def _arvo -> Any
+
+  def _valmiit(self) -> tuple[list, bool]:
+    '''
+    Tulkitse puskurissa valmiina olevat taulukon alkiot.
+
+    Alkio hyväksytään vasta, kun sen perässä on erotin (`,` tai `]`),
+    jottei kesken katkennutta lukua tulkita väärin. Palautetaan
+    alkiot sekä tieto siitä, päättyikö taulukko.
+    '''
+    alkiot = []
+    puskuri = self._puskuri
+    # Erottimen perässä oleva tyhjä tila voi jatkua seuraavassa lohkossa.
+    kohta = self._tyhja.match(puskuri, self._kohta).end()
+    tulkitse, erotin = self._tulkki.raw_decode, self._erotin.match
+    paattyi = False
+    while True:
+      try:
+        arvo, loppu = tulkitse(puskuri, kohta)
+      except json.JSONDecodeError:
+        break
+      if (osuma := erotin(puskuri, loppu)) is None:
+        break
+      alkiot.append(arvo)
+      kohta = osuma.end()
+      if osuma.group(1) == ']':
+        paattyi = True
+        break
+      # while True
+    self._kohta = kohta
+    return alkiot, paattyi
+    # def _valmiit -> tuple[list, bool]
+
+  async def _tuota_taulukko(self) -> AsyncIterable[list]:
+    '''
+    Tuota alkava taulukko erinä (luetteloina) sitä mukaa, kuin
+    alkiot saapuvat.
+
+    Keskeneräisen alkion tulkintaa yritetään uudelleen vasta, kun
+    puskurin tulkitsematon osa on kasvanut kaksinkertaiseksi.
+    '''
+    await self._kuluta('[')
+    if await self._merkki() == ']':
+      self._kohta += 1
+      return
+    tarve = 0
+    while True:
+      if self._loppu or len(self._puskuri) - self._kohta >= tarve:
+        alkiot, paattyi = self._valmiit()
+        if alkiot:
+          yield alkiot
+        if paattyi:
+          return
+        tarve = 2 * (len(self._puskuri) - self._kohta)
+      if not await self._lue():
+        break
+      # while True
+    # Data loppui kesken taulukon: nostetaan tulkinnan virhe.
+    _, loppu = self._tulkki.raw_decode(self._puskuri, self._kohta)
+    raise json.JSONDecodeError('Odotettiin , / ]', self._puskuri, loppu)
+    # async def _tuota_taulukko
+
+  async def tuota_erat(
+    self,
+    *,
+    avain: Optional[str],
+    muut: Optional[dict],
+  ) -> AsyncIterable[list]:
+    '''
+    Tuota `AsynkroninenYhteys.tuota_data`-metodin mukaiset alkiot
+    erinä (luetteloina).
+
+    Mikäli dokumentti ei ole odotetun muotoinen, se tulkitaan
+    kokonaisuudessaan ja alkiot poimitaan kuten kantaluokassa.
+    '''
+    merkki = await self._merkki()
+    if avain is None and merkki == '[':
+      async for era in self._tuota_taulukko():
+        yield era
+      return
+    elif avain is None or merkki != '{':
+      yield list(AsynkroninenYhteys._poimi_alkiot(
+        await self._arvo(),
+        avain=avain,
+        muut=muut,
+      ))
+      return
+
+    await self._kuluta('{')
+    if await self._merkki() == '}':
+      return
+    while True:
+      nimi = await self._arvo()
+      await self._kuluta(':')
+      if nimi == avain and await self._merkki() == '[':
+        alkioita = 0
+        async for era in self._tuota_taulukko():
+          alkioita += len(era)
+          yield era
+        arvo = alkioita
+      elif nimi == avain:
+        arvo = len(await self._arvo() or ())
+      else:
+        arvo = await self._arvo()
+      if muut is not None:
+        muut[nimi] = arvo
+      if await self._kuluta(',', '}') == '}':
+        break
+      # while True
+    # async def tuota_erat
+
+  # class _JsonVirta
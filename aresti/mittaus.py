@@ -0,0 +1,358 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import math
+import re
+from time import perf_counter_ns
+from typing import Any, AsyncIterable, Callable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+# Pyyntöjen mittauksiin liitettävät tiedot (`polku`, `yritys`, `sivu`)
+# sekä käynnissä olevan pyynnön mittaus.
+_konteksti: ContextVar[dict[str, Any]] = ContextVar(
+  'aresti_mittauskonteksti', default={}
+)
+_tapahtuma: ContextVar[Optional['Pyyntotapahtuma']] = ContextVar(
+  'aresti_pyyntotapahtuma', default=None
+)
+
+
+@contextmanager
+def mittauskonteksti(**tiedot):
+  '''
+  Liitä annetut tiedot kontekstin sisällä tehtävien pyyntöjen mittauksiin.
+
+  Tunnetut tiedot ovat `polku` (osoitteen malli, esim. `/kohde/%(pk)s/`),
+  `yritys` (uudelleenyritysten määrä) ja `sivu` (sivutetun haun sivu).
+  '''
+  vanha = _konteksti.get()
+  _konteksti.set({**vanha, **tiedot})
+  try:
+    yield
+  finally:
+    _konteksti.set(vanha)
+  # def mittauskonteksti
+
+
+async def tuota_kontekstissa(
+  tuotto: AsyncIterable,
+  **tiedot
+) -> AsyncIterable:
+  '''
+  Tuota annetun asynkronisen iteraattorin alkiot siten, että
+  `mittauskonteksti(**tiedot)` on voimassa vain alkioita noudettaessa,
+  ei kutsujan käsitellessä niitä.
+  '''
+  tuotto = aiter(tuotto)
+  while True:
+    with mittauskonteksti(**tiedot):
+      try:
+        alkio = await anext(tuotto)
+      except StopAsyncIteration:
+        return
+    yield alkio
+  # async def tuota_kontekstissa
+
+
+def merkitse_tulkittu():
+  ''' Merkitse käynnissä olevan pyynnön vastaus tulkituksi. '''
+  if (tapahtuma := _tapahtuma.get()) is not None:
+    tapahtuma.tulkittu = perf_counter_ns()
+  # def merkitse_tulkittu
+
+
+@dataclass(kw_only=True)
+class Pyyntotapahtuma:
+  '''
+  Yksittäisen HTTP-pyynnön mittaustulos.
+
+  Vaiheiden kestot (`vaiheet`) ovat nanosekunteja:
+  - `jono`: pyynnön odotus ennen lähetystä (esim. `rajoitin`);
+  - `allas`: odotus vapaata yhteyttä yhteysaltaasta;
+  - `dns`: nimipalvelukysely;
+  - `yhdistaminen`: TCP- ja TLS-yhteyden muodostus (sis. `dns`);
+  - `ensimmainen_tavu`: otsakkeiden lähetyksestä vastauksen otsakkeisiin;
+  - `lataus`: vastauksen sisällön luku;
+  - `tulkinta`: vastauksen sisällön tulkinta;
+  - `yhteensa`: koko pyyntö.
+  '''
+
+  metodi: str = ''
+  osoite: str = ''
+  polku: str = ''
+  status: int = 0
+  lahetetty: int = 0
+  vastaanotettu: int = 0
+  yritys: int = 0
+  sivu: Optional[int] = None
+  uudelleenkaytetty: bool = False
+  virhe: Optional[str] = None
+  vaiheet: dict[str, int] = field(default_factory=dict)
+
+  # Vaiheiden ajanhetket (`perf_counter_ns`).
+  avattu: int = field(default=0, repr=False)
+  otsakkeet_saatu: int = field(default=0, repr=False)
+  luettu: int = field(default=0, repr=False)
+  tulkittu: int = field(default=0, repr=False)
+
+  def _vaihe(self, nimi: str, alku: int, loppu: int):
+    if alku and loppu >= alku:
+      self.vaiheet[nimi] = self.vaiheet.get(nimi, 0) + loppu - alku
+    # def _vaihe
+
+  # class Pyyntotapahtuma
+
+
+@dataclass(kw_only=True)
+class Histogrammi:
+  '''
+  Muistissa pidettävä, logaritmisesti lokeroitu histogrammi.
+
+  Prosenttipisteet ovat likimääräisiä: suhteellinen virhe on enintään
+  noin `2 ** (1 / tarkkuus) - 1` (oletuksena noin 4 %).
+  '''
+
+  # Lokeroiden määrä arvon kaksinkertaistumista kohti.
+  tarkkuus: int = 16
+
+  maara: int = 0
+  summa: int = 0
+  pienin: int = 0
+  suurin: int = 0
+  _lokerot: dict[int, int] = field(default_factory=dict, repr=False)
+
+  def lisaa(self, arvo: int):
+    lokero = int(math.log2(arvo) * self.tarkkuus) if arvo > 0 else -1
+    self._lokerot[lokero] = self._lokerot.get(lokero, 0) + 1
+    if not self.maara or arvo < self.pienin:
+      self.pienin = arvo
+    if arvo > self.suurin:
+      self.suurin = arvo
+    self.maara += 1
+    self.summa += arvo
+    # def lisaa
+
+  def prosenttipiste(self, osuus: float) -> float:
+    ''' Likimääräinen prosenttipiste, esim. `osuus=0.95`. '''
+    if not self.maara:
+      return 0.0
+    jaljella = osuus * self.maara
+    for lokero in sorted(self._lokerot):
+      jaljella -= self._lokerot[lokero]
+      if jaljella <= 0:
+        break
+    if lokero < 0:
+      return 0.0
+    return min(
+      max(2 ** ((lokero + 0.5) / self.tarkkuus), self.pienin),
+      self.suurin,
+    )
+    # def prosenttipiste -> float
+
+  def vie(self, *, yksikko: float = 1e6) -> dict[str, float]:
+    ''' Tiivistelmä annetussa yksikössä (oletuksena ns -> ms). '''
+    return {
+      'maara': self.maara,
+      'keskiarvo': self.summa / self.maara / yksikko if self.maara else 0.0,
+      'p50': self.prosenttipiste(0.50) / yksikko,
+      'p95': self.prosenttipiste(0.95) / yksikko,
+      'p99': self.prosenttipiste(0.99) / yksikko,
+      'suurin': self.suurin / yksikko,
+    }
+    # def vie -> dict[str, float]
+
+  # class Histogrammi
+
+
+@dataclass(kw_only=True)
+class Mittaus:
+  '''
+  HTTP-pyyntöjen mittaus `aiohttp.TraceConfig`-rajapinnan avulla.
+
+  Kunkin pyynnön tulos (`Pyyntotapahtuma`) välitetään `kuuntelija`-
+  rutiinille ja kirjataan päätepisteen (metodi ja polun malli)
+  mukaisiin histogrammeihin, jotka voidaan viedä `vie`-metodilla.
+
+  Polun malli on joko `mittauskonteksti(polku=...)`-kutsulla annettu
+  tai osoitteen polku, jossa numeeriset ja UUID-muotoiset osat on
+  korvattu `{pk}`-merkinnällä.
+
+  Käyttö seuraavasti:
+  >>> mittaus = Mittaus(kuuntelija=print)
+  >>> async with JsonYhteys(
+  ...   palvelin='https://testi.fi',
+  ...   mittaus=mittaus,
+  ... ) as yhteys:
+  ...   data = await yhteys.nouda_data('/abc/def')
+  >>> mittaus.vie(tyhjenna=True)
+  {'GET /abc/def': {'yhteensa': {'maara': 1, 'p50': ...}, ...}}
+  '''
+
+  # Kunkin päättyneen pyynnön tiedot vastaanottava rutiini.
+  kuuntelija: Optional[Callable[[Pyyntotapahtuma], Any]] = None
+
+  # Kirjataanko vaiheiden kestot histogrammeihin?
+  histogrammit: bool = True
+
+  _histogrammit: dict[str, dict[str, Histogrammi]] = field(
+    default_factory=dict,
+    init=False,
+    repr=False,
+  )
+
+  _polun_tunniste = re.compile(
+    r'(?<=/)(?:\d+|[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12})'
+    r'(?=/|$)'
+  )
+
+  @contextmanager
+  def pyynto(self):
+    ''' Mittaa kontekstin sisällä tehtävä pyyntö. '''
+    konteksti = _konteksti.get()
+    tapahtuma = Pyyntotapahtuma(
+      polku=konteksti.get('polku', ''),
+      yritys=konteksti.get('yritys', 0),
+      sivu=konteksti.get('sivu'),
+      avattu=perf_counter_ns(),
+    )
+    vanha = _tapahtuma.get()
+    _tapahtuma.set(tapahtuma)
+    try:
+      yield tapahtuma
+    except BaseException as exc:
+      tapahtuma.virhe = type(exc).__name__
+      raise
+    finally:
+      _tapahtuma.set(vanha)
+      self.kirjaa(tapahtuma, perf_counter_ns())
+    # def pyynto
+
+  def kirjaa(self, tapahtuma: Pyyntotapahtuma, suljettu: int):
+    ''' Viimeistele tapahtuma ja kirjaa se. '''
+    # pylint: disable=protected-access
+    tapahtuma._vaihe(
+      'lataus', tapahtuma.otsakkeet_saatu, tapahtuma.luettu
+    )
+    tapahtuma._vaihe(
+      'tulkinta',
+      max(tapahtuma.luettu, tapahtuma.otsakkeet_saatu),
+      tapahtuma.tulkittu,
+    )
+    tapahtuma._vaihe('yhteensa', tapahtuma.avattu, suljettu)
+    if not tapahtuma.polku:
+      tapahtuma.polku = self._polun_tunniste.sub(
+        '{pk}', urlsplit(tapahtuma.osoite).path
+      )
+    if self.histogrammit:
+      vaiheet = self._histogrammit.setdefault(
+        f'{tapahtuma.metodi} {tapahtuma.polku}', {}
+      )
+      for vaihe, kesto in tapahtuma.vaiheet.items():
+        try:
+          histogrammi = vaiheet[vaihe]
+        except KeyError:
+          histogrammi = vaiheet[vaihe] = Histogrammi()
+        histogrammi.lisaa(kesto)
+    if self.kuuntelija is not None:
+      self.kuuntelija(tapahtuma)
+    # def kirjaa
+
+  def vie(
+    self,
+    *,
+    tyhjenna: bool = False,
+  ) -> dict[str, dict[str, dict[str, float]]]:
+    '''
+    Vie päätepisteittäiset tiivistelmät vaiheiden kestoista
+    (millisekunteina) ja tyhjennä histogrammit tarvittaessa.
+    '''
+    vienti = {
+      paatepiste: {
+        vaihe: histogrammi.vie()
+        for vaihe, histogrammi in vaiheet.items()
+      }
+      for paatepiste, vaiheet in self._histogrammit.items()
+    }
+    if tyhjenna:
+      self._histogrammit.clear()
+    return vienti
+    # def vie -> dict
+
+  def jaljitys(self) -> aiohttp.TraceConfig:
+    ''' Istuntoon liitettävä, pyyntöjen vaiheet kirjaava jäljitys. '''
+    # pylint: disable=unused-argument, protected-access
+    jaljitys = aiohttp.TraceConfig()
+
+    def _kirjaava(kasittelija):
+      async def _kirjaa(istunto, konteksti, parametrit):
+        if (tapahtuma := _tapahtuma.get()) is not None:
+          kasittelija(tapahtuma, konteksti, parametrit, perf_counter_ns())
+      return _kirjaa
+      # def _kirjaava
+
+    def _alkaa(tapahtuma, konteksti, parametrit, nyt):
+      if not tapahtuma.metodi:
+        tapahtuma._vaihe('jono', tapahtuma.avattu, nyt)
+      tapahtuma.metodi = parametrit.method
+      tapahtuma.osoite = str(parametrit.url)
+      konteksti.alku = nyt
+
+    def _vaiheen_alku(nimi):
+      def _alku(tapahtuma, konteksti, parametrit, nyt):
+        setattr(konteksti, nimi, nyt)
+      return _alku
+
+    def _vaiheen_loppu(nimi):
+      def _loppu(tapahtuma, konteksti, parametrit, nyt):
+        tapahtuma._vaihe(nimi, getattr(konteksti, nimi, 0), nyt)
+      return _loppu
+
+    def _uudelleenkaytto(tapahtuma, konteksti, parametrit, nyt):
+      tapahtuma.uudelleenkaytetty = True
+
+    def _lohko_lahetetty(tapahtuma, konteksti, parametrit, nyt):
+      tapahtuma.lahetetty += len(parametrit.chunk)
+
+    def _valmis(tapahtuma, konteksti, parametrit, nyt):
+      tapahtuma._vaihe(
+        'ensimmainen_tavu',
+        getattr(konteksti, 'lahetys', 0) or konteksti.alku,
+        nyt,
+      )
+      tapahtuma.otsakkeet_saatu = nyt
+      tapahtuma.luettu = 0
+      tapahtuma.status = parametrit.response.status
+      tapahtuma.vastaanotettu = parametrit.response.content_length or 0
+
+    def _lohko_saatu(tapahtuma, konteksti, parametrit, nyt):
+      if not tapahtuma.luettu:
+        tapahtuma.vastaanotettu = 0
+      tapahtuma.vastaanotettu += len(parametrit.chunk)
+      tapahtuma.luettu = nyt
+
+    def _poikkeus(tapahtuma, konteksti, parametrit, nyt):
+      tapahtuma.virhe = type(parametrit.exception).__name__
+
+    for signaali, kasittelija in (
+      (jaljitys.on_request_start, _alkaa),
+      (jaljitys.on_connection_queued_start, _vaiheen_alku('allas')),
+      (jaljitys.on_connection_queued_end, _vaiheen_loppu('allas')),
+      (jaljitys.on_connection_create_start, _vaiheen_alku('yhdistaminen')),
+      (jaljitys.on_connection_create_end, _vaiheen_loppu('yhdistaminen')),
+      (jaljitys.on_dns_resolvehost_start, _vaiheen_alku('dns')),
+      (jaljitys.on_dns_resolvehost_end, _vaiheen_loppu('dns')),
+      (jaljitys.on_connection_reuseconn, _uudelleenkaytto),
+      (jaljitys.on_request_headers_sent, _vaiheen_alku('lahetys')),
+      (jaljitys.on_request_chunk_sent, _lohko_lahetetty),
+      (jaljitys.on_request_end, _valmis),
+      (jaljitys.on_response_chunk_received, _lohko_saatu),
+      (jaljitys.on_request_exception, _poikkeus),
+    ):
+      signaali.append(_kirjaava(kasittelija))
+    return jaljitys
+    # def jaljitys -> aiohttp.TraceConfig
+
+  # class Mittaus
@@ -1,12 +1,31 @@
-from collections.abc import Mapping
+import asyncio
+from collections.abc import AsyncIterable, Mapping, MutableMapping
 from dataclasses import dataclass
-from functools import cached_property
-from typing import Any, Iterable, Optional, Union
+from datetime import date, datetime
+from functools import cached_property, partial
+import inspect
+from typing import (
+  Any,
+  Awaitable,
+  Callable,
+  Iterable,
+  Optional,
+  Protocol,
+  Union,
+)
 
 from .hahmo import Hahmo
+from ..mittaus import mittauskonteksti
 from ..yhteys import AsynkroninenYhteys
-from ..sanoma import RestSanoma
-from ..tyokalut import ei_syotetty, luokkamaare, Valinnainen
+from ..sanoma import RestKentta, RestSanoma
+from ..tarkistuspiste import haun_avain, Tarkistuspisteet
+from ..tyokalut import (
+  ei_syotetty,
+  luokkamaare,
+  suorita_rinnakkain,
+  Valinnainen,
+)
+from ..valimuisti import Tietuevarasto
 
 
 class RajapintaMeta(type):
@@ -48,6 +67,25 @@ class RajapintaMeta(type):
   # class RajapintaMeta
 
 
+class JoukkotoiminnonEdistyminen(Protocol):
+  '''
+  Asynkroninen rutiini, jolle ilmoitetaan joukko-operaation
+  (esim. `Rajapinta.muuta_joukko`) edistymisestä kunkin pyynnön jälkeen.
+  '''
+
+  async def __call__(
+    self,
+    *,
+    polku: str,
+    valmiita: int,
+    virheita: int,
+    yhteensa: int,
+  ) -> None:
+    ...
+
+  # class JoukkotoiminnonEdistyminen
+
+
 @dataclass
 class Rajapinta(metaclass=RajapintaMeta):
 
@@ -91,8 +129,75 @@ class Rajapinta(metaclass=RajapintaMeta):
     # Primääriavain tietueen kentissä,
     pk: str = 'id'
 
+    # Tarkistetaanko joukkona saapuvien tietueiden tyyppi?
+    tarkista_saapuvat: bool = True
+
+    # Joukko-operaatioiden rinnakkaisten pyyntöjen enimmäismäärä.
+    rinnakkaiset_pyynnot: int = 10
+
+    # Mikäli rajapinta sallii usean tietueen lisäämisen kerralla
+    # (POST-pyyntö luettelona), yhdessä pyynnössä lähetettävien
+    # tietueiden enimmäismäärä.
+    joukkolisays: Optional[int] = None
+
+    # Tulkittujen tietueiden rajapintakohtaisen tunnistekartan
+    # (ks. `varasto`) enimmäiskoko (None = ei käytössä) sekä tietueen
+    # säilytysaika sekunteina (None = rajoittamaton).
+    varasto_koko: Optional[int] = None
+    varasto_kesto: Optional[float] = None
+
+    # Usean tietueen haussa (`nouda_monta`) käytettävä suodatusparametri,
+    # jolle annetaan pilkuin erotellut primääriavaimet (esim. `id__in`;
+    # None = tietueet noudetaan erikseen), sekä parametrin arvon
+    # enimmäispituus merkkeinä. Parametri lähetetään sellaisenaan
+    # `Suodatus`-muunnoksen ohi.
+    pk_joukko_parametri: Optional[str] = None
+    pk_joukko_pituus: int = 1500
+
+    # Aika sekunteina, jonka ajalta `nouda_kootusti`-haut kootaan yhteen
+    # (0 = saman tapahtumasilmukan kierroksen ajalta).
+    pk_kokoamisaika: float = 0.0
+
+    # Inkrementaalisessa synkronoinnissa (`synkronoi`) käytettävä
+    # tietueen kenttä, jonka suurin arvo tallennetaan tarkistuspisteeksi
+    # (muutosaika tai kasvava muutososoitin), sekä suodatusparametri,
+    # jolla noudetaan tätä myöhemmin muuttuneet tietueet
+    # (esim. `muokattu` ja `muokattu__gte`).
+    muutos_kentta: Optional[str] = None
+    muutos_parametri: Optional[str] = None
+
     # class Meta
 
+  def _meta(self, nimi: str) -> Any:
+    '''
+    Palauta `Meta`-asetus. Mikäli rajapinnan `Meta` ei periydy
+    `Rajapinta.Meta`-luokasta, käytetään sen mukaista oletusarvoa.
+    '''
+    return getattr(self.Meta, nimi, getattr(Rajapinta.Meta, nimi))
+    # def _meta -> Any
+
+  @cached_property
+  def varasto(self) -> Optional[Tietuevarasto]:
+    '''
+    Noudettujen, lisättyjen ja muutettujen tietueiden tunnistekartta
+    primääriavaimen mukaan, mikäli `Meta.varasto_koko` on annettu.
+
+    Yksittäisen tietueen haku (`nouda(pk=...)`) palautetaan
+    varastosta, mikäli tietue on siellä tuoreena. Muutettu ja tuhottu
+    tietue poistetaan varastosta pyynnön päätyttyä; muutospyynnön
+    vastausta ei tallenneta.
+
+    Huomaa, että ennen muutosta alkanut, sen jälkeen päättyvä haku
+    tallentaa varastoon muutosta edeltävän tietueen.
+    '''
+    if self._meta('varasto_koko') is None:
+      return None
+    return Tietuevarasto(
+      koko=self._meta('varasto_koko'),
+      kesto=self._meta('varasto_kesto'),
+    )
+    # def varasto -> Optional[Tietuevarasto]
+
   def __aiter__(self):
     ''' Tuota kaikki tulokset asynkronisesti. '''
     return aiter(self.Hahmo(rajapinta=self))
@@ -122,9 +227,39 @@ class Rajapinta(metaclass=RajapintaMeta):
       raise TypeError(
         f'Noudettu data ei ole kuvaus: {type(saapuva)!r}!'
       )
-    return self.Tuloste.saapuva(saapuva)
+    return self._varastoi(self.Tuloste.saapuva(saapuva))
     # def _tulkitse_saapuva
 
+  def _tulkitse_saapuvat(self, saapuvat: Iterable[Mapping]) -> list[Tuloste]:
+    '''
+    Tulkitse saapuvan datan sisältämät sanomat yhtenä joukkona.
+
+    Saapuvien kuvausten tyyppi tarkistetaan vain, mikäli
+    `Meta.tarkista_saapuvat` on tosi.
+    '''
+    if type(self)._tulkitse_saapuva is not Rajapinta._tulkitse_saapuva:
+      # Aliluokka on mukauttanut yksittäisen sanoman tulkinnan.
+      return [self._tulkitse_saapuva(saapuva) for saapuva in saapuvat]
+    tulosteet = self.Tuloste.saapuva_joukko(
+      saapuvat,
+      tarkista=self._meta('tarkista_saapuvat'),
+    )
+    if self.varasto is not None:
+      for tuloste in tulosteet:
+        self._varastoi(tuloste)
+    return tulosteet
+    # def _tulkitse_saapuvat
+
+  def _varastoi(self, tuloste: Optional[Tuloste]) -> Optional[Tuloste]:
+    ''' Tallenna tulkittu tietue varastoon, mikäli se on käytössä. '''
+    if (varasto := self.varasto) is not None \
+    and tuloste is not None \
+    and (pk := getattr(tuloste, self.Meta.pk, None)) is not None \
+    and pk is not ei_syotetty:
+      varasto.tallenna(pk, tuloste)
+    return tuloste
+    # def _varastoi -> Optional[Tuloste]
+
   def _tulkitse_lahteva(self, lahteva: RestSanoma) -> Optional[dict]:
     ''' Muodosta lähtevä data sanomalle. '''
     return lahteva.lahteva()
@@ -137,28 +272,302 @@ class Rajapinta(metaclass=RajapintaMeta):
   ) -> Optional[Union[Mapping, Iterable]]:
     if pk is not ei_syotetty:
       assert self.Meta.rajapinta_pk
-      rajapinta = self.Meta.rajapinta_pk % {'pk': pk}
-    else:
-      rajapinta = self.Meta.rajapinta
-    return await self.yhteys.nouda_data(rajapinta, params=params)
+      with mittauskonteksti(polku=self.Meta.rajapinta_pk):
+        return await self.yhteys.nouda_data(
+          self.Meta.rajapinta_pk % {'pk': pk},
+          params=params,
+        )
+    return await self.yhteys.nouda_data(self.Meta.rajapinta, params=params)
     # async def nouda_rajapinnasta
 
   async def nouda(self, **params) -> Valinnainen[
     Union[Tuloste, list[Tuloste]]
   ]:
+    if self.varasto is not None and params.keys() == {'pk'} \
+    and (tuloste := self.varasto.hae(params['pk'])) is not ei_syotetty:
+      return tuloste
     data = await self.nouda_rajapinnasta(**params)
     if data is None:
       return ei_syotetty
     elif isinstance(data, Mapping):
       return self._tulkitse_saapuva(data)
     elif isinstance(data, Iterable):
-      return [self._tulkitse_saapuva(d) for d in data]
+      return self._tulkitse_saapuvat(data)
     else:
       raise TypeError(
         f'Paluusanoman sisältö on tuntematonta tyyppiä: {data!r}'
       )
     # async def nouda
 
+  async def _tuota_tulosteet(self, **params) -> AsyncIterable[Tuloste]:
+    '''
+    Tuota hakuehtoihin täsmäävät tietueet riippumatta siitä, palauttaako
+    `nouda` luettelon (tai yksittäisen tietueen) vai asynkronisen
+    iteraattorin.
+    '''
+    tulosteet = self.nouda(**params)
+    if isinstance(tulosteet, AsyncIterable):
+      async for tuloste in tulosteet:
+        yield tuloste
+      return
+    tulosteet = await tulosteet
+    if tulosteet is ei_syotetty:
+      return
+    elif not isinstance(tulosteet, list):
+      tulosteet = [tulosteet]
+    for tuloste in tulosteet:
+      yield tuloste
+    # async def _tuota_tulosteet -> AsyncIterable[Tuloste]
+
+  async def _tuota_rajapinnasta(self, **params) -> AsyncIterable[Tuloste]:
+    '''
+    Tuota rajapinnan luettelosta GET-parametreihin (`params`) täsmäävät
+    tietueet. Parametrit lähetetään sellaisinaan, ts. mahdollista
+    `Suodatus`-muunnosta ei tehdä.
+    '''
+    data = await self.nouda_rajapinnasta(**params)
+    if data is None:
+      return
+    elif isinstance(data, Mapping):
+      yield self._tulkitse_saapuva(data)
+      return
+    for tuloste in self._tulkitse_saapuvat(data):
+      yield tuloste
+    # async def _tuota_rajapinnasta -> AsyncIterable[Tuloste]
+
+  async def nouda_monta(
+    self,
+    pkt: Iterable[Union[str, int]],
+    *,
+    rinnakkain: Optional[int] = None,
+  ) -> dict[Union[str, int], Union[Tuloste, None, Exception]]:
+    '''
+    Nouda useita tietueita primääriavainten mukaan.
+
+    Kukin tietue noudetaan kerran, ja varastossa (ks. `varasto`)
+    tuoreena oleva tietue palautetaan sieltä. Mikäli
+    `Meta.pk_joukko_parametri` on annettu, muut tietueet noudetaan
+    suodatetuin luettelopyynnöin, joiden parametri on enintään
+    `Meta.pk_joukko_pituus` merkkiä pitkä; muutoin yksittäisin
+    pyynnöin. Kerrallaan tehdään enintään `rinnakkain` tai
+    `Meta.rinnakkaiset_pyynnot` pyyntöä.
+
+    Tulokset palautetaan sanakirjana annettujen avainten mukaan.
+    Puuttuvan tietueen kohdalle palautetaan None ja epäonnistuneen
+    pyynnön kohdalle nostettu poikkeus.
+    '''
+    pkt = list(pkt)
+    tulokset: dict[str, Any] = {}
+    noudettavat: dict[str, Union[str, int]] = {}
+    for pk in pkt:
+      if (avain := str(pk)) in tulokset or avain in noudettavat:
+        continue
+      elif self.varasto is not None \
+      and (tuloste := self.varasto.hae(pk)) is not ei_syotetty:
+        tulokset[avain] = tuloste
+      else:
+        noudettavat[avain] = pk
+      # for pk in pkt
+    if noudettavat and self._meta('pk_joukko_parametri'):
+      tulokset.update(await self._nouda_suodattaen(
+        list(noudettavat.values()),
+        rinnakkain=rinnakkain,
+      ))
+    elif noudettavat:
+      tulokset.update(zip(noudettavat, await self._suorita_joukko(
+        (partial(self._nouda_yksi, pk) for pk in noudettavat.values()),
+        rinnakkain=rinnakkain,
+        edistyminen=None,
+      )))
+    return {pk: tulokset[str(pk)] for pk in pkt}
+    # async def nouda_monta
+
+  async def _nouda_yksi(self, pk: Union[str, int]) -> Optional[Tuloste]:
+    ''' Nouda yksittäinen tietue; puuttuva tietue palautetaan None-arvona. '''
+    try:
+      tuloste = await self.nouda(pk=pk)
+    except self.yhteys.Poikkeus as exc:
+      if exc.status == 404:
+        return None
+      raise
+    return None if tuloste is ei_syotetty else tuloste
+    # async def _nouda_yksi -> Optional[Tuloste]
+
+  async def _nouda_suodattaen(
+    self,
+    pkt: list[Union[str, int]],
+    *,
+    rinnakkain: Optional[int],
+  ) -> dict[str, Union[Tuloste, None, Exception]]:
+    ''' Nouda tietueet `Meta.pk_joukko_parametri`-suodatuksin. '''
+    erat: list[list[str]] = [[]]
+    pituus = 0
+    enintaan = self._meta('pk_joukko_pituus')
+    for avain in map(str, pkt):
+      if erat[-1] and pituus + 1 + len(avain) > enintaan:
+        erat.append([])
+        pituus = 0
+      pituus += len(avain) + bool(pituus)
+      erat[-1].append(avain)
+
+    async def _nouda_era(era: list[str]) -> dict[str, RestSanoma]:
+      return {
+        str(getattr(tuloste, self.Meta.pk)): tuloste
+        async for tuloste in self._tuota_rajapinnasta(
+          **{self._meta('pk_joukko_parametri'): ','.join(era)}
+        )
+      }
+      # async def _nouda_era -> dict[str, RestSanoma]
+
+    tulokset = {}
+    for era, loydetyt in zip(erat, await self._suorita_joukko(
+      (partial(_nouda_era, era) for era in erat),
+      rinnakkain=rinnakkain,
+      edistyminen=None,
+    )):
+      for avain in era:
+        tulokset[avain] = (
+          loydetyt if isinstance(loydetyt, Exception)
+          else loydetyt.get(avain)
+        )
+      # for era, loydetyt in zip
+    return tulokset
+    # async def _nouda_suodattaen -> dict
+
+  @cached_property
+  def _kootut(self) -> dict[str, tuple[Any, asyncio.Future]]:
+    ''' Kokoamista odottavat `nouda_kootusti`-haut avaimittain. '''
+    return {}
+
+  @cached_property
+  def _kokoajat(self) -> set[asyncio.Task]:
+    '''
+    Käynnissä olevat `_nouda_kootut`-tehtävät. Tapahtumasilmukka
+    säilyttää vain heikon viittauksen tehtävään, joten viittaus
+    pidetään tässä, kunnes tehtävä on valmis.
+    '''
+    return set()
+
+  async def nouda_kootusti(
+    self,
+    pk: Union[str, int],
+  ) -> Optional[Tuloste]:
+    '''
+    Nouda yksittäinen tietue siten, että samanaikaiset haut kootaan
+    yhdeksi `nouda_monta`-kutsuksi (vrt. DataLoader).
+
+    Haut kootaan `Meta.pk_kokoamisaika` sekunnin ajalta. Puuttuva
+    tietue palautetaan None-arvona; epäonnistuneen pyynnön poikkeus
+    nostetaan.
+
+    Käyttö seuraavasti:
+    >>> kirjoittajat = await asyncio.gather(*(
+    ...   yhteys.henkilot.nouda_kootusti(kirja.kirjoittaja)
+    ...   for kirja in kirjat
+    ... ))  # Yksi (tai muutama) pyyntö.
+    '''
+    if (odottava := self._kootut.get(avain := str(pk))) is None:
+      if not self._kootut:
+        self._kokoajat.add(kokoaja := asyncio.create_task(
+          self._nouda_kootut()
+        ))
+        kokoaja.add_done_callback(self._kokoajat.discard)
+      odottava = self._kootut[avain] = (
+        pk, asyncio.get_running_loop().create_future()
+      )
+    return await asyncio.shield(odottava[1])
+    # async def nouda_kootusti -> Optional[Tuloste]
+
+  async def _nouda_kootut(self):
+    '''
+    Nouda kokoamisajan kuluessa pyydetyt tietueet kerralla.
+
+    Poikkeus välitetään odottaville hauille; tehtävää itseään ei
+    odota kukaan.
+    '''
+    # pylint: disable=attribute-defined-outside-init
+    await asyncio.sleep(self._meta('pk_kokoamisaika'))
+    kootut, self._kootut = self._kootut, {}
+    try:
+      tulokset = await self.nouda_monta(pk for pk, _ in kootut.values())
+    except Exception as exc:  # pylint: disable=broad-except
+      for _, odottava in kootut.values():
+        odottava.set_exception(exc)
+      return
+    except BaseException:
+      for _, odottava in kootut.values():
+        odottava.cancel()
+      raise
+    for pk, odottava in kootut.values():
+      if isinstance(tulos := tulokset[pk], Exception):
+        odottava.set_exception(tulos)
+      else:
+        odottava.set_result(tulos)
+    # async def _nouda_kootut
+
+  async def synkronoi(
+    self,
+    kohde: Union[
+      MutableMapping[Any, Tuloste],
+      Callable[[Tuloste], Optional[Awaitable]],
+    ],
+    *,
+    tarkistuspisteet: Tarkistuspisteet,
+    avain: Optional[str] = None,
+    **params,
+  ) -> int:
+    '''
+    Nouda edellisen synkronoinnin jälkeen muuttuneet tietueet ja vie ne
+    paikalliseen `kohde`-varastoon.
+
+    Kohde on joko kuvaus, johon tietueet tallennetaan primääriavaimen
+    mukaan, tai (asynkroninen) rutiini, jota kutsutaan kullekin
+    tietueelle.
+
+    Edellisen synkronoinnin tarkistuspiste luetaan `tarkistuspisteet`-
+    varastosta `avain`-nimellä (oletuksena rajapinnan osoite ja
+    hakuehdot) ja annetaan hakuehtona `Meta.muutos_parametri`.
+    Uudeksi tarkistuspisteeksi tallennetaan tietueiden
+    `Meta.muutos_kentta`-arvoista suurin, vasta kun kaikki muutokset
+    on viety kohteeseen; keskeytynyt synkronointi aloitetaan siten
+    seuraavalla kerralla samasta kohdasta. Huomaa, että tällöin
+    muutosten on oltava toistettavissa.
+
+    Palauttaa vietyjen tietueiden määrän.
+    '''
+    if not self._meta('muutos_kentta') or not self._meta('muutos_parametri'):
+      raise ValueError(
+        'Synkronointi vaatii `Meta.muutos_kentta`- ja'
+        ' `Meta.muutos_parametri`-määritykset.'
+      )
+    if avain is None:
+      avain = haun_avain(self.Meta.rajapinta, params)
+    if (tarkistuspiste := await tarkistuspisteet.lue(avain)) is not None:
+      params[self._meta('muutos_parametri')] = tarkistuspiste
+
+    suurin = None
+    muutoksia = 0
+    async for tuloste in self._tuota_tulosteet(**params):
+      if isinstance(kohde, MutableMapping):
+        kohde[getattr(tuloste, self.Meta.pk)] = tuloste
+      elif inspect.isawaitable(tulos := kohde(tuloste)):
+        await tulos
+      arvo = getattr(tuloste, self._meta('muutos_kentta'))
+      if arvo is not None and (suurin is None or arvo > suurin):
+        suurin = arvo
+      muutoksia += 1
+      # async for tuloste in self._tuota_tulosteet
+
+    if suurin is not None:
+      if isinstance(suurin, RestKentta):
+        suurin = suurin.lahteva()
+      elif isinstance(suurin, (date, datetime)):
+        suurin = suurin.isoformat()
+      if suurin != tarkistuspiste:
+        await tarkistuspisteet.tallenna(avain, suurin)
+    return muutoksia
+    # async def synkronoi -> int
+
   async def otsakkeet(self, **params):
     return await self.yhteys.nouda_otsakkeet(
       self.Meta.rajapinta,
@@ -198,6 +607,81 @@ class Rajapinta(metaclass=RajapintaMeta):
     )
     # async def lisaa
 
+  async def lisaa_joukko(
+    self,
+    data: Iterable[Syote],
+    *,
+    rinnakkain: Optional[int] = None,
+    edistyminen: Optional[JoukkotoiminnonEdistyminen] = None,
+  ) -> list[Union[Tuloste, Exception]]:
+    '''
+    Lisää useita tietueita rinnakkaisin pyynnöin; kerrallaan
+    enintään `rinnakkain` tai `Meta.rinnakkaiset_pyynnot` pyyntöä.
+
+    Tulokset palautetaan syötteiden järjestyksessä. Epäonnistuneen
+    lisäyksen kohdalle palautetaan nostettu poikkeus; muiden tietueiden
+    lisäämistä jatketaan tällöinkin.
+
+    Mikäli `Meta.joukkolisays` on annettu, tietueet lähetetään enintään
+    tämän kokoisina luetteloina. Epäonnistuneen pyynnön poikkeus
+    palautetaan tällöin kaikkien siinä lähetettyjen tietueiden kohdalle.
+    Edistyminen raportoidaan tällöin pyyntöjen mukaan.
+    '''
+    data = list(data)
+    if not (koko := self._meta('joukkolisays')):
+      return await self._suorita_joukko(
+        (partial(self.lisaa, alkio) for alkio in data),
+        rinnakkain=rinnakkain,
+        edistyminen=edistyminen,
+      )
+    erat = [data[i:i + koko] for i in range(0, len(data), koko)]
+    return [
+      tulos
+      for era, tulokset in zip(erat, await self._suorita_joukko(
+        (partial(self._lisaa_era, era) for era in erat),
+        rinnakkain=rinnakkain,
+        edistyminen=edistyminen,
+      ))
+      for tulos in (
+        [tulokset] * len(era)
+        if isinstance(tulokset, Exception)
+        else tulokset
+      )
+    ]
+    # async def lisaa_joukko
+
+  async def _suorita_joukko(
+    self,
+    rutiinit: Iterable,
+    *,
+    rinnakkain: Optional[int],
+    edistyminen: Optional[JoukkotoiminnonEdistyminen],
+  ) -> list:
+    return await suorita_rinnakkain(
+      rutiinit,
+      enintaan=rinnakkain or self._meta('rinnakkaiset_pyynnot'),
+      edistyminen=(
+        partial(edistyminen, polku=self.Meta.rajapinta)
+        if edistyminen is not None else None
+      ),
+    )
+    # async def _suorita_joukko -> list
+
+  async def _lisaa_era(self, era: list[Syote]) -> list[Tuloste]:
+    ''' Lisää tietueet yhdellä, luettelomuotoisella pyynnöllä. '''
+    tulokset = self._tulkitse_saapuvat(
+      await self.yhteys.lisaa_data(
+        self.Meta.rajapinta,
+        [self._tulkitse_lahteva(alkio) for alkio in era],
+      )
+    )
+    if len(tulokset) != len(era):
+      raise ValueError(
+        f'Lisättiin {len(era)} tietuetta, saatiin {len(tulokset)}!'
+      )
+    return tulokset
+    # async def _lisaa_era
+
   async def muuta(
     self,
     pk: Union[str, int],
@@ -215,12 +699,17 @@ class Rajapinta(metaclass=RajapintaMeta):
       pass
     elif not isinstance(data, RestSanoma):
       raise TypeError(f'not isinstance({data!r}, RestSanoma)')
-    return self._tulkitse_saapuva(
-      await self.yhteys.muuta_data(
-        self.Meta.rajapinta_pk % {'pk': pk},
-        self._tulkitse_lahteva(data) if data is not ei_syotetty else {}
-      )
-    )
+    try:
+      with mittauskonteksti(polku=self.Meta.rajapinta_pk):
+        return self._tulkitse_saapuva(
+          await self.yhteys.muuta_data(
+            self.Meta.rajapinta_pk % {'pk': pk},
+            self._tulkitse_lahteva(data) if data is not ei_syotetty else {}
+          )
+        )
+    finally:
+      if self.varasto is not None:
+        self.varasto.poista(pk)
     # async def muuta
 
   async def tuhoa(
@@ -228,11 +717,60 @@ class Rajapinta(metaclass=RajapintaMeta):
     pk: Union[str, int],
   ):
     assert self.Meta.rajapinta_pk
-    return self._tulkitse_saapuva(
-      await self.yhteys.tuhoa_data(
-        self.Meta.rajapinta_pk % {'pk': pk},
-      )
-    )
+    try:
+      with mittauskonteksti(polku=self.Meta.rajapinta_pk):
+        return self._tulkitse_saapuva(
+          await self.yhteys.tuhoa_data(
+            self.Meta.rajapinta_pk % {'pk': pk},
+          )
+        )
+    finally:
+      if self.varasto is not None:
+        self.varasto.poista(pk)
     # async def tuhoa
 
+  async def muuta_joukko(
+    self,
+    muutokset: Union[
+      Mapping[Union[str, int], Paivitys],
+      Iterable[tuple[Union[str, int], Paivitys]],
+    ],
+    *,
+    rinnakkain: Optional[int] = None,
+    edistyminen: Optional[JoukkotoiminnonEdistyminen] = None,
+  ) -> list[Union[Tuloste, Exception]]:
+    '''
+    Muuta useita tietueita rinnakkaisin pyynnöin; muutokset annetaan
+    kuvauksena tai luettelona `(pk, päivitys)`-pareja.
+
+    Tulokset ja poikkeukset palautetaan kuten `lisaa_joukko`-metodissa.
+    '''
+    if isinstance(muutokset, Mapping):
+      muutokset = muutokset.items()
+    return await self._suorita_joukko(
+      (partial(self.muuta, pk, data) for pk, data in muutokset),
+      rinnakkain=rinnakkain,
+      edistyminen=edistyminen,
+    )
+    # async def muuta_joukko
+
+  async def tuhoa_joukko(
+    self,
+    pkt: Iterable[Union[str, int]],
+    *,
+    rinnakkain: Optional[int] = None,
+    edistyminen: Optional[JoukkotoiminnonEdistyminen] = None,
+  ) -> list[Any]:
+    '''
+    Tuhoa useita tietueita rinnakkaisin pyynnöin.
+
+    Tulokset ja poikkeukset palautetaan kuten `lisaa_joukko`-metodissa.
+    '''
+    return await self._suorita_joukko(
+      (partial(self.tuhoa, pk) for pk in pkt),
+      rinnakkain=rinnakkain,
+      edistyminen=edistyminen,
+    )
+    # async def tuhoa_joukko
+
   # class Rajapinta
@@ -29,13 +29,28 @@ class LuettelomuotoinenRajapinta(SuodatettuRajapinta):
       return super().nouda(pk=pk, **suodatusehdot)
 
     async def _nouda():
-      for data in await self.nouda_rajapinnasta(
-        **self.Suodatus(**suodatusehdot).lahteva(),
+      async for tuloste in self._tuota_rajapinnasta(
+        **self.Suodatus(**suodatusehdot).lahteva()
       ):
-        yield self._tulkitse_saapuva(data)
+        yield tuloste
     return _nouda()
     # def nouda
 
+  async def _tuota_rajapinnasta(self, **params):
+    if self.yhteys.virtautus:
+      # Tulkitaan tietueet sitä mukaa, kuin niitä saapuu.
+      async for data in self.yhteys.tuota_data(
+        self.Meta.rajapinta,
+        params=params,
+      ):
+        yield self._tulkitse_saapuva(data)
+      return
+    for tuloste in self._tulkitse_saapuvat(
+      await self.nouda_rajapinnasta(**params)
+    ):
+      yield tuloste
+    # async def _tuota_rajapinnasta
+
   # class LuettelomuotoinenRajapinta
 
 
@@ -69,4 +84,13 @@ class VainLukuRajapinta(Rajapinta):
   async def tuhoa(self, *args, **kwargs):
     raise self.ToimintoEiSallittu
 
+  async def lisaa_joukko(self, *args, **kwargs):
+    raise self.ToimintoEiSallittu
+
+  async def muuta_joukko(self, *args, **kwargs):
+    raise self.ToimintoEiSallittu
+
+  async def tuhoa_joukko(self, *args, **kwargs):
+    raise self.ToimintoEiSallittu
+
   # class VainLukuRajapinta
@@ -0,0 +1,194 @@
+import asyncio
+from dataclasses import dataclass, field
+import time
+from typing import Callable, Optional
+
+import aiohttp
+
+from aresti.toisto import odotuskehotus
+
+
+@dataclass(kw_only=True)
+class Nopeusrajoitin:
+  '''
+  Palvelimelle lähetettävien pyyntöjen nopeus- ja määrärajoitin.
+
+  Pyyntöjen tahti rajataan token bucket -periaatteella
+  (`pyyntoja_sekunnissa`, enintään `purske` pyyntöä kerralla) ja
+  samanaikaisten pyyntöjen määrä semaforilla (`samanaikaisia`).
+
+  Mikäli `mukautuva` on asetettu, tahtia sovitetaan palvelimen
+  ilmoittamien rajojen mukaan:
+  - `X-RateLimit-Remaining` / `X-RateLimit-Reset` (tai vastaavat
+    `RateLimit-*`-otsakkeet): jäljellä olevat pyynnöt jaetaan tasan
+    jakson loppuun saakka; kiintiön loputtua odotetaan jakson loppuun;
+  - `Retry-After` HTTP 429- tai 503-vastauksessa: kaikki pyynnöt
+    odottavat annetun ajan.
+
+  Samaa rajoitinta voidaan käyttää useamman yhteysolion kesken.
+
+  Käyttö seuraavasti:
+  >>> async with JsonYhteys(
+  ...   palvelin='https://testi.fi',
+  ...   rajoitin=Nopeusrajoitin(pyyntoja_sekunnissa=10, samanaikaisia=4),
+  ... ) as yhteys:
+  ...   data = await yhteys.nouda_data('/abc/def')
+  '''
+
+  # Pyyntöjen enimmäistahti sekunnissa (None = rajoittamaton) sekä
+  # kerralla sallittujen pyyntöjen määrä.
+  pyyntoja_sekunnissa: Optional[float] = None
+  purske: float = 1
+
+  # Samanaikaisten pyyntöjen enimmäismäärä (None = rajoittamaton).
+  # Virtaavasti luettavan vastauksen (`virtautus`) paikka vapautetaan
+  # jo otsakkeiden saavuttua, jotta tietueita käsittelevä kutsuja voi
+  # tehdä uusia pyyntöjä samaan rajoittimeen lukkiutumatta.
+  samanaikaisia: Optional[int] = None
+
+  # Sovitetaanko tahti palvelimen ilmoittamiin rajoihin?
+  mukautuva: bool = True
+
+  # Tarkastellut otsakkeiden etuliitteet.
+  otsakkeet: tuple[str, ...] = ('X-RateLimit-', 'RateLimit-')
+
+  _tokenit: float = field(default=0.0, init=False, repr=False)
+  _taydennetty: float = field(default=0.0, init=False, repr=False)
+  _tauko_asti: float = field(default=0.0, init=False, repr=False)
+  _mukautettu: Optional[float] = field(default=None, init=False, repr=False)
+  _mukautettu_asti: float = field(default=0.0, init=False, repr=False)
+
+  def __post_init__(self):
+    # pylint: disable=attribute-defined-outside-init
+    self._tokenit = self.purske
+    self._taydennetty = time.monotonic()
+    self._lukitus = asyncio.Lock()
+    self._semafori = (
+      asyncio.Semaphore(self.samanaikaisia)
+      if self.samanaikaisia else None
+    )
+    # def __post_init__
+
+  async def __aenter__(self):
+    if self._semafori is not None:
+      await self._semafori.acquire()
+    try:
+      await self._odota_vuoroa()
+    except BaseException:
+      if self._semafori is not None:
+        self._semafori.release()
+      raise
+    return self
+    # async def __aenter__
+
+  async def __aexit__(self, *exc_info):
+    if self._semafori is not None:
+      self._semafori.release()
+    # async def __aexit__
+
+  async def varaa(self) -> Callable[[], None]:
+    '''
+    Odota vuoroa kuten `async with rajoitin`. Palauttaa rutiinin,
+    joka vapauttaa varatun samanaikaisen pyynnön paikan; toistuvat
+    kutsut ohitetaan.
+    '''
+    await self.__aenter__()
+    vapautettu = False
+
+    def vapauta():
+      nonlocal vapautettu
+      if not vapautettu:
+        vapautettu = True
+        if self._semafori is not None:
+          self._semafori.release()
+      # def vapauta
+
+    return vapauta
+    # async def varaa -> Callable[[], None]
+
+  def _nopeus(self, nyt: float) -> Optional[float]:
+    ''' Voimassa oleva enimmäistahti; `None` = rajoittamaton. '''
+    nopeudet = [
+      nopeus
+      for nopeus in (
+        self.pyyntoja_sekunnissa,
+        self._mukautettu if nyt < self._mukautettu_asti else None,
+      )
+      if nopeus is not None
+    ]
+    return min(nopeudet) if nopeudet else None
+    # def _nopeus -> Optional[float]
+
+  async def _odota_vuoroa(self):
+    '''
+    Odota, kunnes pyyntö voidaan lähettää.
+
+    Odottajat palvellaan saapumisjärjestyksessä.
+    '''
+    async with self._lukitus:
+      while True:
+        nyt = time.monotonic()
+        if (odotus := self._tauko_asti - nyt) <= 0:
+          if (nopeus := self._nopeus(nyt)) is None:
+            return
+          self._tokenit = min(
+            float(self.purske),
+            self._tokenit + (nyt - self._taydennetty) * nopeus,
+          )
+          self._taydennetty = nyt
+          if self._tokenit >= 1:
+            self._tokenit -= 1
+            return
+          odotus = (1 - self._tokenit) / nopeus
+          # if (odotus := self._tauko_asti - nyt) <= 0
+        await asyncio.sleep(odotus)
+        # while True
+      # async with self._lukitus
+    # async def _odota_vuoroa
+
+  def _otsake(
+    self,
+    sanoma: aiohttp.ClientResponse,
+    nimi: str,
+  ) -> Optional[float]:
+    for etuliite in self.otsakkeet:
+      if (arvo := sanoma.headers.get(etuliite + nimi)) is not None:
+        try:
+          return float(arvo)
+        except ValueError:
+          return None
+    return None
+    # def _otsake -> Optional[float]
+
+  def paivita(self, sanoma: aiohttp.ClientResponse):
+    ''' Sovita tahti vastaanotetun sanoman otsakkeiden mukaan. '''
+    if not self.mukautuva:
+      return
+    nyt = time.monotonic()
+    if sanoma.status in (429, 503) \
+    and (kehotus := odotuskehotus(sanoma)) is not None:
+      self._tauko_asti = max(self._tauko_asti, nyt + kehotus)
+    if (jaljella := self._otsake(sanoma, 'Remaining')) is None \
+    or (nollaus := self._otsake(sanoma, 'Reset')) is None:
+      return
+    if nollaus > 1e9:
+      # Ajanhetki (Unix-aika) sekuntimäärän sijaan.
+      nollaus = max(nollaus - time.time(), 0.0)
+    if jaljella < 1:
+      self._tauko_asti = max(self._tauko_asti, nyt + nollaus)
+    elif nollaus > 0:
+      self._mukautettu = jaljella / nollaus
+      self._mukautettu_asti = nyt + nollaus
+    # def paivita
+
+  def jaljitys(self) -> aiohttp.TraceConfig:
+    ''' Istuntoon liitettävä, vastaukset rajoittimelle välittävä jäljitys. '''
+    async def pyynto_valmis(istunto, konteksti, parametrit):
+      # pylint: disable=unused-argument
+      self.paivita(parametrit.response)
+    jaljitys = aiohttp.TraceConfig()
+    jaljitys.on_request_end.append(pyynto_valmis)
+    return jaljitys
+    # def jaljitys -> aiohttp.TraceConfig
+
+  # class Nopeusrajoitin
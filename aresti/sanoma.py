@@ -1,10 +1,12 @@
-from dataclasses import fields, is_dataclass
+from dataclasses import dataclass, fields, is_dataclass
 import enum
 import functools
+import inspect
 from typing import (
   Any,
   Callable,
   ClassVar,
+  Iterable,
   Mapping,
   Optional,
   Self,
@@ -178,8 +180,8 @@ class RestSanoma(RestKentta):
       # elif lahde is list
     # def __poimi_rest -> tuple[Callable, Callable]
 
-  @luokkamaare
-  def _rest(cls):
+  @classmethod
+  def __muodosta_rest(cls) -> dict:
     '''
     Muodosta `_rest`-sanakirja automaattisesti sisempien
     RestKenttien osalta.
@@ -189,10 +191,6 @@ class RestSanoma(RestKentta):
     tuottama `lahteva, saapuva`-kaksikko että täydellisten muunnosten
     (kolmikko muotoa `nimi, lahteva, saapuva`) osalta.
     '''
-    # pylint: disable=no-self-argument
-    if not is_dataclass(cls):
-      raise TypeError(f'Sanoma ei ole dataclass-tyyppinen: {cls!r}!')
-
     def _kentat():
       tyypit = get_type_hints(cls)
       muunnos = cls.rest_muunnos or {}
@@ -212,6 +210,55 @@ class RestSanoma(RestKentta):
         # for kentta in fields
       # def _kentat
     return dict(_kentat())
+    # def __muodosta_rest -> dict
+
+  @classmethod
+  def _koodekki(cls) -> '_RestKoodekki':
+    '''
+    Palauta luokkakohtainen, käännetty koodekki.
+
+    Koodekki muodostetaan ensimmäisellä käyttökerralla ja tallennetaan
+    luokalle. Se muodostetaan uudelleen, mikäli `rest_muunnos` korvataan;
+    muutoin ks. `tyhjenna_rest`.
+    '''
+    # pylint: disable=no-member
+    koodekki = cls.__dict__.get('_RestSanoma__koodekki')
+    if koodekki is not None and koodekki.rest_muunnos is cls.rest_muunnos:
+      return koodekki
+    if not is_dataclass(cls):
+      raise TypeError(f'Sanoma ei ole dataclass-tyyppinen: {cls!r}!')
+    if inspect.getattr_static(cls, '_rest') is RestSanoma.__dict__['_rest']:
+      rest = cls.__muodosta_rest()
+    else:
+      # Aliluokka on määritellyt oman muunnostaulukkonsa.
+      rest = cls._rest
+    cls.__koodekki = koodekki = _RestKoodekki.kaanna(cls, rest)
+    return koodekki
+    # def _koodekki
+
+  @classmethod
+  def tyhjenna_rest(cls):
+    '''
+    Tyhjennä luokalle (ja sen aliluokille) käännetyt koodekit.
+
+    Tarvitaan silloin, kun `rest_muunnos`-sanakirjaa tai luokan tyyppejä
+    muutetaan paikallaan luokan määrittelyn jälkeen.
+    '''
+    if '_RestSanoma__koodekki' in cls.__dict__:
+      delattr(cls, '_RestSanoma__koodekki')
+    for aliluokka in cls.__subclasses__():
+      aliluokka.tyhjenna_rest()
+    # def tyhjenna_rest
+
+  @luokkamaare
+  def _rest(cls):
+    '''
+    Luokkakohtainen muunnostaulukko (ks. `__muodosta_rest`).
+
+    Taulukko muodostetaan kerran luokkaa kohti osana koodekkia.
+    '''
+    # pylint: disable=no-self-argument
+    return cls._koodekki().rest
     # def _rest
 
   def lahteva(self) -> Optional[dict[str, Any]]:
@@ -221,24 +268,7 @@ class RestSanoma(RestKentta):
     '''
     if self is None:
       return None
-    elif not is_dataclass(self):
-      raise TypeError(f'Sanoma ei ole dataclass-tyyppinen: {self!r}!')
-    return {
-      muunnettu_avain: muunnos(arvo)
-      for arvo, muunnettu_avain, muunnos in (
-        (arvo, rest[0], rest[1])
-        if isinstance(rest, tuple)
-        else (arvo, rest, lambda x: x)
-        for arvo, rest in (
-          (arvo, self._rest.get(avain, avain))
-          for avain, arvo in (
-            (kentta.name, getattr(self, kentta.name))
-            for kentta in fields(self)
-          )
-          if arvo is not ei_syotetty
-        )
-      )
-    }
+    return type(self)._koodekki().lahteva(self)
     # def lahteva
 
   @classmethod
@@ -247,28 +277,126 @@ class RestSanoma(RestKentta):
     Muunnetaan saapuvan REST-sanakirjan sisältö `cls`-olioksi
     `cls._rest`-muunnostaulun mukaisesti.
     '''
-    if not is_dataclass(cls):
-      raise TypeError(f'Sanoma ei ole dataclass-tyyppinen: {cls!r}!')
+    koodekki = cls._koodekki()
     if saapuva is None:
       return None
     elif not isinstance(saapuva, Mapping):
       raise TypeError(repr(saapuva))
-    return cls(**{
-      avain: muunnos(saapuva[muunnettu_avain])
-      for avain, muunnettu_avain, muunnos in (
-        (avain, rest[0], rest[2])
-        if isinstance(rest, tuple)
-        else (avain, rest, lambda x: x)
-        for avain, rest in (
-          (avain, cls._rest.get(avain, avain))
-          for avain in (
-            kentta.name
-            for kentta in fields(cls)
-          )
-        )
-      )
-      if muunnettu_avain in saapuva
-    })
+    return koodekki.saapuva(saapuva)
     # def saapuva
 
+  @classmethod
+  def saapuva_joukko(
+    cls,
+    saapuvat: Iterable[Mapping[str, Any]],
+    *,
+    tarkista: bool = True,
+  ) -> list[Self]:
+    '''
+    Muunnetaan joukko saapuvia REST-sanakirjoja `cls`-olioiksi
+    yhdellä läpikäynnillä.
+
+    Muunnostaulukko ja kenttäkohtaiset muunnokset haetaan kerran koko
+    joukolle. Muu kuin kuvaus-tyyppinen alkio (myös `None`) aiheuttaa
+    TypeError-poikkeuksen; kun `tarkista` on epätosi, tyyppiä ei tarkisteta.
+    '''
+    if cls.saapuva.__func__ is not RestSanoma.saapuva.__func__:
+      # Aliluokka on mukauttanut yksittäisen sanoman muunnoksen.
+      return [cls.saapuva(saapuva) for saapuva in saapuvat]
+    return cls._koodekki().saapuva_joukko(saapuvat, tarkista)
+    # def saapuva_joukko
+
   # class RestSanoma
+
+
+@dataclass(frozen=True)
+class _RestKoodekki:
+  '''
+  Sanomaluokan muunnostaulukon mukaisiksi Python-funktioiksi käännetyt
+  `lahteva`-, `saapuva`- ja `saapuva_joukko`-rutiinit.
+
+  Kenttäkohtaiset avaimet ja muunnokset poimitaan taulukosta kerran
+  käännöksen yhteydessä, jolloin sanomakohtainen muunnos ei enää
+  käy läpi luokan kenttiä tai tyyppejä.
+  '''
+
+  rest_muunnos: Any
+  rest: dict
+  lahteva: Callable[[RestSanoma], dict[str, Any]]
+  saapuva: Callable[[Mapping[str, Any]], RestSanoma]
+  saapuva_joukko: Callable[[Iterable[Mapping[str, Any]], bool], list]
+
+  @classmethod
+  def kaanna(cls, sanoma: type, rest: dict) -> Self:
+    nimiavaruus = {
+      '_sanoma': sanoma,
+      '_ei_syotetty': ei_syotetty,
+      '_puuttuu': _puuttuu,
+      '_Mapping': Mapping,
+    }
+    lahteva, saapuva = [], []
+    for indeksi, kentta in enumerate(fields(sanoma)):
+      muunnos = rest.get(kentta.name, kentta.name)
+      if isinstance(muunnos, tuple):
+        avain, nimiavaruus[f'_l{indeksi}'], nimiavaruus[f'_s{indeksi}'] = (
+          muunnos
+        )
+        lahteva_arvo = f'_l{indeksi}(arvo)'
+        saapuva_arvo = f'_s{indeksi}(arvo)'
+      else:
+        avain, lahteva_arvo, saapuva_arvo = muunnos, 'arvo', 'arvo'
+      lahteva.append(
+        f'  if (arvo := self.{kentta.name}) is not _ei_syotetty:\n'
+        f'    data[{avain!r}] = {lahteva_arvo}\n'
+      )
+      saapuva.append((avain, kentta.name, saapuva_arvo))
+      # for indeksi, kentta in enumerate
+
+    def _saapuva(sisennys: str) -> str:
+      return ''.join(
+        f'{sisennys}if (arvo := saapuva.get({avain!r}, _puuttuu))'
+        ' is not _puuttuu:\n'
+        f'{sisennys}  kentat[{nimi!r}] = {arvo}\n'
+        for avain, nimi, arvo in saapuva
+      )
+      # def _saapuva
+
+    exec(  # pylint: disable=exec-used
+      'def lahteva(self):\n'
+      '  data = {}\n'
+      + ''.join(lahteva)
+      + '  return data\n'
+      'def saapuva(saapuva):\n'
+      '  kentat = {}\n'
+      + _saapuva('  ')
+      + '  return _sanoma(**kentat)\n'
+      # Joukkomuunnoksessa sanomakohtainen muunnos kirjoitetaan
+      # silmukan sisään ilman erillistä funktiokutsua.
+      'def saapuva_joukko(saapuvat, tarkista):\n'
+      '  tulos = []\n'
+      '  lisaa = tulos.append\n'
+      '  for saapuva in saapuvat:\n'
+      '    if tarkista and not isinstance(saapuva, _Mapping):\n'
+      '      raise TypeError(\n'
+      "        f'Noudettu data ei ole kuvaus: {type(saapuva)!r}!'\n"
+      '      )\n'
+      '    kentat = {}\n'
+      + _saapuva('    ')
+      + '    lisaa(_sanoma(**kentat))\n'
+      '  return tulos\n',
+      nimiavaruus
+    )
+    return cls(
+      rest_muunnos=sanoma.rest_muunnos,
+      rest=rest,
+      lahteva=nimiavaruus['lahteva'],
+      saapuva=nimiavaruus['saapuva'],
+      saapuva_joukko=nimiavaruus['saapuva_joukko'],
+    )
+    # def kaanna
+
+  # class _RestKoodekki
+
+
+# Saapuvasta sanakirjasta puuttuvan avaimen merkki.
+_puuttuu = object()
@@ -1,8 +1,22 @@
+import asyncio
+import collections
 from dataclasses import dataclass, field
-from typing import AsyncIterable, Coroutine, Optional, Protocol, Union
+import itertools
+from typing import (
+  Any,
+  AsyncIterable,
+  Awaitable,
+  Callable,
+  Coroutine,
+  Optional,
+  Protocol,
+  Union,
+)
 
 from aresti.rest import RestYhteys
 
+from .mittaus import mittauskonteksti, tuota_kontekstissa
+from .tarkistuspiste import haun_avain, Tarkistuspisteet
 from .tyokalut import ei_syotetty, luokkamaare, mittaa, Rutiini, Valinnainen
 from .yhteys import AsynkroninenYhteys
 
@@ -48,18 +62,185 @@ class OletusEdistyminen(SivutetunHaunEdistyminen, Rutiini):
   # class OletusEdistyminen
 
 
+class Sivutus:
+  '''
+  Sivutustapa: seuraavan sivun pyyntö muodostetaan edellisen sivun
+  perusteella.
+
+  Oletustoteutus noutaa vain yhden sivun.
+  '''
+
+  def alkuehdot(self, params: dict) -> dict:
+    ''' Palauta ensimmäisen sivun pyynnön parametrit. '''
+    return params
+
+  def seuraava(
+    self,
+    *,
+    osoite: str,
+    params: dict,
+    sivullinen: dict,
+    tuloksia: int,
+    viimeinen: Any,
+  ) -> Optional[tuple[str, dict]]:
+    '''
+    Palauta seuraavan sivun osoite ja parametrit tai None, mikäli
+    sivuja ei ole enempää.
+
+    Args:
+      osoite, params: edellisen sivun pyyntö
+      sivullinen: edellisen sivun muut tiedot (ks. `tuota_data`)
+      tuloksia: edellisen sivun tulosten määrä (> 0)
+      viimeinen: edellisen sivun viimeinen tulos
+    '''
+    # pylint: disable=unused-argument
+    return None
+    # def seuraava -> Optional[tuple[str, dict]]
+
+  # class Sivutus
+
+
+@dataclass(kw_only=True)
+class LinkkiSivutus(Sivutus):
+  ''' Seurataan sivullisen sisältämää linkkiä seuraavalle sivulle. '''
+
+  # Avain, jolla seuraavan sivun osoite poimitaan sivullisesta.
+  avain: str = 'next'
+
+  def seuraava(
+    self,
+    *,
+    osoite: str,
+    params: dict,
+    sivullinen: dict,
+    tuloksia: int,
+    viimeinen: Any,
+  ) -> Optional[tuple[str, dict]]:
+    if not (seuraava := sivullinen.get(self.avain)):
+      return None
+    # Ei lisätä parametrejä uudelleen `next`-sivun osoitteeseen.
+    return seuraava, {}
+    # def seuraava -> Optional[tuple[str, dict]]
+
+  # class LinkkiSivutus
+
+
+@dataclass(kw_only=True)
+class SivunumeroSivutus(Sivutus):
+  '''
+  Sivu valitaan numerolla.
+
+  Mikäli `seuraava_avain` on annettu, seuraavan sivun numero poimitaan
+  sivullisesta; muutoin sivunumeroa kasvatetaan, kunnes saadaan tyhjä
+  sivu.
+  '''
+
+  # Parametri, jolla sivunumero annetaan, sekä ensimmäisen sivun indeksi.
+  avain: str = 'page'
+  ensimmainen_sivu: int = 1
+
+  # Avain, jolla seuraavan sivun numero poimitaan sivullisesta.
+  seuraava_avain: Optional[str] = None
+
+  def seuraava(
+    self,
+    *,
+    osoite: str,
+    params: dict,
+    sivullinen: dict,
+    tuloksia: int,
+    viimeinen: Any,
+  ) -> Optional[tuple[str, dict]]:
+    if self.seuraava_avain:
+      if not (sivu := sivullinen.get(self.seuraava_avain)):
+        # Tämä oli viimeinen sivu.
+        return None
+    else:
+      sivu = int(params.get(self.avain) or self.ensimmainen_sivu) + 1
+    return osoite, {**params, self.avain: sivu}
+    # def seuraava -> Optional[tuple[str, dict]]
+
+  # class SivunumeroSivutus
+
+
+@dataclass(kw_only=True)
+class AvainSivutus(Sivutus):
+  '''
+  Avainjoukkoon perustuva sivutus (keyset): seuraava sivu rajataan
+  edellisen sivun viimeisen tuloksen lajitteluavaimella, esim.
+  `?id__gt=<viimeinen id>&limit=100`.
+
+  Toisin kuin sivunumeroihin perustuvassa sivutuksessa, sivun nouto
+  ei hidastu sivujen edetessä, eikä haun aikana lisätty tietue
+  siirrä jo noudettuja tuloksia seuraavalle sivulle. Tulosten tulee
+  olla lajiteltuina `kentta`-arvon mukaan.
+  '''
+
+  # Tuloksen lajitteluavain sekä parametri, jolla seuraavat
+  # tulokset rajataan.
+  kentta: str = 'id'
+  parametri: str = 'id__gt'
+
+  # Parametri, jolla sivun koko annetaan, sekä sivun koko
+  # (None = palvelimen oletus). Kun koko on annettu, vajaa sivu
+  # tulkitaan viimeiseksi; muutoin haetaan, kunnes saadaan tyhjä sivu.
+  raja_parametri: str = 'limit'
+  raja: Optional[int] = None
+
+  def alkuehdot(self, params: dict) -> dict:
+    if self.raja is None:
+      return params
+    return {**params, self.raja_parametri: self.raja}
+    # def alkuehdot -> dict
+
+  def seuraava(
+    self,
+    *,
+    osoite: str,
+    params: dict,
+    sivullinen: dict,
+    tuloksia: int,
+    viimeinen: Any,
+  ) -> Optional[tuple[str, dict]]:
+    if self.raja is not None and tuloksia < self.raja:
+      return None
+    return osoite, {**params, self.parametri: viimeinen[self.kentta]}
+    # def seuraava -> Optional[tuple[str, dict]]
+
+  # class AvainSivutus
+
+
 @dataclass(kw_only=True)
 class SivutettuYhteys(RestYhteys):
   ''' Saateluokka Rest-rajapintaan, joka käyttää tulosten sivutusta. '''
 
   # Avaimet, joilla tulokset ja seuraava sivu poimitaan sivutetusta datasta.
-  tulokset_avain: str = 'results'
+  # Mikäli `tulokset_avain` on None, kukin sivu on pelkkä tulosten luettelo.
+  tulokset_avain: Optional[str] = 'results'
   seuraava_sivu_avain: Optional[str] = 'next'
 
   # Avain, jolla sivunumero annetaan käsin sekä ensimmäisen sivun indeksi.
   valittu_sivu_avain: Optional[str] = None
   ensimmainen_sivu: int = 1
 
+  # Kuinka monta sivua noudetaan enintään rinnakkain?
+  # Rinnakkaista noutoa käytetään silloin, kun sivu valitaan numerolla
+  # (`valittu_sivu_avain`) ja ensimmäinen sivu kertoo tietueiden
+  # kokonaismäärän (`count`). Tulokset tuotetaan tällöinkin sivujen
+  # mukaisessa järjestyksessä.
+  rinnakkaiset_sivut: int = 1
+
+  # Sivutustapa. Oletuksena se päätellään yllä olevista avaimista:
+  # `SivunumeroSivutus`, mikäli `valittu_sivu_avain` on annettu,
+  # muutoin `LinkkiSivutus`, mikäli `seuraava_sivu_avain` on annettu.
+  sivutus: Optional[Sivutus] = None
+
+  # Kuinka monta sivua luetaan enintään etukäteen silloin, kun sivua ei
+  # valita numerolla (esim. `LinkkiSivutus` tai `AvainSivutus`)?
+  # Seuraavan sivun nouto aloitetaan heti, kun edellinen sivu on
+  # luettu, riippumatta siitä, onko sitä vielä käsitelty.
+  ennakoivat_sivut: int = 0
+
   # Tulostetaanko tiedot sivutetun haun edistymisestä?
   # Huomaa, että tällä ei ole vaikutusta silloin, kun
   # `sivutetun_haun_edistyminen` on asetettu käsin.
@@ -75,6 +256,14 @@ class SivutettuYhteys(RestYhteys):
 
   class Rajapinta(RestYhteys.Rajapinta):
 
+    class Meta(RestYhteys.Rajapinta.Meta):
+      ''' Lisätty rajapintakohtainen sivutustapa. '''
+      # Tietueiden haussa käytettävä sivutustapa
+      # (None = yhteyden `sivutus`).
+      sivutus: Optional[Sivutus] = None
+
+      # class Meta
+
     def nouda(
       self,
       pk: Valinnainen[Union[str, int]] = ei_syotetty,
@@ -89,102 +278,389 @@ class SivutettuYhteys(RestYhteys):
       # pylint: disable=invalid-overridden-method, no-member
       if pk is not ei_syotetty:
         return super().nouda(pk=pk, **params)
-
-      async def _nouda():
-        async for data in self.yhteys.tuota_sivutettu_data(
-          self.Meta.rajapinta,
-          params=params,
-        ):
-          yield self._tulkitse_saapuva(data)
-
-      return _nouda()
+      return self._tuota_rajapinnasta(**params)
       # def nouda
 
+    async def _tuota_rajapinnasta(
+      self,
+      **params
+    ) -> AsyncIterable[RestYhteys.Rajapinta.Tuloste]:
+      ''' Tuota hakuehtoihin täsmäävät tietueet sivu kerrallaan. '''
+      async for data in self.yhteys.tuota_sivutettu_data(
+        self.Meta.rajapinta,
+        params=params,
+        # Sallitaan myös muualta periytetty `Meta`.
+        sivutus=getattr(self.Meta, 'sivutus', None),
+      ):
+        yield self._tulkitse_saapuva(data)
+      # async def _tuota_rajapinnasta
+
     # class Rajapinta
 
+  def _oletussivutus(self) -> Sivutus:
+    ''' Yhteyden sivutustapa; ks. `sivutus`. '''
+    if self.sivutus is not None:
+      return self.sivutus
+    elif self.valittu_sivu_avain:
+      return SivunumeroSivutus(
+        avain=self.valittu_sivu_avain,
+        ensimmainen_sivu=self.ensimmainen_sivu,
+        seuraava_avain=self.seuraava_sivu_avain,
+      )
+    elif self.seuraava_sivu_avain:
+      return LinkkiSivutus(avain=self.seuraava_sivu_avain)
+    else:
+      # Seuraavaa sivua ei osata hakea.
+      return Sivutus()
+    # def _oletussivutus -> Sivutus
+
   async def tuota_sivutettu_data(
     self,
     polku: str,
     *,
     params: Optional[dict] = None,  # type: ignore
+    sivutus: Optional[Sivutus] = None,
+    sijainti: Optional[dict[str, Any]] = None,
+    tarkistuspisteet: Optional[Tarkistuspisteet] = None,
+    tarkistuspiste_avain: Optional[str] = None,
     **kwargs
   ) -> AsyncIterable:
-    ''' Tuota sivutettu data kaikilta sivuilta. '''
+    '''
+    Tuota sivutettu data kaikilta sivuilta.
+
+    Sivut noudetaan annetun tai yhteyden oletusarvoisen sivutustavan
+    (`sivutus`) mukaisesti.
+
+    Haun sijainti eli seuraavaksi noudettavan sivun osoite (`osoite`),
+    parametrit (`params`) ja järjestysnumero (`sivu`) sekä alkuperäinen
+    haku (`haku`) tallennetaan JSON-muotoisena sanakirjana
+    `tarkistuspisteet`-varastoon aina, kun edellisen sivun tulokset on
+    käsitelty. Sijainti poistetaan varastosta haun päätyttyä.
+    Avaimena on `tarkistuspiste_avain`, oletuksena polku ja hakuehdot
+    (ks. `haun_avain`); samanaikaisille, samanlaisille hauille on
+    annettava eri avaimet.
+
+    Keskeytynyt haku jatkuu varastoon tallennetusta tai `sijainti`-
+    parametrinä annetusta sijainnista noutamatta uudelleen jo
+    käsiteltyjä sivuja. Mikäli sijainti on tallennettu eri haulle,
+    nostetaan ValueError.
+    '''
     assert isinstance(self.palvelin, str)
     osoite = self.palvelin + polku
+    sivutus = sivutus or self._oletussivutus()
     params: dict = params or {}
-    while True:
-      sivullinen = await self.nouda_data(
+    ensimmainen = 1
+    haku = haun_avain(polku, params)
+    avain = tarkistuspiste_avain or haku
+    if sijainti is None and tarkistuspisteet is not None:
+      sijainti = await tarkistuspisteet.lue(avain)
+    if sijainti is not None:
+      if sijainti.get('haku', haku) != haku:
+        raise ValueError(
+          f'Sijainti on tallennettu eri haulle ({sijainti["haku"]!r}),'
+          f' kuin nyt pyydetty ({haku!r}).'
+        )
+      osoite = sijainti['osoite']
+      params = dict(sijainti['params'])
+      ensimmainen = sijainti.get('sivu', 1)
+    else:
+      params = sivutus.alkuehdot(params)
+
+    async def _kirjaa(osoite: str, params: dict, sivu: int):
+      ''' Tallenna seuraavaksi noudettavan sivun sijainti. '''
+      if tarkistuspisteet is not None:
+        await tarkistuspisteet.tallenna(avain, {
+          'haku': haku,
+          'osoite': osoite,
+          'params': dict(params),
+          'sivu': sivu,
+        })
+      # async def _kirjaa
+
+    async for tulos in self._tuota_sivut(
+      polku,
+      osoite,
+      params=params,
+      sivutus=sivutus,
+      ensimmainen=ensimmainen,
+      kirjaa=_kirjaa,
+      **kwargs
+    ):
+      yield tulos
+    if tarkistuspisteet is not None:
+      await tarkistuspisteet.poista(avain)
+    # async def tuota_sivutettu_data
+
+  async def _tuota_sivut(
+    self,
+    polku: str,
+    osoite: str,
+    *,
+    params: dict,
+    sivutus: Sivutus,
+    ensimmainen: int,
+    kirjaa: Callable[[str, dict, int], Awaitable],
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Tuota sivujen tulokset `ensimmainen`-järjestysnumerolla alkaen.
+
+    Kunkin sivun tulosten käsittelyn jälkeen seuraavan sivun sijainti
+    annetaan `kirjaa`-rutiinille.
+    '''
+    if self.ennakoivat_sivut > 0 \
+    and not isinstance(sivutus, SivunumeroSivutus):
+      async for tulos in self._tuota_ennakoiden(
+        polku,
         osoite,
-        suhteellinen=False,
         params=params,
+        sivutus=sivutus,
+        ensimmainen=ensimmainen,
+        kirjaa=kirjaa,
         **kwargs
-      )
-      if tulokset := sivullinen.get(self.tulokset_avain):
-        # Tuota tämän sivun tulokset.
-        for tulos in tulokset:
-          yield tulos
+      ):
+        yield tulos
+      return
+      # if self.ennakoivat_sivut > 0
+    for sivunumero in itertools.count(ensimmainen):
+      if sivunumero > ensimmainen:
+        await kirjaa(osoite, params, sivunumero)
+      # Tuota tämän sivun tulokset. Sivun muut tiedot tallennetaan
+      # `sivullinen`-sanakirjaan, tulosten kohdalle niiden määrä.
+      sivullinen = {}
+      tuloksia = 0
+      viimeinen = None
+      async for tulos in tuota_kontekstissa(
+        self.tuota_data(
+          osoite,
+          avain=self.tulokset_avain,
+          muut=sivullinen,
+          suhteellinen=False,
+          params=params,
+          **kwargs
+        ),
+        polku=polku,
+        sivu=sivunumero,
+      ):
+        tuloksia += 1
+        viimeinen = tulos
+        yield tulos
+      if tuloksia:
 
         # Raportoi edistyminen, jos mahdollista.
-        if self.valittu_sivu_avain:
-          sivu = params.get(self.valittu_sivu_avain)
-          if tuloksia_kaikkiaan := sivullinen.get('count'):
-            sivuja_kaikkiaan, jaannos = divmod(
-              tuloksia_kaikkiaan,
-              len(tulokset)
-            )
-            await self.sivutetun_haun_edistyminen(
-              polku=polku,
-              tietueita_yhteensa=sivullinen['count'],
-              sivu=sivu or self.ensimmainen_sivu,
-              sivuja_yhteensa=sivuja_kaikkiaan + int(bool(jaannos)),
-            )
-            # if tuloksia_kaikkiaan := sivullinen.get
-          # if self.valittu_sivu_avain
-
-        if self.valittu_sivu_avain \
-        and self.seuraava_sivu_avain:
-          # Sivu valitaan kiinteän parametrin avulla, käytetään annettua,
-          # seuraavaa sivua.
-          if seuraava_sivu := sivullinen[self.seuraava_sivu_avain]:
-            params[self.valittu_sivu_avain] = seuraava_sivu
-          else:
-            # Tämä oli viimeinen sivu, poistutaan.
-            break
-
-        # Päättele seuraavan sivun URL.
-        elif self.seuraava_sivu_avain:
-          # Paluusanoma sisältää linkin seuraavalle sivulle, seurataan.
-          osoite = sivullinen.get(self.seuraava_sivu_avain)
-          # Ei lisätä parametrejä uudelleen `next`-sivun
-          # osoitteeseen.
-          params = {}
-
-        elif self.valittu_sivu_avain \
-        and sivullinen[self.tulokset_avain]:
-          # Sivu valitaan kiinteän parametrin avulla: kasvatetaan
-          # sivunumeroa, kunnes saadaan tyhjä sivu.
-          params[self.valittu_sivu_avain] = (
-            int(sivu or self.ensimmainen_sivu) + 1  # pyright: ignore
+        if isinstance(sivutus, SivunumeroSivutus) \
+        and (tuloksia_kaikkiaan := sivullinen.get('count')):
+          sivu = params.get(sivutus.avain)
+          sivuja_kaikkiaan, jaannos = divmod(tuloksia_kaikkiaan, tuloksia)
+          sivuja_kaikkiaan += int(bool(jaannos))
+          await self.sivutetun_haun_edistyminen(
+            polku=polku,
+            tietueita_yhteensa=tuloksia_kaikkiaan,
+            sivu=sivu or sivutus.ensimmainen_sivu,
+            sivuja_yhteensa=sivuja_kaikkiaan,
           )
 
-        else:
-          # Seuraavaa sivua ei osata hakea, poistutaan.
-          break
+          # Nouda loput sivut rinnakkain, mikäli näin on pyydetty.
+          if self.rinnakkaiset_sivut > 1 and sivu is None:
+            if sivuja_kaikkiaan > 1:
+              await kirjaa(
+                osoite,
+                {**params, sivutus.avain: sivutus.ensimmainen_sivu + 1},
+                sivunumero + 1,
+              )
+            async for tulos in self._tuota_rinnakkaiset_sivut(
+              polku,
+              osoite,
+              params=params,
+              sivutus=sivutus,
+              sivut=range(
+                sivutus.ensimmainen_sivu + 1,
+                sivutus.ensimmainen_sivu + sivuja_kaikkiaan,
+              ),
+              tietueita_yhteensa=tuloksia_kaikkiaan,
+              kirjaa=kirjaa,
+              **kwargs
+            ):
+              yield tulos
+            break
+          # if isinstance(sivutus, SivunumeroSivutus)
 
-        if osoite is None:
+        # Päättele seuraavan sivun pyyntö.
+        seuraava = sivutus.seuraava(
+          osoite=osoite,
+          params=params,
+          sivullinen=sivullinen,
+          tuloksia=tuloksia,
+          viimeinen=viimeinen,
+        )
+        if seuraava is None:
           # Seuraavaa sivua ei ole, poistutaan.
           break
-          # if osoite is None
+        osoite, params = seuraava
 
-      elif self.tulokset_avain in sivullinen:
+      elif self.tulokset_avain is None \
+      or self.tulokset_avain in sivullinen:
         # Tyhjä sivu, poistutaan.
         break
 
       else:
         raise ValueError('Data ei ole sivutettua:', repr(sivullinen)[:20])
-      # while True
-    # async def tuota_sivutettu_data
+      # for sivunumero in itertools.count
+    # async def _tuota_sivut
+
+  async def _tuota_rinnakkaiset_sivut(
+    self,
+    polku: str,
+    osoite: str,
+    *,
+    params: dict,
+    sivutus: SivunumeroSivutus,
+    sivut: range,
+    tietueita_yhteensa: int,
+    kirjaa: Callable[[str, dict, int], Awaitable],
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Nouda annetut sivut rinnakkain ja tuota niiden tulokset
+    sivujärjestyksessä.
+
+    Noudettavana tai tuottamatta olevia sivuja on kerrallaan enintään
+    `rinnakkaiset_sivut` kappaletta.
+    '''
+    sivuja_yhteensa = len(sivut) + 1
+    viimeinen = sivut[-1] if sivut else None
+
+    def _nouda(sivu: int) -> asyncio.Future:
+      with mittauskonteksti(
+        polku=polku,
+        sivu=sivu - sivutus.ensimmainen_sivu + 1,
+      ):
+        return asyncio.ensure_future(self.nouda_data(
+          osoite,
+          suhteellinen=False,
+          params={**params, sivutus.avain: sivu},
+          **kwargs
+        ))
+      # def _nouda -> asyncio.Future
+
+    sivut = iter(sivut)
+    jono = collections.deque(
+      (sivu, _nouda(sivu))
+      for sivu in itertools.islice(sivut, self.rinnakkaiset_sivut)
+    )
+    try:
+      while jono:
+        sivu, nouto = jono.popleft()
+        sivullinen = await nouto
+        for seuraava_sivu in itertools.islice(sivut, 1):
+          jono.append((seuraava_sivu, _nouda(seuraava_sivu)))
+        for tulos in sivullinen.get(self.tulokset_avain) or ():
+          yield tulos
+        if sivu != viimeinen:
+          await kirjaa(
+            osoite,
+            {**params, sivutus.avain: sivu + 1},
+            sivu - sivutus.ensimmainen_sivu + 2,
+          )
+        await self.sivutetun_haun_edistyminen(
+          polku=polku,
+          tietueita_yhteensa=tietueita_yhteensa,
+          sivu=sivu,
+          sivuja_yhteensa=sivuja_yhteensa,
+        )
+        # while jono
+    finally:
+      # Peruta keskeneräiset noudot, mikäli tuotto keskeytyi.
+      for _, nouto in jono:
+        nouto.cancel()
+      await asyncio.gather(
+        *(nouto for _, nouto in jono),
+        return_exceptions=True,
+      )
+      # finally
+    # async def _tuota_rinnakkaiset_sivut
+
+  async def _tuota_ennakoiden(
+    self,
+    polku: str,
+    osoite: str,
+    *,
+    params: dict,
+    sivutus: Sivutus,
+    ensimmainen: int,
+    kirjaa: Callable[[str, dict, int], Awaitable],
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Nouda sivuja erillisessä tehtävässä ja tuota sivujen tulokset
+    sitä mukaa, kuin ne on noudettu.
+
+    Noudettuja, käsittelemättömiä sivuja puskuroidaan enintään
+    `ennakoivat_sivut` kappaletta.
+    '''
+    jono: asyncio.Queue = asyncio.Queue(maxsize=self.ennakoivat_sivut)
+
+    async def _nouda():
+      nonlocal osoite, params
+      sivunumero = ensimmainen - 1
+      try:
+        while True:
+          sivunumero += 1
+          with mittauskonteksti(polku=polku, sivu=sivunumero):
+            data = await self.nouda_data(
+              osoite,
+              suhteellinen=False,
+              params=params,
+              **kwargs
+            )
+          sivullinen = {}
+          tulokset = list(self._poimi_alkiot(
+            data,
+            avain=self.tulokset_avain,
+            muut=sivullinen,
+          ))
+          if not tulokset:
+            if self.tulokset_avain is not None \
+            and self.tulokset_avain not in sivullinen:
+              raise ValueError('Data ei ole sivutettua:', repr(data)[:20])
+            # Tyhjä sivu, poistutaan.
+            break
+          seuraava = sivutus.seuraava(
+            osoite=osoite,
+            params=params,
+            sivullinen=sivullinen,
+            tuloksia=len(tulokset),
+            viimeinen=tulokset[-1],
+          )
+          await jono.put((tulokset, seuraava))
+          if seuraava is None:
+            break
+          osoite, params = seuraava
+          # while True
+      except Exception as exc:  # pylint: disable=broad-except
+        await jono.put(exc)
+      else:
+        await jono.put(None)
+      # async def _nouda
+
+    nouto = asyncio.ensure_future(_nouda())
+    try:
+      for sivunumero in itertools.count(ensimmainen + 1):
+        if (sivu := await jono.get()) is None:
+          break
+        elif isinstance(sivu, Exception):
+          raise sivu
+        tulokset, seuraava = sivu
+        for tulos in tulokset:
+          yield tulos
+        if seuraava is not None:
+          await kirjaa(*seuraava, sivunumero)
+        # for sivunumero in itertools.count
+    finally:
+      nouto.cancel()
+      await asyncio.gather(nouto, return_exceptions=True)
+      # finally
+    # async def _tuota_ennakoiden
 
   @mittaa
   async def nouda_sivutettu_data(self, polku: str, **kwargs) -> list:
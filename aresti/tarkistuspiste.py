@@ -0,0 +1,170 @@
+from abc import ABC, abstractmethod
+import asyncio
+from contextlib import closing
+from dataclasses import dataclass, field
+import json
+import os
+import sqlite3
+from typing import Any, Optional, Union
+
+
+def haun_avain(polku: str, params: Optional[dict] = None) -> str:
+  '''
+  Muodosta haun oletusavain tarkistuspisteelle: polku ja hakuehdot
+  nimen mukaan järjestettyinä, esim. `/tietueet/?a=1&b=2`.
+  '''
+  if not params:
+    return polku
+  return polku + '?' + '&'.join(
+    f'{nimi}={arvo}' for nimi, arvo in sorted(params.items())
+  )
+  # def haun_avain -> str
+
+
+class Tarkistuspisteet(ABC):
+  '''
+  Abstrakti, avaimittain tallennettavien tarkistuspisteiden varasto
+  (esim. `Rajapinta.synkronoi`).
+
+  Tarkistuspisteiden arvot ovat JSON-muotoon sarjallistettavia.
+  '''
+
+  @abstractmethod
+  async def lue(self, avain: str) -> Optional[Any]:
+    ''' Palauta tallennettu arvo tai None. '''
+
+  @abstractmethod
+  async def tallenna(self, avain: str, arvo: Any):
+    ''' Tallenna arvo avaimelle. '''
+
+  @abstractmethod
+  async def poista(self, avain: str):
+    ''' Poista avaimen arvo, mikäli sellainen on. '''
+
+  # class Tarkistuspisteet
+
+
+@dataclass(kw_only=True)
+class MuistiTarkistuspisteet(Tarkistuspisteet):
+  ''' Prosessin muistissa säilytettävät tarkistuspisteet. '''
+
+  pisteet: dict[str, Any] = field(default_factory=dict)
+
+  async def lue(self, avain: str) -> Optional[Any]:
+    return self.pisteet.get(avain)
+
+  async def tallenna(self, avain: str, arvo: Any):
+    self.pisteet[avain] = arvo
+
+  async def poista(self, avain: str):
+    self.pisteet.pop(avain, None)
+
+  # class MuistiTarkistuspisteet
+
+
+@dataclass(kw_only=True)
+class TiedostoTarkistuspisteet(Tarkistuspisteet):
+  '''
+  JSON-tiedostoon tallennettavat tarkistuspisteet.
+
+  Tiedosto kirjoitetaan kokonaisuudessaan väliaikaisen tiedoston
+  kautta, joten keskeytynyt kirjoitus ei turmele aiempia pisteitä.
+  '''
+
+  polku: Union[str, os.PathLike]
+
+  _lukitus: asyncio.Lock = field(
+    default_factory=asyncio.Lock,
+    init=False,
+    repr=False,
+  )
+
+  def _lue(self) -> dict[str, Any]:
+    try:
+      with open(self.polku, encoding='utf-8') as tiedosto:
+        return json.load(tiedosto)
+    except FileNotFoundError:
+      return {}
+    # def _lue -> dict[str, Any]
+
+  def _kirjoita(self, pisteet: dict[str, Any]):
+    valiaikainen = f'{os.fspath(self.polku)}.{os.getpid()}.tmp'
+    with open(valiaikainen, 'w', encoding='utf-8') as tiedosto:
+      json.dump(pisteet, tiedosto, ensure_ascii=False, indent=2)
+    os.replace(valiaikainen, self.polku)
+    # def _kirjoita
+
+  def _muuta(self, avain: str, arvo: Any, poista: bool):
+    pisteet = self._lue()
+    if poista:
+      if pisteet.pop(avain, None) is None:
+        return
+    else:
+      pisteet[avain] = arvo
+    self._kirjoita(pisteet)
+    # def _muuta
+
+  async def lue(self, avain: str) -> Optional[Any]:
+    async with self._lukitus:
+      return (await asyncio.to_thread(self._lue)).get(avain)
+
+  async def tallenna(self, avain: str, arvo: Any):
+    async with self._lukitus:
+      await asyncio.to_thread(self._muuta, avain, arvo, False)
+
+  async def poista(self, avain: str):
+    async with self._lukitus:
+      await asyncio.to_thread(self._muuta, avain, None, True)
+
+  # class TiedostoTarkistuspisteet
+
+
+@dataclass(kw_only=True)
+class SqliteTarkistuspisteet(Tarkistuspisteet):
+  '''
+  SQLite-tietokantaan tallennettavat tarkistuspisteet.
+
+  Taulu luodaan tarvittaessa; arvot tallennetaan JSON-muodossa.
+  '''
+
+  polku: Union[str, os.PathLike]
+  taulu: str = 'tarkistuspisteet'
+
+  def _suorita(self, lause: str, *parametrit) -> Optional[tuple]:
+    # Tietokantayhteyden konteksti vain vahvistaa tai peruu
+    # transaktion; yhteys suljetaan erikseen.
+    with closing(sqlite3.connect(self.polku)) as yhteys, yhteys:
+      yhteys.execute(
+        f'CREATE TABLE IF NOT EXISTS "{self.taulu}"'
+        ' (avain TEXT PRIMARY KEY, arvo TEXT NOT NULL)'
+      )
+      return yhteys.execute(lause, parametrit).fetchone()
+    # def _suorita -> Optional[tuple]
+
+  async def lue(self, avain: str) -> Optional[Any]:
+    rivi = await asyncio.to_thread(
+      self._suorita,
+      f'SELECT arvo FROM "{self.taulu}" WHERE avain = ?',
+      avain,
+    )
+    return json.loads(rivi[0]) if rivi is not None else None
+    # async def lue -> Optional[Any]
+
+  async def tallenna(self, avain: str, arvo: Any):
+    await asyncio.to_thread(
+      self._suorita,
+      f'INSERT OR REPLACE INTO "{self.taulu}" (avain, arvo) VALUES (?, ?)',
+      avain,
+      json.dumps(arvo),
+    )
+    # async def tallenna
+
+  async def poista(self, avain: str):
+    await asyncio.to_thread(
+      self._suorita,
+      f'DELETE FROM "{self.taulu}" WHERE avain = ?',
+      avain,
+    )
+    # async def poista
+
+  # class SqliteTarkistuspisteet
@@ -0,0 +1,157 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import functools
+import io
+import random
+from typing import Any, AsyncIterable, Collection, Iterator, Optional
+
+import aiohttp
+
+from aresti.mittaus import mittauskonteksti
+
+
+def odotuskehotus(
+  sanoma: Optional[aiohttp.ClientResponse],
+) -> Optional[float]:
+  ''' Tulkitse `Retry-After`-otsake (sekunteja tai ajanhetki). '''
+  if sanoma is None \
+  or (arvo := sanoma.headers.get('Retry-After')) is None:
+    return None
+  try:
+    return max(float(arvo), 0.0)
+  except ValueError:
+    pass
+  try:
+    ajanhetki = parsedate_to_datetime(arvo)
+  except (TypeError, ValueError):
+    return None
+  if ajanhetki.tzinfo is None:
+    ajanhetki = ajanhetki.replace(tzinfo=timezone.utc)
+  return max(
+    (ajanhetki - datetime.now(timezone.utc)).total_seconds(),
+    0.0
+  )
+  # def odotuskehotus -> Optional[float]
+
+
+@dataclass(kw_only=True)
+class Toistokaytanto:
+  '''
+  Epäonnistuneiden HTTP-pyyntöjen uudelleenyrityskäytäntö.
+
+  Pyyntö yritetään uudelleen, mikäli sen metodi sallii tämän
+  (oletuksena idempotentit metodit; POST ja PATCH vain erikseen
+  pyydettäessä) ja se päättyi johonkin `statukset`-luettelon
+  mukaiseen HTTP-statukseen tai `poikkeukset`-luettelon mukaiseen
+  poikkeukseen.
+
+  Odotusaika kasvaa eksponentiaalisesti (`odotus` * `kerroin` ** yritys,
+  enintään `odotus_enintaan`), ja siitä vähennetään satunnaisesti
+  enintään `satunnaisuus`-osuus. Palvelimen antama `Retry-After`-aika
+  huomioidaan vähimmäisodotuksena; mikäli se ylittää
+  `odotus_enintaan`-ajan, pyyntöä ei yritetä uudelleen.
+
+  Käyttö seuraavasti:
+  >>> async with JsonYhteys(
+  ...   palvelin='https://testi.fi',
+  ...   toisto=Toistokaytanto(yrityksia=5),
+  ... ) as yhteys:
+  ...   data = await yhteys.nouda_data('/abc/def')
+  '''
+
+  # Uudelleenyritysten enimmäismäärä.
+  yrityksia: int = 3
+
+  # Uudelleen yritettävät HTTP-metodit, statukset ja poikkeukset.
+  metodit: Collection[str] = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+  statukset: Collection[int] = (408, 425, 429, 500, 502, 503, 504)
+  poikkeukset: tuple[type[BaseException], ...] = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+  )
+
+  # Odotusajan laskenta sekunteina.
+  odotus: float = 0.5
+  kerroin: float = 2.0
+  odotus_enintaan: float = 60.0
+  satunnaisuus: float = 0.5
+
+  def odotusaika(
+    self,
+    poikkeus: BaseException,
+    yritys: int,
+  ) -> Optional[float]:
+    '''
+    Päättele odotusaika ennen uutta yritystä, kun `yritys` yritystä on
+    jo tehty uudelleen; `None`, mikäli pyyntöä ei yritetä uudelleen.
+    '''
+    if yritys >= self.yrityksia:
+      return None
+    if isinstance(poikkeus, self.poikkeukset):
+      kehotus = None
+    elif getattr(poikkeus, 'status', None) in self.statukset:
+      kehotus = odotuskehotus(getattr(poikkeus, 'sanoma', None))
+    else:
+      return None
+    odotus = min(
+      self.odotus * self.kerroin ** yritys,
+      self.odotus_enintaan,
+    ) * (1 - self.satunnaisuus * random.random())
+    if kehotus is None:
+      return odotus
+    elif kehotus > self.odotus_enintaan:
+      return None
+    return max(odotus, kehotus)
+    # def odotusaika -> Optional[float]
+
+  # class Toistokaytanto
+
+
+def _kertakayttoinen(data: Any) -> bool:
+  return isinstance(data, (Iterator, AsyncIterable, io.IOBase))
+
+
+def toista(metodi: str):
+  '''
+  Yritä asynkronisen HTTP-metodin suoritusta uudelleen
+  `self.toisto`-käytännön mukaisesti.
+
+  Ohitetaan, jos `self.toisto` on tyhjä tai ei salli annettua metodia,
+  sekä silloin, kun jokin parametreista on kertakäyttöinen datavirta
+  (iteraattori, asynkroninen iteraattori tai tiedosto-olio), jota ei
+  voida lähettää uudelleen.
+
+  Käyttö seuraavasti:
+  >>> class Yhteys:
+  ...   toisto = Toistokaytanto()
+  ...   @toista('GET')
+  ...   async def nouda(self):
+  ...     ...
+  '''
+  def _toista(f):
+    # pylint: disable=invalid-name
+    @functools.wraps(f)
+    async def _f(self, *args, **kwargs):
+      toisto: Optional[Toistokaytanto] = getattr(self, 'toisto', None)
+      if toisto is None or metodi not in toisto.metodit \
+      or any(map(_kertakayttoinen, (*args, *kwargs.values()))):
+        return await f(self, *args, **kwargs)
+      yritys = 0
+      while True:
+        try:
+          with mittauskonteksti(yritys=yritys):
+            return await f(self, *args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+          if (odotus := toisto.odotusaika(exc, yritys)) is None:
+            raise
+        yritys += 1
+        await asyncio.sleep(odotus)
+        # while True
+      # async def _f
+    return _f
+    # def _toista
+  return _toista
+  # def toista
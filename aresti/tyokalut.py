@@ -1,7 +1,18 @@
+import asyncio
 from dataclasses import dataclass, is_dataclass, field
 import functools
-from time import time
-from typing import Any, TypeVar, Union
+from time import perf_counter
+from typing import (
+  Any,
+  Awaitable,
+  Callable,
+  Hashable,
+  Iterable,
+  Mapping,
+  Optional,
+  TypeVar,
+  Union,
+)
 
 from aiohttp import ClientError
 
@@ -13,6 +24,8 @@ def mittaa(f):
 
   Ohitetaan, jos `self.mittaa_pyynnot` on tyhjä.
 
+  Pyyntöjen vaiheittainen mittaus: ks. `mittaus.Mittaus`.
+
   Käyttö seuraavasti:
   >>> class Luokka
   ...   @mittaa
@@ -30,11 +43,11 @@ def mittaa(f):
       mittaa_pyynnot := getattr(self, 'mittaa_pyynnot', False)
     ):
       return await f(self, *args, **kwargs)
-    alku = time()
+    alku = perf_counter()
     try:
       return await f(self, *args, **kwargs)
     finally:
-      mittaa_pyynnot(f, args, time() - alku)
+      mittaa_pyynnot(f, args, perf_counter() - alku)
     # async def _f
   return _f
   # def mittaa
@@ -65,6 +78,126 @@ def kaanna_poikkeus(f):
   # def kaanna_poikkeus
 
 
+def yhdista_samanaikaiset(f):
+  '''
+  Yhdistä asynkronisen metodin samanaikaiset, samoin parametrein tehdyt
+  kutsut: vain ensimmäinen kutsu suoritetaan, ja sen tulos (tai poikkeus)
+  palautetaan kaikille kutsujille.
+
+  Ohitetaan, jos `self.yhdista_pyynnot` on tyhjä, tai mikäli
+  parametreja ei voida käyttää sanakirjan avaimena.
+
+  Käyttö seuraavasti:
+  >>> class Luokka:
+  ...   yhdista_pyynnot = True
+  ...   @yhdista_samanaikaiset
+  ...   async def metodi(self, x):
+  ...     print('Suoritetaan', x)
+  ...     await asyncio.sleep(1)
+  ...     return x
+  >>>
+  >>> olio = Luokka()
+  >>> await asyncio.gather(olio.metodi(1), olio.metodi(1))  # Yksi tuloste.
+  '''
+  # pylint: disable=invalid-name
+  @functools.wraps(f)
+  async def _f(self, *args, **kwargs):
+    if not getattr(self, 'yhdista_pyynnot', False):
+      return await f(self, *args, **kwargs)
+    try:
+      hash(avain := (f.__name__, _jaadyta(args), _jaadyta(kwargs)))
+    except TypeError:
+      return await f(self, *args, **kwargs)
+    kesken = vars(self).setdefault('_samanaikaiset_kutsut', {})
+    if (tehtava := kesken.get(avain)) is None:
+      tehtava = kesken[avain] = asyncio.ensure_future(
+        f(self, *args, **kwargs)
+      )
+
+      def _valmis(tehtava):
+        if kesken.get(avain) is tehtava:
+          del kesken[avain]
+        if not tehtava.cancelled():
+          # Merkitään mahdollinen poikkeus käsitellyksi myös silloin,
+          # kun kaikki kutsujat on peruttu.
+          tehtava.exception()
+        # def _valmis
+
+      tehtava.add_done_callback(_valmis)
+      # if (tehtava := kesken.get(avain)) is None
+    # Yksittäisen kutsujan peruminen ei peru yhteistä tehtävää.
+    return await asyncio.shield(tehtava)
+    # async def _f
+  return _f
+  # def yhdista_samanaikaiset
+
+
+def _jaadyta(arvo: Any) -> Hashable:
+  ''' Muunna sisäkkäiset kuvaukset ja luettelot monikoiksi. '''
+  if isinstance(arvo, Mapping):
+    return tuple(sorted(
+      (avain, _jaadyta(alkio)) for avain, alkio in arvo.items()
+    ))
+  elif isinstance(arvo, (list, tuple)):
+    return tuple(map(_jaadyta, arvo))
+  return arvo
+  # def _jaadyta -> Hashable
+
+
+async def suorita_rinnakkain(
+  rutiinit: Iterable[Callable[[], Awaitable]],
+  *,
+  enintaan: int,
+  edistyminen: Optional[Callable[..., Awaitable]] = None,
+) -> list:
+  '''
+  Suorita annetut rutiinit rinnakkain siten, että kesken on kerrallaan
+  enintään `enintaan` rutiinia.
+
+  Tulokset palautetaan rutiinien järjestyksessä. Rutiinin nostama
+  poikkeus palautetaan sen tuloksena, eikä se keskeytä muiden
+  rutiinien suoritusta.
+
+  Mikäli `edistyminen` on annettu, sille ilmoitetaan kunkin rutiinin
+  päätyttyä suoritettujen (`valmiita`) ja epäonnistuneiden
+  (`virheita`) rutiinien sekä kaikkien rutiinien (`yhteensa`) määrä.
+
+  Käyttö seuraavasti:
+  >>> await suorita_rinnakkain(
+  ...   (functools.partial(asyncio.sleep, 1, i) for i in range(100)),
+  ...   enintaan=10,
+  ... )  # Noin 10 sekuntia.
+  '''
+  rutiinit = list(rutiinit)
+  tulokset: list = [None] * len(rutiinit)
+  jono = iter(enumerate(rutiinit))
+  valmiita = virheita = 0
+
+  async def _suorita():
+    nonlocal valmiita, virheita
+    for indeksi, rutiini in jono:
+      try:
+        tulokset[indeksi] = await rutiini()
+      except Exception as exc:  # pylint: disable=broad-except
+        tulokset[indeksi] = exc
+        virheita += 1
+      valmiita += 1
+      if edistyminen is not None:
+        await edistyminen(
+          valmiita=valmiita,
+          virheita=virheita,
+          yhteensa=len(rutiinit),
+        )
+      # for indeksi, rutiini in jono
+    # async def _suorita
+
+  await asyncio.gather(*(
+    _suorita() for _ in range(max(1, min(enintaan, len(rutiinit))))
+  ))
+  return tulokset
+  # async def suorita_rinnakkain -> list
+
+
 @type.__call__
 class ei_syotetty:
   ''' Arvo, jota ei syötetty. Käyttäytyy kuten ei olisikaan. '''
@@ -231,6 +364,15 @@ class periyta:
   periytettava: type
   kwargs: dict = field(default_factory=dict)
 
+  # Nimi, jolla kullekin ulommalle luokalle muodostettu, periytetty
+  # luokka tallennetaan ulomman luokan määreeksi (ks. `__set_name__`).
+  _avain: Optional[str] = field(
+    default=None,
+    init=False,
+    repr=False,
+    compare=False,
+  )
+
   def __new__(cls, periytettava=ei_syotetty, /, **kwargs):
     '''
     Poimitaan muut kuin käsin määritellyt kentät erilliseen
@@ -259,9 +401,28 @@ class periyta:
     return ret
     # def __new__
 
+  def __set_name__(self, owner, name):
+    self._avain = f'_periyta__{name}'
+    # def __set_name__
+
   def __get__(self, instance, cls=None):
+    '''
+    Palauta ulommalle luokalle periytetty luokka.
+
+    Luokka muodostetaan kerran kutakin ulompaa luokkaa kohti ja
+    tallennetaan tämän omaksi määreeksi, joten toistuvat haut
+    palauttavat saman luokan, ja se vapautetaan yhdessä ulomman
+    luokan kanssa.
+    '''
+    ulompi = cls or type(instance)
+    avain = self._avain or f'_periyta__{id(self)}'
+    try:
+      return vars(ulompi)[avain]
+    except KeyError:
+      pass
+
     @functools.wraps(self.periytettava, updated=())
-    class periytetty(self.periytettava, cls or type(instance)):
+    class periytetty(self.periytettava, ulompi):
       pass
     if any(is_dataclass(kls) for kls in periytetty.__bases__):
       periytetty = dataclass(**self.kwargs)(periytetty)
@@ -276,6 +437,7 @@ class periyta:
     else:
       if any(is_pydantic_dataclass(kls) for kls in periytetty.__bases__):
         periytetty = pydantic_dataclass(periytetty)
+    setattr(ulompi, avain, periytetty)
     return periytetty
     # def __get__
 
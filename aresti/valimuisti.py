@@ -0,0 +1,241 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import re
+import time
+from typing import Any, Hashable, Mapping, Optional, Sequence
+
+import aiohttp
+
+from aresti.tyokalut import ei_syotetty, Valinnainen
+
+
+@dataclass(kw_only=True)
+class HttpValimuistinTietue:
+  ''' Välimuistiin tallennettu, tulkittu vastaus sekä sen tunnisteet. '''
+
+  data: Any
+  etag: Optional[str] = None
+  muokattu: Optional[str] = None
+
+  # Ajanhetki (`time.monotonic`), johon saakka vastaus on tuore.
+  tuore_asti: float = 0.0
+
+  def ehdot(self) -> dict[str, str]:
+    ''' Ehdollisen pyynnön otsakkeet vastauksen vahvistamiseksi. '''
+    return {
+      **({'If-None-Match': self.etag} if self.etag else {}),
+      **({'If-Modified-Since': self.muokattu} if self.muokattu else {}),
+    }
+    # def ehdot -> dict[str, str]
+
+  # class HttpValimuistinTietue
+
+
+@dataclass(kw_only=True)
+class HttpValimuisti:
+  '''
+  Kooltaan rajattu, LRU-periaatteella tyhjennettävä välimuisti
+  GET-pyyntöjen tulkituille vastauksille.
+
+  Vastaukset yksilöidään osoitteen, parametrien sekä `otsakkeet`-
+  luettelon mukaisten pyynnön otsakkeiden perusteella.
+
+  Vastaus tallennetaan, mikäli palvelin on antanut sille `ETag`- tai
+  `Last-Modified`-tunnisteen tai `Cache-Control: max-age`-ajan.
+  Tuore vastaus palautetaan suoraan; vanhentunut vahvistetaan
+  ehdollisella pyynnöllä (`If-None-Match`, `If-Modified-Since`), ja
+  HTTP 304 -vastauksen saapuessa palautetaan tallennettu data.
+
+  Huomaa, että välimuistista palautetaan sama dataolio kaikille
+  kutsujille; sitä ei tule muokata.
+
+  Käyttö seuraavasti:
+  >>> valimuisti = HttpValimuisti(koko=256)
+  >>> async with JsonYhteys(
+  ...   palvelin='https://testi.fi',
+  ...   valimuisti=valimuisti,
+  ... ) as yhteys:
+  ...   data = await yhteys.nouda_data('/abc/def')
+  >>> valimuisti.osumat, valimuisti.vahvistukset, valimuisti.ohitukset
+  '''
+
+  # Tallennettavien vastausten enimmäismäärä.
+  koko: int = 1024
+
+  # Pyynnön otsakkeet, joiden mukaan vastaukset yksilöidään.
+  otsakkeet: Sequence[str] = (
+    'Accept',
+    'Accept-Language',
+    'Authorization',
+  )
+
+  # Tuoreena välimuistista palautetut, palvelimen HTTP 304 -vastauksella
+  # vahvistetut sekä välimuistin ohi kokonaan noudetut vastaukset.
+  osumat: int = field(default=0, init=False)
+  vahvistukset: int = field(default=0, init=False)
+  ohitukset: int = field(default=0, init=False)
+
+  _tietueet: OrderedDict = field(
+    default_factory=OrderedDict,
+    init=False,
+    repr=False,
+  )
+
+  _max_age = re.compile(r'(?:^|[,\s])max-age\s*=\s*"?(\d+)')
+
+  def __len__(self):
+    return len(self._tietueet)
+
+  def avain(
+    self,
+    osoite: str,
+    params: Any,
+    otsakkeet: Mapping[str, str],
+  ) -> Hashable:
+    ''' Muodosta pyynnön yksilöivä avain. '''
+    if isinstance(params, Mapping):
+      params = params.items()
+    return (
+      osoite,
+      tuple(sorted((str(a), str(b)) for a, b in params or ())),
+      tuple(otsakkeet.get(otsake) for otsake in self.otsakkeet),
+    )
+    # def avain -> Hashable
+
+  def hae(self, avain: Hashable) -> Optional[HttpValimuistinTietue]:
+    ''' Hae tallennettu vastaus ja merkitse se viimeksi käytetyksi. '''
+    if (tietue := self._tietueet.get(avain)) is not None:
+      self._tietueet.move_to_end(avain)
+    return tietue
+    # def hae -> Optional[HttpValimuistinTietue]
+
+  def tyhjenna(self):
+    self._tietueet.clear()
+
+  def _tuoreus(self, sanoma: aiohttp.ClientResponse) -> Optional[float]:
+    '''
+    Päättele vastauksen tuoreusaika sekunteina `Cache-Control`-
+    otsakkeen mukaan; `None`, mikäli vastausta ei saa tallentaa.
+    '''
+    ohjaus = sanoma.headers.get('Cache-Control', '').lower()
+    if 'no-store' in ohjaus:
+      return None
+    elif 'no-cache' in ohjaus \
+    or (max_age := self._max_age.search(ohjaus)) is None:
+      return 0.0
+    try:
+      ika = float(sanoma.headers.get('Age', 0))
+    except ValueError:
+      ika = 0.0
+    return max(float(max_age.group(1)) - ika, 0.0)
+    # def _tuoreus -> Optional[float]
+
+  def tallenna(
+    self,
+    avain: Hashable,
+    data: Any,
+    sanoma: aiohttp.ClientResponse,
+  ):
+    ''' Tallenna vastaus, mikäli palvelin sen sallii. '''
+    if (tuoreus := self._tuoreus(sanoma)) is None:
+      self._tietueet.pop(avain, None)
+      return
+    tietue = HttpValimuistinTietue(
+      data=data,
+      etag=sanoma.headers.get('ETag'),
+      muokattu=sanoma.headers.get('Last-Modified'),
+      tuore_asti=time.monotonic() + tuoreus,
+    )
+    if not tuoreus and not tietue.etag and not tietue.muokattu:
+      # Vastausta ei voida käyttää eikä vahvistaa myöhemmin.
+      self._tietueet.pop(avain, None)
+      return
+    self._tietueet[avain] = tietue
+    self._tietueet.move_to_end(avain)
+    while len(self._tietueet) > self.koko:
+      self._tietueet.popitem(last=False)
+    # def tallenna
+
+  def vahvista(
+    self,
+    tietue: HttpValimuistinTietue,
+    sanoma: aiohttp.ClientResponse,
+  ):
+    ''' Päivitä tallennetun vastauksen tuoreus HTTP 304 -vastauksen mukaan. '''
+    tietue.etag = sanoma.headers.get('ETag', tietue.etag)
+    tietue.muokattu = sanoma.headers.get('Last-Modified', tietue.muokattu)
+    tietue.tuore_asti = time.monotonic() + (self._tuoreus(sanoma) or 0.0)
+    # def vahvista
+
+  # class HttpValimuisti
+
+
+@dataclass(kw_only=True)
+class Tietuevarasto:
+  '''
+  Kooltaan ja säilytysajaltaan rajattu, LRU-periaatteella tyhjennettävä
+  tunnistekartta (identity map) rajapinnan tulkituille tietueille.
+
+  Tietueet yksilöidään primääriavaimen merkkijonoesityksen mukaan.
+  Ks. `Rajapinta.Meta.varasto_koko`.
+
+  Huomaa, että varastosta palautetaan sama tietueolio kaikille
+  kutsujille; sitä ei tule muokata.
+  '''
+
+  # Tallennettavien tietueiden enimmäismäärä.
+  koko: int = 1024
+
+  # Tietueen säilytysaika sekunteina (None = rajoittamaton).
+  kesto: Optional[float] = None
+
+  # Varastosta palautetut ja siitä puuttuneet (tai vanhentuneet) tietueet.
+  osumat: int = field(default=0, init=False)
+  ohitukset: int = field(default=0, init=False)
+
+  _tietueet: OrderedDict = field(
+    default_factory=OrderedDict,
+    init=False,
+    repr=False,
+  )
+
+  def __len__(self):
+    return len(self._tietueet)
+
+  def hae(self, pk: Any) -> Valinnainen[Any]:
+    '''
+    Hae tallennettu tietue ja merkitse se viimeksi käytetyksi.
+
+    Palautetaan `ei_syotetty`, mikäli tietue puuttuu tai on vanhentunut.
+    '''
+    try:
+      tietue, vanhenee = self._tietueet[avain := str(pk)]
+    except KeyError:
+      self.ohitukset += 1
+      return ei_syotetty
+    if vanhenee is not None and vanhenee <= time.monotonic():
+      del self._tietueet[avain]
+      self.ohitukset += 1
+      return ei_syotetty
+    self._tietueet.move_to_end(avain)
+    self.osumat += 1
+    return tietue
+    # def hae -> Valinnainen[Any]
+
+  def tallenna(self, pk: Any, tietue: Any):
+    self._tietueet[avain := str(pk)] = (
+      tietue,
+      time.monotonic() + self.kesto if self.kesto is not None else None,
+    )
+    self._tietueet.move_to_end(avain)
+    while len(self._tietueet) > self.koko:
+      self._tietueet.popitem(last=False)
+    # def tallenna
+
+  def poista(self, pk: Any):
+    self._tietueet.pop(str(pk), None)
+
+  def tyhjenna(self):
+    self._tietueet.clear()
+
+  # class Tietuevarasto
@@ -1,17 +1,41 @@
-from dataclasses import dataclass, field
-from typing import Any, Callable, Sequence
+from dataclasses import dataclass, fields
+import functools
+import io
+import re
+from typing import (
+  Any,
+  AsyncIterable,
+  Callable,
+  ClassVar,
+  Iterable,
+  Iterator,
+  Mapping,
+  Optional,
+  Self,
+  Sequence,
+  Union,
+  get_args,
+  get_origin,
+  get_type_hints,
+)
 
 import aiohttp
 from lxml import etree
 
-from .sanoma import RestSanoma
+from .sanoma import _puuttuu, _RestKoodekki, RestSanoma
 from .tyokalut import ei_syotetty, Valinnainen
 from .yhteys import AsynkroninenYhteys
 
 
 @dataclass(kw_only=True)
 class XmlYhteys(AsynkroninenYhteys):
-  ''' XML-muotoista dataa lähettävä ja vastaanottava yhteys. '''
+  '''
+  XML-muotoista dataa lähettävä ja vastaanottava yhteys.
+
+  Mikäli `virtautus` on asetettu, `tuota_data` tulkitsee saapuvan
+  XML-dokumentin `etree.XMLPullParser`-lukijalla lohko kerrallaan ja
+  tuottaa kunkin valmiin tietue-elementin heti sen päätyttyä.
+  '''
 
   # Sanoman otsakkeina annettavat sisältötyypit.
   accept: str = 'application/xml'
@@ -23,12 +47,18 @@ class XmlYhteys(AsynkroninenYhteys):
     'text/xml',
   )
 
+  # Luettelomuotoisen lähtevän datan juurielementin tagi.
+  xml_juuri: str = 'sanomat'
+
+  def _xml_sisalto(self, sanoma: aiohttp.ClientResponse) -> bool:
+    return sanoma.content_type.split('+')[0] in self.xml_sisalto
+
   async def tulkitse_data(
     self,
     sanoma: aiohttp.ClientResponse
   ) -> Any:
     ''' Tulkitse XML-data elementtinä. '''
-    if sanoma.content_type.split('+')[0] not in self.xml_sisalto:
+    if not self._xml_sisalto(sanoma):
       return await super().tulkitse_data(sanoma)
 
     lukija: etree.XMLParser = etree.XMLParser(attribute_defaults=True)
@@ -39,37 +69,642 @@ class XmlYhteys(AsynkroninenYhteys):
   async def muodosta_data(
     self,
     data: Any
-  ) -> bytes:
-    ''' Muodota data XML-elementin mukaan. '''
+  ) -> Union[bytes, AsyncIterable[bytes]]:
+    '''
+    Muodosta data XML-elementin tai -sanoman mukaan.
+
+    Luettelo (esim. joukkolisäys) kirjoitetaan `xml_juuri`-elementin
+    lapsina sanoma kerrallaan (ks. `XmlSanoma.lahteva_virta`).
+    Iteraattori ja riittävän pitkä luettelo (ks. `lohkoittain_alkaen`)
+    lähetetään lohkoittain sitä mukaa, kuin sanomia kirjoitetaan.
+    '''
+    if isinstance(data, (AsyncIterable, io.IOBase)):
+      return await super().muodosta_data(data)
+    elif isinstance(data, XmlSanoma):
+      data = data.lahteva()
+    elif self._lahetetaan_lohkoittain(data):
+      return self._lohkoittain(XmlSanoma.lahteva_virta(
+        data,
+        juuri=self.xml_juuri,
+        lohko=self.lahetyksen_lohko,
+      ))
+    elif isinstance(data, (list, tuple)):
+      return b''.join(XmlSanoma.lahteva_virta(data, juuri=self.xml_juuri))
     return etree.tostring(data)
     # async def muodosta_data
 
+  async def tuota_data(
+    self,
+    polku: str,
+    *,
+    avain: Optional[str] = None,
+    muut: Optional[dict] = None,
+    suhteellinen: bool = True,
+    headers: Optional[dict[str, str]] = None,
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Tuota XML-dokumentin tietue-elementit.
+
+    Tietueet valitaan `avain`-polun mukaan (ElementPath-muodossa
+    juuresta lukien, esim. `tietue`, `tietueet/tietue`, `.//tietue`
+    tai `{*}tietue`); oletuksena tuotetaan juurielementin lapset.
+    `muut`-sanakirjaan tallennetaan tuotettujen tietueiden määrä.
+
+    Mikäli `virtautus` on asetettu, dokumentti luetaan lohkoittain
+    (ks. `AsynkroninenYhteys.virtautus`).
+    Kukin tietue irrotetaan puusta sen jälkeen, kun kutsuja on
+    käsitellyt sen, joten muistin käyttö ei kasva dokumentin koon
+    mukana. Keskeytynyt pyyntö yritetään tarvittaessa uudelleen
+    `toisto`-käytännön mukaisesti; jo tuotetut tietueet ohitetaan.
+    '''
+    if self._virtaava_haku():
+      async for era in self._tuota_toistaen(functools.partial(
+        self._tuota_virtaavasti,
+        polku,
+        avain=avain,
+        muut=muut,
+        suhteellinen=suhteellinen,
+        headers=headers,
+        **kwargs
+      )):
+        for alkio in era:
+          yield alkio
+      return
+    async for alkio in super().tuota_data(
+      polku,
+      avain=avain,
+      muut=muut,
+      suhteellinen=suhteellinen,
+      headers=headers,
+      **kwargs
+    ):
+      yield alkio
+    # async def tuota_data
+
+  @staticmethod
+  def _poimi_alkiot(
+    data: Any,
+    *,
+    avain: Optional[str],
+    muut: Optional[dict],
+  ) -> Iterable:
+    ''' Poimi XML-elementistä `avain`-polun mukaiset tietueet. '''
+    if not isinstance(data, etree._Element):
+      return AsynkroninenYhteys._poimi_alkiot(data, avain=avain, muut=muut)
+    alkiot = list(data) if avain is None else data.findall(avain)
+    if muut is not None and avain is not None:
+      muut[avain] = len(alkiot)
+    return alkiot
+    # def _poimi_alkiot -> Iterable
+
+  async def _tuota_virtaavasti(
+    self,
+    polku: str,
+    *,
+    avain: Optional[str],
+    muut: Optional[dict],
+    suhteellinen: bool,
+    headers: Optional[dict[str, str]],
+    **kwargs
+  ) -> AsyncIterable[list]:
+    try:
+      async with self._pyynto as vapauta, self._istunto.get(
+        self.palvelin + polku if suhteellinen else polku,
+        headers=await self._pyynnon_otsakkeet(
+          metodi='GET',
+          polku=polku,
+          **headers or {},
+        ),
+        **kwargs,
+      ) as sanoma:
+        # Otsakkeet on luettu: vapautetaan rajoittimen paikka, sillä
+        # kutsuja voi tehdä uusia pyyntöjä tietueita käsitellessään.
+        vapauta()
+        if sanoma.status >= 400 or not self._xml_sisalto(sanoma):
+          yield list(self._poimi_alkiot(
+            await self._tulkitse_sanoma('GET', sanoma),
+            avain=avain,
+            muut=muut,
+          ))
+          return
+        alkioita = 0
+        async for alkio in _tuota_tietueet(
+          sanoma.content.iter_any(),
+          _polun_vertailu(avain),
+        ):
+          alkioita += 1
+          yield [alkio]
+        if muut is not None and avain is not None:
+          muut[avain] = alkioita
+        # async with self._istunto.get
+    except aiohttp.ClientError as exc:
+      raise self.Poikkeus from exc
+    # async def _tuota_virtaavasti
+
   # class XmlYhteys
 
 
+def _polun_vertailu(avain: Optional[str]) -> Callable[[list[str]], bool]:
+  '''
+  Muodosta ElementPath-tyyppisen polun vertailu virtaavaa lukua varten.
+
+  Tuettuina ovat tagit (`{nimiavaruus}tagi`, `{*}tagi`, `*`) sekä
+  niistä muodostetut, juuresta alkavat (`a/b`) ja mielivaltaisen
+  syvältä alkavat (`.//a/b`) polut. Vertailtava polku sisältää
+  juurielementin tagin ensimmäisenä alkionaan.
+
+  Polku jaetaan osiin ElementPath-tulkinnan tavoin: nimiavaruus
+  `{...}` kuuluu tagiin, vaikka se sisältäisi kauttaviivoja.
+
+  >>> _polun_vertailu('a/b')(['juuri', 'a', 'b'])
+  True
+  >>> _polun_vertailu('{http://esim.fi/ns}a')(
+  ...   ['juuri', '{http://esim.fi/ns}a']
+  ... )
+  True
+  >>> _polun_vertailu('.//{http://esim.fi/ns}a')(
+  ...   ['juuri', 'b', '{http://esim.fi/ns}a']
+  ... )
+  True
+  '''
+  if avain is None:
+    return lambda polku: len(polku) == 2
+  jalkelainen = False
+  osat: list[str] = []
+  for erotin, osa in _polun_osa.findall(avain):
+    if erotin == '//' and not osat:
+      jalkelainen = True
+    elif erotin == '//' or '[' in osa or '@' in osa:
+      raise ValueError(f'Polkua ei tueta virtaavassa luvussa: {avain!r}')
+    elif osa and osa != '.':
+      osat.append(osa)
+
+  def _vastaa(osa: str, tagi: str) -> bool:
+    if osa == '*' or osa == tagi:
+      return True
+    elif osa.startswith('{*}'):
+      return etree.QName(tagi).localname == osa[3:]
+    return False
+    # def _vastaa -> bool
+
+  def _vertaa(polku: list[str]) -> bool:
+    if jalkelainen:
+      if len(polku) <= len(osat):
+        return False
+    elif len(polku) != len(osat) + 1:
+      return False
+    return all(map(_vastaa, osat, polku[-len(osat):]))
+    # def _vertaa -> bool
+
+  return _vertaa
+  # def _polun_vertailu -> Callable
+
+
+async def _tuota_tietueet(
+  lohkot: AsyncIterable[bytes],
+  vertaa: Callable[[list[str]], bool],
+) -> AsyncIterable[etree._Element]:
+  '''
+  Tulkitse lohkoittain saapuva XML-dokumentti ja tuota `vertaa`-ehdon
+  täyttävät elementit sitä mukaa, kuin ne päättyvät.
+
+  Kutsujan käsittelemä elementti irrotetaan puusta; se säilyy
+  käytettävissä, mikäli kutsuja säilyttää viittauksen siihen.
+  Päättynyt, ehtoa täyttämätön elementti, joka ei sisälly mihinkään
+  tuotettavaan elementtiin, tyhjennetään ja irrotetaan heti.
+  '''
+  lukija = etree.XMLPullParser(
+    events=('start', 'end'),
+    attribute_defaults=True,
+  )
+  polku: list[str] = []
+  osumat: list[bool] = []
+  avoimia = 0  # Avoimet, ehdon täyttävät elementit.
+
+  def _tapahtumat():
+    nonlocal avoimia
+    for tapahtuma, elementti in lukija.read_events():
+      if tapahtuma == 'start':
+        polku.append(elementti.tag)
+        osumat.append(osuma := vertaa(polku))
+        avoimia += osuma
+        continue
+      polku.pop()
+      if osumat.pop():
+        avoimia -= 1
+        yield elementti
+      elif not avoimia:
+        elementti.clear()
+        if (vanhempi := elementti.getparent()) is not None:
+          vanhempi.remove(elementti)
+      # for tapahtuma, elementti in lukija.read_events
+    # def _tapahtumat
+
+  async for lohko in lohkot:
+    lukija.feed(lohko)
+    for elementti in _tapahtumat():
+      yield elementti
+      if (vanhempi := elementti.getparent()) is not None:
+        vanhempi.remove(elementti)
+  lukija.close()
+  for elementti in _tapahtumat():
+    yield elementti
+  # async def _tuota_tietueet
+
+
 @dataclass(kw_only=True)
 class XmlSanoma(RestSanoma):
   '''
   XML-tyyppisen datan käsittely vaihdettaessa.
 
-  HUOM. `lahteva`-toteutus puuttuu.
+  Saapuvan elementin lapset kohdistetaan kenttiin `_rest`-taulukon
+  avainten mukaan: nimiavaruudellinen avain (`{nimiavaruus}tagi` tai
+  `etuliite:tagi`) vastaa täsmälleen kyseistä tagia, muu avain
+  paikallista nimeä missä tahansa nimiavaruudessa. Kentän arvo voidaan
+  poimia myös XPath-lausekkeella (`xml_polut`).
+
+  Lähtevä sanoma muodostetaan `xml_tagi`-nimisenä elementtinä, jonka
+  lapsina ovat kentät samojen avainten mukaisesti; XPath-lausekkeella
+  `@nimi` poimittava kenttä kirjoitetaan attribuuttina.
   '''
 
-  def lahteva(self):
-    raise NotImplementedError
+  # Lähtevän sanoman elementin tagi; oletuksena luokan nimi.
+  xml_tagi: ClassVar[Valinnainen[str]] = ei_syotetty
+
+  # Valinnaiset, kenttäkohtaiset XPath-lausekkeet, joita käytetään
+  # lapsielementin tagin sijaan, esim. `{'id': '@id'}`.
+  xml_polut: ClassVar[Valinnainen[dict[str, str]]] = ei_syotetty
+
+  # Avaimissa ja XPath-lausekkeissa käytettävät nimiavaruuksien
+  # etuliitteet, esim. `{'h': 'urn:henkilot'}`.
+  xml_nimiavaruudet: ClassVar[Valinnainen[dict[str, str]]] = ei_syotetty
+
+  @classmethod
+  def _xml_koodekki(cls) -> '_XmlKoodekki':
+    '''
+    Palauta luokkakohtainen, käännetty XML-koodekki.
+
+    Koodekki muodostetaan uudelleen, mikäli luokan REST-koodekki
+    (ks. `RestSanoma._koodekki`) tai jokin `xml_`-asetuksista vaihtuu.
+    '''
+    # pylint: disable=no-member
+    rest = cls._koodekki()
+    koodekki = cls.__dict__.get('_XmlSanoma__xml_koodekki')
+    if koodekki is not None \
+    and koodekki.rest is rest \
+    and koodekki.asetukset == (
+      cls.xml_tagi, cls.xml_polut, cls.xml_nimiavaruudet
+    ):
+      return koodekki
+    cls.__xml_koodekki = koodekki = _XmlKoodekki.kaanna(cls, rest)
+    return koodekki
+    # def _xml_koodekki
+
+  def lahteva(self) -> etree._Element:
+    '''
+    Muodosta lähtevä XML-elementti `self._rest`-muunnostaulun mukaisesti.
+
+    Sisempi XmlSanoma kirjoitetaan kentän avaimen mukaisena
+    elementtinä ja luettelo kääre-elementtinä, jonka lapsina ovat
+    luettelon alkiot. Tyhjä arvo (None) kirjoitetaan tyhjänä
+    elementtinä; luettelotyyppinen kenttä kuitenkin jätetään pois,
+    jottei sitä tulkita saapuvana tyhjäksi luetteloksi.
+    '''
+    if self is None:
+      return None
+    return type(self)._xml_koodekki().lahteva(self)
+    # def lahteva -> etree._Element
+
+  @classmethod
+  def lahteva_virta(
+    cls,
+    lahtevat: Iterable[Union[Self, etree._Element]],
+    *,
+    juuri: str = 'sanomat',
+    lohko: int = 65536,
+  ) -> Iterator[bytes]:
+    '''
+    Kirjoita lähtevät sanomat `juuri`-elementin lapsina XML-dokumentiksi
+    `etree.xmlfile`-kirjoittimella ja tuota se noin `lohko` tavun
+    paloina.
+
+    Kerrallaan muistissa on vain yhden sanoman elementtipuu sekä
+    kirjoitettu, tuottamaton osa dokumentista.
+    '''
+    puskuri = io.BytesIO()
+
+    def _tyhjenna() -> bytes:
+      data = puskuri.getvalue()
+      puskuri.seek(0)
+      puskuri.truncate()
+      return data
+      # def _tyhjenna -> bytes
+
+    with etree.xmlfile(puskuri, encoding='utf-8') as kirjoitin:
+      kirjoitin.write_declaration()
+      with kirjoitin.element(
+        _xml_tagi(juuri, cls.xml_nimiavaruudet or {}),
+        nsmap=cls.xml_nimiavaruudet or None,
+      ):
+        for lahteva in lahtevat:
+          kirjoitin.write(
+            lahteva if isinstance(lahteva, etree._Element)
+            else lahteva.lahteva()
+          )
+          kirjoitin.flush()
+          if puskuri.tell() >= lohko:
+            yield _tyhjenna()
+          # for lahteva in lahtevat
+        # with kirjoitin.element
+      # with etree.xmlfile
+    yield _tyhjenna()
+    # def lahteva_virta -> Iterator[bytes]
 
   @classmethod
   def saapuva(cls, saapuva):
-    return super().saapuva({
-      etree.QName(lapsi.tag).localname: (
-        # Lehtielementti (paljas teksti) muunnetaan tekstimuotoon.
-        # Oksaelementti (sisempi XmlSanoma) palautetaan sellaisenaan.
-        lapsi
-        if len(lapsi)
-        else lapsi.text
-      )
-      for lapsi in saapuva
-    })
+    '''
+    Muunnetaan saapuva XML-elementti `cls`-olioksi.
+
+    Lehtielementti (paljas teksti) muunnetaan tekstimuotoon.
+    Oksaelementti (esim. sisempi XmlSanoma) annetaan kentän
+    muunnokselle sellaisenaan. Luettelotyyppisen kentän elementin
+    lapset poimitaan luetteloksi vastaavasti (tyhjä elementti: `[]`).
+    Saman kentän toistuessa käytetään viimeistä elementtiä.
+    '''
+    if isinstance(saapuva, etree._Element):
+      return cls._xml_koodekki().saapuva(saapuva)
+    # Tyhjä arvo tai valmiiksi muodostettu sanakirja.
+    return super().saapuva(saapuva)
     # def saapuva
 
+  @classmethod
+  async def saapuva_virta(
+    cls,
+    saapuvat: AsyncIterable[etree._Element],
+  ) -> AsyncIterable[Self]:
+    '''
+    Muunna virtaavasti saapuvat elementit (ks. `XmlYhteys.tuota_data`)
+    `cls`-olioiksi sitä mukaa, kuin ne on luettu.
+
+    Käyttö seuraavasti:
+    >>> async for sanoma in Tietue.saapuva_virta(
+    ...   yhteys.tuota_data('/tietueet/', avain='tietue')
+    ... ):
+    ...   ...
+    '''
+    async for saapuva in saapuvat:
+      yield cls.saapuva(saapuva)
+    # async def saapuva_virta
+
   # class XmlSanoma
+
+
+@dataclass(frozen=True)
+class _XmlKoodekki:
+  '''
+  Sanomaluokan XML-elementin muunnoksiksi käännetyt `lahteva`- ja
+  `saapuva`-rutiinit.
+
+  Elementin lapset käydään läpi kerran; kunkin tagin vastaava kenttä
+  haetaan luokkakohtaisesta välimuistista, jolloin tagin paikallista
+  nimeä ei jäsennetä lapsi kerrallaan eikä välivaiheen sanakirjaa
+  muodosteta. Kenttäkohtaiset muunnokset (esim. sisempi XmlSanoma)
+  ja XPath-lausekkeet poimitaan käännöksen yhteydessä.
+  '''
+
+  rest: _RestKoodekki
+  asetukset: tuple
+  lahteva: Callable[[XmlSanoma], etree._Element]
+  saapuva: Callable[[etree._Element], XmlSanoma]
+
+  @classmethod
+  def kaanna(cls, sanoma: type, rest: _RestKoodekki) -> Self:
+    nimiavaruudet = sanoma.xml_nimiavaruudet or {}
+    polut = sanoma.xml_polut or {}
+    tyypit = get_type_hints(sanoma)
+    luettelot: set[str] = set()
+    tarkat: dict[str, str] = {}
+    paikalliset: dict[str, str] = {}
+    tagit: dict[Any, Optional[str]] = {}
+
+    def _tagi(tagi: Any) -> Optional[str]:
+      ''' Kohdista välimuistista puuttuva tagi kenttään. '''
+      if not isinstance(tagi, str):
+        # Kommentti tai käsittelyohje.
+        nimi = None
+      elif (nimi := tarkat.get(tagi)) is None:
+        nimi = paikalliset.get(tagi.rpartition('}')[2])
+      if len(tagit) < _TAGEJA_ENINTAAN:
+        tagit[tagi] = nimi
+      return nimi
+      # def _tagi -> str
+
+    nimiavaruus = {
+      '_sanoma': sanoma,
+      '_tagit': tagit,
+      '_tagi': _tagi,
+      '_arvo': _xpath_arvo,
+      '_puuttuu': _puuttuu,
+      '_ei_syotetty': ei_syotetty,
+      '_Element': etree.Element,
+      '_tagi_lahteva': _xml_tagi(
+        sanoma.xml_tagi or sanoma.__name__, nimiavaruudet
+      ),
+      '_nsmap': nimiavaruudet or None,
+      '_lisaa': _lisaa_xml,
+      '_teksti': _xml_teksti,
+      '_luettelot': luettelot,
+    }
+    lahteva, xpath, kopiot, muunnokset = [], [], [], []
+    for indeksi, kentta in enumerate(fields(sanoma)):
+      muunnos = rest.rest.get(kentta.name, kentta.name)
+      if isinstance(muunnos, tuple):
+        (
+          avain,
+          nimiavaruus[f'_l{indeksi}'],
+          nimiavaruus[f'_s{indeksi}'],
+        ) = muunnos
+        lahteva_arvo = f'_l{indeksi}(arvo)'
+        muunnokset.append(
+          f'  if (arvo := kentat.get({kentta.name!r}, _puuttuu))'
+          ' is not _puuttuu:\n'
+          f'    kentat[{kentta.name!r}] = _s{indeksi}(arvo)\n'
+        )
+      else:
+        avain, lahteva_arvo = muunnos, 'arvo'
+      if (polku := polut.get(kentta.name)) is not None:
+        nimiavaruus[f'_x{indeksi}'] = etree.XPath(
+          polku, namespaces=nimiavaruudet
+        )
+        xpath.append(
+          f'  if (arvo := _arvo(_x{indeksi}(saapuva))) is not _puuttuu:\n'
+          f'    kentat[{kentta.name!r}] = arvo\n'
+        )
+        if _attribuutti.fullmatch(polku):
+          lahteva.append(
+            f'  if (arvo := self.{kentta.name}) is not _ei_syotetty'
+            ' and arvo is not None:\n'
+            f'    elementti.set('
+            f'{_xml_tagi(polku[1:], nimiavaruudet)!r},'
+            f' _teksti({lahteva_arvo}))\n'
+          )
+          continue
+      avain = _xml_tagi(avain, nimiavaruudet)
+      if _luettelo(tyypit.get(kentta.name, kentta.type)):
+        luettelot.add(kentta.name)
+        lahteva.append(
+          f'  if (arvo := self.{kentta.name}) is not _ei_syotetty'
+          ' and arvo is not None:\n'
+          f'    _lisaa(elementti, {avain!r}, {lahteva_arvo})\n'
+        )
+      else:
+        lahteva.append(
+          f'  if (arvo := self.{kentta.name}) is not _ei_syotetty:\n'
+          f'    _lisaa(elementti, {avain!r}, {lahteva_arvo})\n'
+        )
+      if polku is not None:
+        continue
+      kohteet = tarkat if avain.startswith('{') else paikalliset
+      if (ensimmainen := kohteet.get(avain)) is not None:
+        # Sama avain useammalle kentälle: kopioidaan arvo.
+        kopiot.append(
+          f'  if (arvo := kentat.get({ensimmainen!r}, _puuttuu))'
+          ' is not _puuttuu:\n'
+          f'    kentat[{kentta.name!r}] = arvo\n'
+        )
+      else:
+        kohteet[avain] = kentta.name
+      # for indeksi, kentta in enumerate
+
+    exec(  # pylint: disable=exec-used
+      'def lahteva(self):\n'
+      '  elementti = _Element(_tagi_lahteva, nsmap=_nsmap)\n'
+      + ''.join(lahteva)
+      + '  return elementti\n'
+      'def saapuva(saapuva):\n'
+      '  kentat = {}\n'
+      + (
+        '  for lapsi in saapuva:\n'
+        '    if (nimi := _tagit.get(tagi := lapsi.tag, _puuttuu))'
+        ' is _puuttuu:\n'
+        '      nimi = _tagi(tagi)\n'
+        '    if nimi is not None:\n'
+        + (
+          '      if nimi in _luettelot:\n'
+          '        kentat[nimi] = [\n'
+          '          alkio if len(alkio) else alkio.text\n'
+          '          for alkio in lapsi if isinstance(alkio.tag, str)\n'
+          '        ]\n'
+          '        continue\n'
+          if luettelot else ''
+        )
+        + '      kentat[nimi] = lapsi if len(lapsi) else lapsi.text\n'
+        if tarkat or paikalliset else ''
+      )
+      + ''.join(xpath)
+      + ''.join(kopiot)
+      + ''.join(muunnokset)
+      + '  return _sanoma(**kentat)\n',
+      nimiavaruus
+    )
+    return cls(
+      rest=rest,
+      asetukset=(
+        sanoma.xml_tagi, sanoma.xml_polut, sanoma.xml_nimiavaruudet
+      ),
+      lahteva=nimiavaruus['lahteva'],
+      saapuva=nimiavaruus['saapuva'],
+    )
+    # def kaanna
+
+  # class _XmlKoodekki
+
+
+def _xml_tagi(avain: str, nimiavaruudet: Mapping[str, str]) -> str:
+  ''' Muunna `etuliite:tagi`-muotoinen avain muotoon `{nimiavaruus}tagi`. '''
+  if avain.startswith('{') or ':' not in avain:
+    return avain
+  etuliite, _, paikallinen = avain.partition(':')
+  try:
+    return f'{{{nimiavaruudet[etuliite]}}}{paikallinen}'
+  except KeyError:
+    raise ValueError(
+      f'Tuntematon nimiavaruuden etuliite: {avain!r}'
+    ) from None
+  # def _xml_tagi -> str
+
+
+def _xml_teksti(arvo: Any) -> str:
+  ''' Muunna yksinkertainen arvo elementin tekstiksi. '''
+  if isinstance(arvo, bool):
+    return 'true' if arvo else 'false'
+  return str(arvo)
+  # def _xml_teksti -> str
+
+
+def _lisaa_xml(vanhempi: etree._Element, tagi: str, arvo: Any):
+  ''' Lisää kentän arvo `vanhempi`-elementin lapseksi `tagi`-nimisenä. '''
+  if isinstance(arvo, str):
+    etree.SubElement(vanhempi, tagi).text = arvo
+    return
+  elif isinstance(arvo, etree._Element):
+    # Sisemmän sanoman elementti: nimetään kentän mukaan.
+    arvo.tag = tagi
+    vanhempi.append(arvo)
+    return
+  lapsi = etree.SubElement(vanhempi, tagi)
+  if arvo is None:
+    pass
+  elif isinstance(arvo, (list, tuple)):
+    for alkio in arvo:
+      if isinstance(alkio, etree._Element):
+        lapsi.append(alkio)
+      else:
+        _lisaa_xml(lapsi, 'alkio', alkio)
+  elif isinstance(arvo, dict):
+    for avain, alkio in arvo.items():
+      _lisaa_xml(lapsi, avain, alkio)
+  else:
+    lapsi.text = _xml_teksti(arvo)
+  # def _lisaa_xml
+
+
+def _luettelo(tyyppi: Any) -> bool:
+  ''' Onko kentän tyyppi luettelo (mahdollisesti valinnainen)? '''
+  if get_origin(tyyppi) is Union:
+    tyypit = [
+      tyyppi for tyyppi in get_args(tyyppi)
+      if tyyppi is not type(None) and tyyppi is not type(ei_syotetty)
+    ]
+    if len(tyypit) != 1:
+      return False
+    tyyppi, = tyypit
+  return (get_origin(tyyppi) or tyyppi) in (list, tuple)
+  # def _luettelo -> bool
+
+
+def _xpath_arvo(tulos: Any) -> Any:
+  ''' Poimi XPath-lausekkeen tuloksesta kentän arvo. '''
+  if isinstance(tulos, list):
+    if not tulos:
+      return _puuttuu
+    tulos = tulos[0]
+  if isinstance(tulos, etree._Element):
+    return tulos if len(tulos) else tulos.text
+  elif isinstance(tulos, str):
+    # Irrotetaan tulos elementistä, johon lxml säilyttää viittauksen.
+    return str(tulos)
+  return tulos
+  # def _xpath_arvo -> Any
+
+
+# ElementPath-polun osa: erotin (`/` tai `//`) taikka tagi
+# (`{nimiavaruus}tagi`, `{*}tagi`, `tagi`, `*` tai `.`).
+_polun_osa = re.compile(r'(//?)|(\{[^}]*\}[^/{]*|[^/{]+)')
+
+# Attribuuttina kirjoitettavan kentän XPath-lauseke: `@nimi`.
+_attribuutti = re.compile(r'@[\w.-]+(:[\w.-]+)?')
+
+# Luokkakohtaiseen välimuistiin tallennettavien tagien enimmäismäärä.
+_TAGEJA_ENINTAAN = 1024
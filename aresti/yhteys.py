@@ -1,12 +1,28 @@
 import asyncio
-from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+import functools
+import io
 import pprint
-from typing import Any, Optional
+import time
+from typing import (
+  Any,
+  AsyncIterable,
+  AsyncIterator,
+  Iterable,
+  Iterator,
+  Mapping,
+  Optional,
+  Union,
+)
 
 import aiohttp
 
-from aresti.tyokalut import mittaa, kaanna_poikkeus
+from aresti.mittaus import merkitse_tulkittu, Mittaus, tuota_kontekstissa
+from aresti.rajoitin import Nopeusrajoitin
+from aresti.toisto import Toistokaytanto, toista
+from aresti.tyokalut import mittaa, kaanna_poikkeus, yhdista_samanaikaiset
+from aresti.valimuisti import HttpValimuisti
 
 
 @dataclass(kw_only=True)
@@ -27,6 +43,9 @@ class AsynkroninenYhteys:
   >>>   palvelin='https://testi.fi',
   >>>   # debug=True,  # <-- tulosta HTTP 400+ -virheviestit
   >>>   # mittaa_pyynnot=True,  # <-- mittaa pyyntöjen kesto (ks. tyokalut.py)
+  >>>   # mittaus=Mittaus(),  # <-- mittaa pyyntöjen vaiheet (ks. mittaus.py)
+  >>>   # jaettu_yhteysallas=True,  # <-- jaa yhteydet samaan palvelimeen
+  >>>   # rajoitin=Nopeusrajoitin(...),  # <-- rajoita pyyntöjen tahtia
   >>> ) as yhteys:
   >>>   data = await yhteys.nouda_data('/abc/def')
   '''
@@ -35,6 +54,68 @@ class AsynkroninenYhteys:
   debug: bool = False
   mittaa_pyynnot: Optional[bool] = None
 
+  # Yhteysaltaan (`aiohttp.TCPConnector`) asetukset: avoimien yhteyksien
+  # enimmäismäärä yhteensä ja palvelinta kohti (0 = rajoittamaton),
+  # käyttämättömän yhteyden säilytysaika sekunteina sekä
+  # nimipalvelukyselyjen välimuisti ja sen voimassaoloaika sekunteina.
+  yhteyksia_enintaan: int = 100
+  yhteyksia_palvelimelle: int = 0
+  keepalive_aika: float = 15.0
+  dns_valimuisti: bool = True
+  dns_valimuistin_kesto: Optional[int] = 10
+
+  # Pyyntöjen aikakatkaisut sekunteina: koko pyyntö, yhteyden
+  # muodostaminen ja yksittäinen luku (None = ei aikakatkaisua).
+  # Oletukset vastaavat aiohttp:n oletuksia (`DEFAULT_TIMEOUT`).
+  aikakatkaisu: Optional[float] = 300
+  yhdistamisen_aikakatkaisu: Optional[float] = 30
+  lukemisen_aikakatkaisu: Optional[float] = None
+
+  # Jaetaanko yhteysallas muiden samaa palvelinta samoin asetuksin
+  # käyttävien yhteysolioiden kanssa?
+  # Tällöin avoimet TCP- ja TLS-yhteydet ovat kaikkien käytettävissä,
+  # ja allas suljetaan vasta, kun viimeinen sitä käyttävä istunto päättyy.
+  jaettu_yhteysallas: bool = False
+
+  # Tuotetaanko luettelomuotoinen data virtaavasti sitä mukaa, kuin
+  # sitä saapuu (ks. `tuota_data`)? Kantaluokka lukee sanoman aina
+  # kokonaisuudessaan.
+  # Virtaavasti luettavaa vastausta ei voida tallentaa välimuistiin
+  # eikä jakaa usean kutsujan kesken: mikäli `valimuisti` tai
+  # `yhdista_pyynnot` on käytössä, data noudetaan tavalliseen tapaan
+  # `nouda_data`-metodilla. Virtaavan haun kesto raportoidaan
+  # `mittaa_pyynnot`-rutiinille tuotannon päätyttyä.
+  virtautus: bool = False
+
+  # Lähetetäänkö luettelomuotoinen data (esim. joukkolisäys) lohkoittain
+  # (chunked transfer encoding), kun siinä on vähintään näin monta
+  # alkiota (None = ei koskaan)? Iteraattori (esim. generaattori)
+  # lähetetään aina lohkoittain. Ks. `muodosta_data`.
+  lohkoittain_alkaen: Optional[int] = None
+
+  # Lohkoittain lähetettävän datan lohkojen vähimmäiskoko tavuina.
+  lahetyksen_lohko: int = 65536
+
+  # GET-pyyntöjen vastauksille käytettävä välimuisti (ks. `valimuisti.py`).
+  # Samaa välimuistia voidaan käyttää useamman yhteysolion kesken.
+  valimuisti: Optional[HttpValimuisti] = field(default=None, repr=False)
+
+  # Yhdistetäänkö samanaikaiset, samanlaiset HEAD-, OPTIONS- ja
+  # GET-pyynnöt yhdeksi pyynnöksi, jonka tulos jaetaan kaikille
+  # kutsujille (ks. `tyokalut.yhdista_samanaikaiset`)?
+  yhdista_pyynnot: bool = False
+
+  # Epäonnistuneiden pyyntöjen uudelleenyrityskäytäntö (ks. `toisto.py`).
+  toisto: Optional[Toistokaytanto] = None
+
+  # Pyyntöjen tahdin ja samanaikaisuuden rajoitin (ks. `rajoitin.py`).
+  # Samaa rajoitinta voidaan käyttää useamman yhteysolion kesken.
+  rajoitin: Optional[Nopeusrajoitin] = field(default=None, repr=False)
+
+  # Pyyntöjen vaiheittainen mittaus (ks. `mittaus.py`).
+  # Samaa mittausta voidaan käyttää useamman yhteysolion kesken.
+  mittaus: Optional[Mittaus] = field(default=None, repr=False)
+
   # Huom. ei määritellä datakenttinä kantaluokassa.
   # Python dataclass-toteutus periyttää moninperityn luokan kenttien
   # oletusarvot väärin kantaluokasta.
@@ -50,7 +131,7 @@ class AsynkroninenYhteys:
     # pylint: disable=attribute-defined-outside-init
     async with self._istunto_lukitus:
       if not (istunto_avoinna := self._istunto_avoinna):
-        self._istunto = aiohttp.ClientSession()
+        self._istunto = self._avaa_istunto()
       self._istunto_avoinna = istunto_avoinna + 1
     return self
     # async def __aenter__
@@ -59,11 +140,86 @@ class AsynkroninenYhteys:
     # pylint: disable=attribute-defined-outside-init
     async with self._istunto_lukitus:
       if not (istunto_avoinna := self._istunto_avoinna - 1):
-        await self._istunto.close()
+        await self._sulje_istunto()
         del self._istunto
       self._istunto_avoinna = istunto_avoinna
     # async def __aexit__
 
+  def _yhteysaltaan_asetukset(self) -> dict[str, Any]:
+    return {
+      'limit': self.yhteyksia_enintaan,
+      'limit_per_host': self.yhteyksia_palvelimelle,
+      'keepalive_timeout': self.keepalive_aika,
+      'use_dns_cache': self.dns_valimuisti,
+      'ttl_dns_cache': self.dns_valimuistin_kesto,
+    }
+    # def _yhteysaltaan_asetukset -> dict[str, Any]
+
+  def _istunnon_asetukset(self) -> dict[str, Any]:
+    return {
+      'timeout': aiohttp.ClientTimeout(
+        total=self.aikakatkaisu,
+        sock_connect=self.yhdistamisen_aikakatkaisu,
+        sock_read=self.lukemisen_aikakatkaisu,
+      ),
+      'trace_configs': self._jaljitys(),
+    }
+    # def _istunnon_asetukset -> dict[str, Any]
+
+  def _jaljitys(self) -> list[aiohttp.TraceConfig]:
+    ''' Istunnon pyyntöjä seuraavat jäljitysasetukset. '''
+    jaljitys = []
+    if self.rajoitin is not None:
+      jaljitys.append(self.rajoitin.jaljitys())
+    if self.mittaus is not None:
+      jaljitys.append(self.mittaus.jaljitys())
+    return jaljitys
+    # def _jaljitys -> list[aiohttp.TraceConfig]
+
+  def _avaa_istunto(self) -> aiohttp.ClientSession:
+    '''
+    Avaa istunto joko omalla tai jaetulla yhteysaltaalla.
+
+    Jaettu allas yksilöidään tapahtumasilmukan, palvelimen ja
+    yhteysaltaan asetusten mukaan.
+    '''
+    # pylint: disable=attribute-defined-outside-init
+    asetukset = self._yhteysaltaan_asetukset()
+    if not self.jaettu_yhteysallas:
+      return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(**asetukset),
+        **self._istunnon_asetukset(),
+      )
+    self._yhteysallas_avain = avain = (
+      asyncio.get_running_loop(),
+      self.palvelin,
+      tuple(asetukset.items()),
+    )
+    try:
+      jaettu = _jaetut_yhteysaltaat[avain]
+    except KeyError:
+      jaettu = _jaetut_yhteysaltaat[avain] = [
+        aiohttp.TCPConnector(**asetukset), 0
+      ]
+    jaettu[1] += 1
+    return aiohttp.ClientSession(
+      connector=jaettu[0],
+      connector_owner=False,
+      **self._istunnon_asetukset(),
+    )
+    # def _avaa_istunto -> aiohttp.ClientSession
+
+  async def _sulje_istunto(self):
+    await self._istunto.close()
+    if not self.jaettu_yhteysallas:
+      return
+    jaettu = _jaetut_yhteysaltaat[avain := self._yhteysallas_avain]
+    jaettu[1] -= 1
+    if not jaettu[1]:
+      del _jaetut_yhteysaltaat[avain]
+      await jaettu[0].close()
+    # async def _sulje_istunto
+
   @dataclass(kw_only=True)
   class Poikkeus(RuntimeError):
     sanoma: Optional[aiohttp.ClientResponse] = None
@@ -123,10 +279,53 @@ class AsynkroninenYhteys:
   async def muodosta_data(
     self,
     data: Any
-  ) -> bytes:
+  ) -> Union[bytes, AsyncIterable[bytes], io.IOBase]:
+    '''
+    Muodosta lähetettävä data.
+
+    Asynkroninen tavulohkojen iteraattori ja tiedosto-olio lähetetään
+    sellaisenaan, lohkoittain. Aliluokka voi palauttaa samoin
+    lohkoittain muodostettavan datan (ks. `_lohkoittain`).
+    '''
+    if isinstance(data, (AsyncIterable, io.IOBase)):
+      return data
     return bytes(data)
     # async def muodosta_data
 
+  def _lahetetaan_lohkoittain(self, data: Any) -> bool:
+    ''' Muodostetaanko luettelomuotoinen data lohkoittain? '''
+    if isinstance(data, Iterator):
+      return True
+    return (
+      isinstance(data, (list, tuple))
+      and self.lohkoittain_alkaen is not None
+      and len(data) >= self.lohkoittain_alkaen
+    )
+    # def _lahetetaan_lohkoittain -> bool
+
+  async def _lohkoittain(
+    self,
+    osat: Iterable[bytes],
+  ) -> AsyncIterator[bytes]:
+    '''
+    Kokoa muodostettavan datan osat vähintään `lahetyksen_lohko`
+    tavun lohkoiksi.
+
+    Osat muodostetaan vasta sitä mukaa, kuin aiohttp lähettää
+    edellisiä lohkoja, joten muistissa on kerrallaan vain
+    lähettämättömät lohkot.
+    '''
+    lohko, koko = [], 0
+    for osa in osat:
+      lohko.append(osa)
+      koko += len(osa)
+      if koko >= self.lahetyksen_lohko:
+        yield b''.join(lohko)
+        lohko, koko = [], 0
+    if lohko:
+      yield b''.join(lohko)
+    # async def _lohkoittain -> AsyncIterator[bytes]
+
   async def _pyynnon_otsakkeet(
     self, **kwargs
   ) -> dict[str, str]:
@@ -149,6 +348,8 @@ class AsynkroninenYhteys:
       return await self.tulkitse_data(sanoma)
     except Exception:
       return await sanoma.text()
+    finally:
+      merkitse_tulkittu()
     # async def _tulkitse_sanoma
 
   @property
@@ -158,11 +359,25 @@ class AsynkroninenYhteys:
       raise ValueError('Istuntoa ei ole avattu (async with ...)!')
     if not self.palvelin:
       raise ValueError('Palvelinta ei ole asetettu!')
-    yield
+    with (
+      self.mittaus.pyynto() if self.mittaus is not None else nullcontext()
+    ):
+      if self.rajoitin is None:
+        yield lambda: None
+        return
+      # Palautetaan rutiini, jolla virtaava haku voi vapauttaa
+      # rajoittimen paikan ennen sanoman lukemista loppuun.
+      vapauta = await self.rajoitin.varaa()
+      try:
+        yield vapauta
+      finally:
+        vapauta()
     # async def _pyynto
 
   @kaanna_poikkeus
   @mittaa
+  @yhdista_samanaikaiset
+  @toista('HEAD')
   async def nouda_otsakkeet(
     self,
     polku: str,
@@ -187,6 +402,8 @@ class AsynkroninenYhteys:
 
   @kaanna_poikkeus
   @mittaa
+  @yhdista_samanaikaiset
+  @toista('OPTIONS')
   async def nouda_meta(
     self,
     polku: str,
@@ -209,6 +426,8 @@ class AsynkroninenYhteys:
 
   @kaanna_poikkeus
   @mittaa
+  @yhdista_samanaikaiset
+  @toista('GET')
   async def nouda_data(
     self,
     polku: str,
@@ -217,21 +436,150 @@ class AsynkroninenYhteys:
     headers: Optional[dict[str, str]] = None,
     **kwargs
   ) -> Any:
+    osoite = self.palvelin + polku if suhteellinen else polku
+    otsakkeet = await self._pyynnon_otsakkeet(
+      metodi='GET',
+      polku=polku,
+      **headers or {},
+    )
+    if (valimuisti := self.valimuisti) is None:
+      async with self._pyynto, self._istunto.get(
+        osoite,
+        headers=otsakkeet,
+        **kwargs,
+      ) as sanoma:
+        return await self._tulkitse_sanoma('GET', sanoma)
+        # async with self._istunto.get
+
+    # Palauta tuore vastaus välimuistista tai vahvista vanhentunut.
+    avain = valimuisti.avain(osoite, kwargs.get('params'), otsakkeet)
+    if (tietue := valimuisti.hae(avain)) is not None:
+      if tietue.tuore_asti > time.monotonic():
+        valimuisti.osumat += 1
+        return tietue.data
+      otsakkeet = {**otsakkeet, **tietue.ehdot()}
     async with self._pyynto, self._istunto.get(
-      self.palvelin + polku if suhteellinen else polku,
-      headers=await self._pyynnon_otsakkeet(
-        metodi='GET',
-        polku=polku,
-        **headers or {},
-      ),
+      osoite,
+      headers=otsakkeet,
       **kwargs,
     ) as sanoma:
-      return await self._tulkitse_sanoma('GET', sanoma)
+      if sanoma.status == 304 and tietue is not None:
+        valimuisti.vahvistukset += 1
+        valimuisti.vahvista(tietue, sanoma)
+        return tietue.data
+      valimuisti.ohitukset += 1
+      data = await self._tulkitse_sanoma('GET', sanoma)
+      valimuisti.tallenna(avain, data, sanoma)
+      return data
       # async with self._istunto.get
     # async def nouda_data
 
+  async def tuota_data(
+    self,
+    polku: str,
+    *,
+    avain: Optional[str] = None,
+    muut: Optional[dict] = None,
+    suhteellinen: bool = True,
+    **kwargs
+  ) -> AsyncIterable:
+    '''
+    Nouda luettelomuotoinen data ja tuota sen alkiot.
+
+    Mikäli `avain` on annettu, data on kuvaus, jonka tämän avaimen
+    kohdalta alkiot poimitaan. Kuvauksen muut avaimet tallennetaan
+    tällöin `muut`-sanakirjaan; `avain`-kohtaan tallennetaan tuotettujen
+    alkioiden määrä.
+
+    Kantaluokan toteutus noutaa datan kokonaisuudessaan `nouda_data`-
+    metodilla; aliluokka voi tuottaa alkiot virtaavasti.
+    '''
+    for alkio in self._poimi_alkiot(
+      await self.nouda_data(polku, suhteellinen=suhteellinen, **kwargs),
+      avain=avain,
+      muut=muut,
+    ):
+      yield alkio
+    # async def tuota_data
+
+  def _virtaava_haku(self) -> bool:
+    ''' Luetaanko `tuota_data`-haku virtaavasti? Ks. `virtautus`. '''
+    return self.virtautus \
+    and self.valimuisti is None \
+    and not self.yhdista_pyynnot
+    # def _virtaava_haku -> bool
+
+  async def _tuota_toistaen(
+    self,
+    tuota: functools.partial,
+  ) -> AsyncIterable:
+    '''
+    Tuota virtaavasti luettavan GET-pyynnön (`tuota()`) alkiot erinä
+    (luetteloina) sellaisina, kuin `tuota()` ne tuottaa.
+
+    Keskeytynyt pyyntö yritetään tarvittaessa uudelleen `toisto`-
+    käytännön mukaisesti; jo tuotetut alkiot ohitetaan tällöin.
+
+    Haun kokonaiskesto raportoidaan `mittaa_pyynnot`-rutiinille
+    kuten `mittaa`-koristeessa.
+    '''
+    yritys = tuotettu = ohitettava = 0
+    alku = time.perf_counter()
+    try:
+      while True:
+        try:
+          async for era in tuota_kontekstissa(tuota(), yritys=yritys):
+            if ohitettava:
+              ohitettu = min(ohitettava, len(era))
+              ohitettava -= ohitettu
+              if not (era := era[ohitettu:]):
+                continue
+            tuotettu += len(era)
+            yield era
+          return
+        except Exception as exc:  # pylint: disable=broad-except
+          if self.toisto is None \
+          or 'GET' not in self.toisto.metodit \
+          or (odotus := self.toisto.odotusaika(
+            exc.__cause__ or exc, yritys
+          )) is None:
+            raise
+        yritys += 1
+        ohitettava = tuotettu
+        await asyncio.sleep(odotus)
+        # while True
+    finally:
+      if mittaa_pyynnot := self.mittaa_pyynnot:
+        mittaa_pyynnot(tuota.func, tuota.args, time.perf_counter() - alku)
+      # finally
+    # async def _tuota_toistaen
+
+  @staticmethod
+  def _poimi_alkiot(
+    data: Any,
+    *,
+    avain: Optional[str],
+    muut: Optional[dict],
+  ) -> Iterable:
+    '''
+    Poimi kokonaisuudessaan luetusta datasta `tuota_data`-metodin
+    mukaiset alkiot.
+    '''
+    if avain is None:
+      return data
+    elif not isinstance(data, Mapping):
+      raise TypeError(f'Data ei ole kuvaus: {type(data)!r}!')
+    alkiot = data.get(avain) or ()
+    if muut is not None:
+      muut.update(data)
+      if avain in data:
+        muut[avain] = len(alkiot)
+    return alkiot
+    # def _poimi_alkiot -> Iterable
+
   @kaanna_poikkeus
   @mittaa
+  @toista('POST')
   async def lisaa_data(
     self,
     polku: str,
@@ -258,6 +606,7 @@ class AsynkroninenYhteys:
 
   @kaanna_poikkeus
   @mittaa
+  @toista('PATCH')
   async def muuta_data(
     self,
     polku: str,
@@ -284,6 +633,7 @@ class AsynkroninenYhteys:
 
   @kaanna_poikkeus
   @mittaa
+  @toista('DELETE')
   async def tuhoa_data(
     self,
     polku: str,
@@ -304,3 +654,7 @@ class AsynkroninenYhteys:
     # async def tuhoa_data
 
   # class AsynkroninenYhteys
+
+
+# Jaetut yhteysaltaat ja niitä käyttävien istuntojen määrät.
+_jaetut_yhteysaltaat: dict[tuple, list] = {}
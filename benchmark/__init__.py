@@ -0,0 +1,11 @@
+'''
+Aresti-paketin suorituskykymittaukset.
+
+Mittaukset ajetaan paikallista, REST-rajapintaa jäljittelevää
+aiohttp-palvelinta (`palvelin.Vastinpalvelin`) vasten, ja tulokset
+tallennetaan JSON-muodossa myöhempää vertailua varten.
+
+Käyttö seuraavasti:
+  python -m benchmark [--osiot sanoma nouda ...] [--tulos tulos.json]
+  python -m benchmark --vertaa aiempi.json
+'''
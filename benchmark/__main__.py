@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import Any, Optional
+
+from . import __doc__ as kuvaus
+from .mittari import Mittari
+from .osiot import Asetukset, OSIOT
+from .palvelin import Vastinpalvelin
+
+
+def _versio() -> Optional[str]:
+  ''' Mitattavan version git-tunniste, mikäli saatavilla. '''
+  try:
+    return subprocess.run(
+      ['git', 'describe', '--always', '--dirty'],
+      capture_output=True,
+      check=True,
+      text=True,
+    ).stdout.strip() or None
+  except (OSError, subprocess.CalledProcessError):
+    return None
+  # def _versio -> Optional[str]
+
+
+def _avain(tulos: dict[str, Any]) -> tuple:
+  return (
+    tulos['osio'],
+    tulos['nimi'],
+    json.dumps(tulos['parametrit'], sort_keys=True),
+  )
+  # def _avain -> tuple
+
+
+def vertaa(tulokset: list[dict[str, Any]], aiemmat: list[dict[str, Any]]):
+  ''' Tulosta läpäisyn ja mediaaniviiveen muutos aiempaan ajoon nähden. '''
+  aiemmat = {_avain(tulos): tulos for tulos in aiemmat}
+  print()
+  print(f'{"osio":<10} {"nimi":<44} {"op/s":>10} {"p50":>10}')
+  for tulos in tulokset:
+    if (aiempi := aiemmat.get(_avain(tulos))) is None:
+      continue
+    lapaisy = tulos['operaatiota_s'] / (aiempi['operaatiota_s'] or 1)
+    viive = tulos['viive_ms']['p50'] / (aiempi['viive_ms']['p50'] or 1)
+    nimi = tulos['nimi']
+    if (rinnakkain := tulos['parametrit'].get('rinnakkain')) is not None:
+      nimi = f'{nimi} [{rinnakkain}]'
+    print(
+      f'{tulos["osio"]:<10} {nimi:<44}'
+      f' {lapaisy:>9.2f}x {viive:>9.2f}x'
+    )
+  # def vertaa
+
+
+async def mittaa(
+  osiot: list[str],
+  *,
+  mittari: Mittari,
+  palvelin: Optional[str],
+  **asetukset
+):
+  ''' Suorita annetut osiot joko omaa tai ulkoista palvelinta vasten. '''
+  if palvelin is not None:
+    for osio in osiot:
+      await OSIOT[osio](mittari, Asetukset(palvelin=palvelin, **asetukset))
+    return
+  async with Vastinpalvelin() as vastinpalvelin:
+    await mittaa(
+      osiot,
+      mittari=mittari,
+      palvelin=vastinpalvelin.osoite,
+      **asetukset
+    )
+  # async def mittaa
+
+
+def main():
+  jasennin = argparse.ArgumentParser(
+    prog='python -m benchmark',
+    description=kuvaus,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+  )
+  jasennin.add_argument(
+    '--osiot', nargs='+', choices=list(OSIOT), default=list(OSIOT),
+    help='suoritettavat osiot (oletuksena kaikki)',
+  )
+  jasennin.add_argument(
+    '--tulos', default=None,
+    help='tulostiedosto (oletuksena tulos-<aika>.json)',
+  )
+  jasennin.add_argument(
+    '--vertaa', default=None,
+    help='aiempi tulostiedosto, johon tuloksia verrataan',
+  )
+  jasennin.add_argument(
+    '--palvelin', default=None,
+    help='ulkoisen vastinpalvelimen osoite (ks. benchmark.palvelin)',
+  )
+  jasennin.add_argument(
+    '--kesto', type=float, default=0.5,
+    help='synkronisen mittauksen vähimmäiskesto sekunteina',
+  )
+  jasennin.add_argument(
+    '--viive', type=float, default=0.005,
+    help='palvelimen vastausten viive sekunteina',
+  )
+  jasennin.add_argument(
+    '--kutsuja', type=int, default=200,
+    help='HTTP-kutsujen määrä rinnakkaisuustasoa kohti',
+  )
+  jasennin.add_argument(
+    '--rinnakkain', type=int, nargs='+', default=[1, 8, 32],
+    help='mitattavat rinnakkaisuustasot',
+  )
+  parametrit = jasennin.parse_args()
+
+  aika = datetime.datetime.now(datetime.timezone.utc)
+  mittari = Mittari(kesto=parametrit.kesto)
+  asetukset = {
+    'viive': parametrit.viive,
+    'kutsuja': parametrit.kutsuja,
+    'rinnakkain': tuple(parametrit.rinnakkain),
+  }
+  asyncio.run(mittaa(
+    parametrit.osiot,
+    mittari=mittari,
+    palvelin=parametrit.palvelin,
+    **asetukset,
+  ))
+
+  tiedosto = parametrit.tulos or f'tulos-{aika:%Y%m%d-%H%M%S}.json'
+  with open(tiedosto, 'w', encoding='utf-8') as tulos:
+    json.dump({
+      'aika': aika.isoformat(),
+      'versio': _versio(),
+      'python': sys.version,
+      'alusta': platform.platform(),
+      'asetukset': {**asetukset, 'kesto': parametrit.kesto},
+      'tulokset': mittari.tulokset,
+    }, tulos, ensure_ascii=False, indent=2)
+  print('Tulokset tallennettu:', tiedosto)
+
+  if parametrit.vertaa:
+    with open(parametrit.vertaa, encoding='utf-8') as aiempi:
+      vertaa(mittari.tulokset, json.load(aiempi)['tulokset'])
+  # def main
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+import statistics
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable
+
+from aresti.tyokalut import suorita_rinnakkain
+
+
+@dataclass(kw_only=True)
+class Mittari:
+  '''
+  Mittausten suoritus ja tulosten kirjaus.
+
+  Kustakin mittauksesta kirjataan operaatioiden määrä, kokonaiskesto,
+  läpäisy (operaatiota sekunnissa) sekä yksittäisten kutsujen
+  viiveiden jakauma millisekunteina.
+  '''
+
+  # Synkronisen mittauksen vähimmäiskesto sekunteina.
+  kesto: float = 0.5
+
+  # Tulostetaanko tulokset sitä mukaa, kuin niitä valmistuu?
+  tulosta: bool = True
+
+  tulokset: list[dict[str, Any]] = field(default_factory=list)
+
+  def _kirjaa(
+    self,
+    osio: str,
+    nimi: str,
+    *,
+    viiveet: list[int],
+    kesto: int,
+    operaatioita: int,
+    parametrit: dict[str, Any],
+  ) -> dict[str, Any]:
+    viiveet = sorted(viiveet)
+    persentiilit = (
+      statistics.quantiles(viiveet, n=100, method='inclusive')
+      if len(viiveet) > 1
+      else viiveet * 99
+    )
+    tulos = {
+      'osio': osio,
+      'nimi': nimi,
+      'parametrit': parametrit,
+      'kutsuja': len(viiveet),
+      'operaatioita': operaatioita,
+      'kesto_s': kesto / 1e9,
+      'operaatiota_s': operaatioita / (kesto / 1e9) if kesto else 0.0,
+      'viive_ms': {
+        'keskiarvo': statistics.fmean(viiveet) / 1e6,
+        'p50': persentiilit[49] / 1e6,
+        'p95': persentiilit[94] / 1e6,
+        'p99': persentiilit[98] / 1e6,
+        'suurin': viiveet[-1] / 1e6,
+      },
+    }
+    self.tulokset.append(tulos)
+    if self.tulosta:
+      if (rinnakkain := parametrit.get('rinnakkain')) is not None:
+        nimi = f'{nimi} [{rinnakkain}]'
+      print(
+        f'{osio:<10} {nimi:<44}'
+        f' {tulos["operaatiota_s"]:>14,.1f} op/s'
+        f' p50 {tulos["viive_ms"]["p50"]:>10.3f} ms'
+        f' p99 {tulos["viive_ms"]["p99"]:>10.3f} ms'
+      )
+    return tulos
+    # def _kirjaa -> dict[str, Any]
+
+  def synkroninen(
+    self,
+    osio: str,
+    nimi: str,
+    rutiini: Callable[[], Any],
+    *,
+    operaatioita: int = 1,
+    **parametrit
+  ) -> dict[str, Any]:
+    '''
+    Kutsu rutiinia toistuvasti vähintään `kesto` sekunnin ajan.
+
+    `operaatioita` kertoo, montaa operaatiota (esim. tietuetta)
+    kukin kutsu vastaa.
+    '''
+    rutiini()  # Lämmitetään välimuistit.
+    viiveet = []
+    alku = nyt = perf_counter_ns()
+    loppu = alku + int(self.kesto * 1e9)
+    while nyt < loppu or len(viiveet) < 3:
+      rutiini()
+      viiveet.append((valmis := perf_counter_ns()) - nyt)
+      nyt = valmis
+    return self._kirjaa(
+      osio,
+      nimi,
+      viiveet=viiveet,
+      kesto=nyt - alku,
+      operaatioita=operaatioita * len(viiveet),
+      parametrit=parametrit,
+    )
+    # def synkroninen -> dict[str, Any]
+
+  async def rinnakkainen(
+    self,
+    osio: str,
+    nimi: str,
+    rutiini: Callable[[], Awaitable],
+    *,
+    kutsuja: int,
+    rinnakkain: int = 1,
+    operaatioita: int = 1,
+    **parametrit
+  ) -> dict[str, Any]:
+    '''
+    Kutsu asynkronista rutiinia `kutsuja` kertaa siten, että kesken on
+    kerrallaan enintään `rinnakkain` kutsua.
+    '''
+    await rutiini()  # Avataan yhteydet ja lämmitetään välimuistit.
+    viiveet = []
+
+    async def _mitattu():
+      kutsuttu = perf_counter_ns()
+      await rutiini()
+      viiveet.append(perf_counter_ns() - kutsuttu)
+      # async def _mitattu
+
+    alku = perf_counter_ns()
+    for virhe in await suorita_rinnakkain(
+      (_mitattu for _ in range(kutsuja)),
+      enintaan=rinnakkain,
+    ):
+      if isinstance(virhe, Exception):
+        raise virhe
+    return self._kirjaa(
+      osio,
+      nimi,
+      viiveet=viiveet,
+      kesto=perf_counter_ns() - alku,
+      operaatioita=operaatioita * kutsuja,
+      parametrit={'rinnakkain': rinnakkain, **parametrit},
+    )
+    # async def rinnakkainen -> dict[str, Any]
+
+  # class Mittari
@@ -0,0 +1,445 @@
+'''
+Mittausosiot.
+
+Kukin osio on asynkroninen rutiini, joka saa parametreinaan
+mittarin sekä mittausasetukset.
+'''
+# pylint: disable=cell-var-from-loop
+
+from dataclasses import asdict, dataclass, field
+import importlib.util
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from aresti import (
+  AvainSivutus,
+  JsonYhteys,
+  periyta,
+  Rajapinta,
+  RestSanoma,
+  RestValintakentta,
+  SivutettuYhteys,
+  Sivutus,
+)
+from aresti.json import _json_kirjasto
+
+from .mittari import Mittari
+from .palvelin import tietue, xml_tietue
+from .vanha import VanhaRestSanoma
+
+
+@dataclass(kw_only=True)
+class Asetukset:
+  ''' Osioille yhteiset mittausasetukset. '''
+
+  # Vastinpalvelimen osoite.
+  palvelin: str
+
+  # Palvelimen vastausten viive sekunteina.
+  viive: float = 0.005
+
+  # HTTP-mittausten kutsumäärä rinnakkaisuustasoa kohti.
+  kutsuja: int = 200
+
+  # Mitattavat rinnakkaisuustasot.
+  rinnakkain: tuple[int, ...] = (1, 8, 32)
+
+  # Sivutettujen tietueiden kokonaismäärä (ks. `Vastinpalvelin`).
+  tietueita: int = 1000
+
+  # class Asetukset
+
+
+class Tila(RestValintakentta):
+  AKTIIVINEN = 'aktiivinen'
+  PASSIIVINEN = 'passiivinen'
+
+
+def _sanomat(kanta: type) -> tuple[type, type]:
+  ''' Muodosta mittauksissa käytettävät sanomaluokat annetusta kannasta. '''
+  # pylint: disable=redefined-outer-name
+
+  @dataclass(kw_only=True)
+  class Osoite(kanta):
+    rest_muunnos = {'katu': 'katuosoite'}
+    katu: str
+    postinumero: str
+    kaupunki: str
+
+  @dataclass(kw_only=True)
+  class Henkilo(kanta):
+    rest_muunnos = {'sahkoposti': 'sahkopostiosoite'}
+    id: int
+    nimi: str
+    sahkoposti: str
+    tila: Tila
+    pisteet: float
+    lisatiedot: Optional[str] = None
+    osoitteet: list[Osoite] = field(default_factory=list)
+
+  return Osoite, Henkilo
+  # def _sanomat -> tuple[type, type]
+
+
+Osoite, Henkilo = _sanomat(RestSanoma)
+VanhaOsoite, VanhaHenkilo = _sanomat(VanhaRestSanoma)
+
+
+@dataclass(kw_only=True)
+class SivutettuJsonYhteys(SivutettuYhteys, JsonYhteys):
+  pass
+
+
+class Henkilot(Rajapinta):
+  Syote = Henkilo
+  Tuloste = Henkilo
+
+  class Meta(Rajapinta.Meta):
+    rajapinta = '/json/'
+
+  # class Henkilot
+
+
+async def sanoma(mittari: Mittari, asetukset: Asetukset):
+  '''
+  `RestSanoma.saapuva` ja `lahteva`: käännetty koodekki verrattuna
+  alkuperäiseen, generaattoreihin perustuvaan toteutukseen.
+  '''
+  # pylint: disable=unused-argument
+  data = [tietue(i) for i in range(1000)]
+  sanomat = Henkilo.saapuva_joukko(data)
+  vanhat = [VanhaHenkilo.saapuva(alkio) for alkio in data]
+  assert [s.lahteva() for s in sanomat] == [s.lahteva() for s in vanhat]
+
+  for nimi, rutiini in (
+    ('saapuva (vanha)', lambda: [VanhaHenkilo.saapuva(a) for a in data]),
+    ('saapuva', lambda: [Henkilo.saapuva(a) for a in data]),
+    ('saapuva_joukko', lambda: Henkilo.saapuva_joukko(data)),
+    ('lahteva (vanha)', lambda: [s.lahteva() for s in vanhat]),
+    ('lahteva', lambda: [s.lahteva() for s in sanomat]),
+  ):
+    mittari.synkroninen(
+      'sanoma', nimi, rutiini, operaatioita=len(data), tietueita=len(data)
+    )
+  # async def sanoma
+
+
+async def json_kirjastot(mittari: Mittari, asetukset: Asetukset):
+  ''' JSON-kirjastojen (`JsonYhteys.json_kirjasto`) vertailu. '''
+  # pylint: disable=unused-argument
+  data = [tietue(i) for i in range(1000)]
+  tavut = json.dumps(data).encode()
+  for kirjasto in ('json', 'orjson', 'ujson', 'msgspec'):
+    if importlib.util.find_spec(kirjasto) is None:
+      continue
+    muodosta, tulkitse = _json_kirjasto(kirjasto)
+    mittari.synkroninen(
+      'json', f'tulkinta ({kirjasto})', lambda: tulkitse(tavut),
+      tavuja=len(tavut),
+    )
+    mittari.synkroninen(
+      'json', f'muodostus ({kirjasto})', lambda: muodosta(data),
+      tavuja=len(tavut),
+    )
+    # for kirjasto in
+  # async def json_kirjastot
+
+
+async def periytys(mittari: Mittari, asetukset: Asetukset):
+  ''' `periyta`-kuvaajan haku välimuistista ja ilman. '''
+  # pylint: disable=unused-argument
+
+  class Ulompi:
+    @periyta
+    class Sisempi:
+      pass
+
+  @dataclass(kw_only=True)
+  class UlompiDataluokka:
+    a: int = 0
+
+    @periyta
+    @dataclass(kw_only=True)
+    class Sisempi:
+      b: int = 0
+
+  for nimi, ulompi in (
+    ('luokka', Ulompi),
+    ('dataluokka', UlompiDataluokka),
+  ):
+    kuvaaja = vars(ulompi)['Sisempi']
+    mittari.synkroninen(
+      'periyta', f'{nimi} (välimuistista)', lambda: ulompi.Sisempi
+    )
+    mittari.synkroninen(
+      'periyta',
+      f'{nimi} (muodostetaan)',
+      lambda: (
+        vars(ulompi).get(kuvaaja._avain)
+        and delattr(ulompi, kuvaaja._avain),
+        ulompi.Sisempi,
+      ),
+    )
+    # for nimi, ulompi in
+  # async def periytys
+
+
+async def nouda(mittari: Mittari, asetukset: Asetukset):
+  ''' `JsonYhteys.nouda_data` eri vastauskoilla ja rinnakkaisuuksilla. '''
+  for koko in (10, 1000):
+    params = {'koko': koko, 'viive': asetukset.viive}
+    async with JsonYhteys(palvelin=asetukset.palvelin) as yhteys:
+      for rinnakkain in asetukset.rinnakkain:
+        await mittari.rinnakkainen(
+          'nouda',
+          f'nouda_data ({koko} tietuetta)',
+          lambda: yhteys.nouda_data('/json/', params=params),
+          kutsuja=asetukset.kutsuja,
+          rinnakkain=rinnakkain,
+          **params,
+        )
+    async with JsonYhteys(
+      palvelin=asetukset.palvelin,
+      virtautus=True,
+    ) as yhteys:
+
+      async def _virtaavasti():
+        return [a async for a in yhteys.tuota_data('/json/', params=params)]
+
+      await mittari.rinnakkainen(
+        'nouda',
+        f'tuota_data, virtautus ({koko} tietuetta)',
+        _virtaavasti,
+        kutsuja=asetukset.kutsuja,
+        rinnakkain=max(asetukset.rinnakkain),
+        **params,
+      )
+    # for koko in
+  # async def nouda
+
+
+async def sivutus(mittari: Mittari, asetukset: Asetukset):
+  ''' `SivutettuYhteys.nouda_sivutettu_data` eri sivutustavoilla. '''
+  params = {'viive': asetukset.viive}
+  for nimi, polku, yhteyden_asetukset in (
+    ('linkit', '/linkit/', {}),
+    ('linkit, ennakoiden', '/linkit/', {'ennakoivat_sivut': 4}),
+    ('linkit, virtautus', '/linkit/', {'virtautus': True}),
+    ('sivunumerot', '/sivut/', {
+      'valittu_sivu_avain': 'page',
+      'seuraava_sivu_avain': None,
+    }),
+    ('sivunumerot, rinnakkain', '/sivut/', {
+      'valittu_sivu_avain': 'page',
+      'seuraava_sivu_avain': None,
+      'rinnakkaiset_sivut': 8,
+    }),
+    ('avaimet', '/avaimet/', {
+      'tulokset_avain': None,
+      'sivutus': AvainSivutus(raja=100),
+    }),
+    ('avaimet, ennakoiden', '/avaimet/', {
+      'tulokset_avain': None,
+      'sivutus': AvainSivutus(raja=100),
+      'ennakoivat_sivut': 4,
+    }),
+  ):
+    async with SivutettuJsonYhteys(
+      palvelin=asetukset.palvelin,
+      **yhteyden_asetukset,
+    ) as yhteys:
+      await mittari.rinnakkainen(
+        'sivutus',
+        nimi,
+        lambda: yhteys.nouda_sivutettu_data(polku, params=dict(params)),
+        kutsuja=max(1, asetukset.kutsuja // 40),
+        operaatioita=asetukset.tietueita,
+        **params,
+        **{
+          avain: repr(arvo) if isinstance(arvo, Sivutus) else arvo
+          for avain, arvo in yhteyden_asetukset.items()
+        },
+      )
+    # for nimi, polku, yhteyden_asetukset in
+  # async def sivutus
+
+
+async def xml(mittari: Mittari, asetukset: Asetukset):
+  '''
+  `XmlSanoma.saapuva` ja `lahteva` sekä `XmlYhteys.nouda_data` ja
+  `tuota_data`.
+  '''
+  # pylint: disable=import-outside-toplevel
+  try:
+    from lxml import etree
+    from aresti import XmlSanoma, XmlYhteys
+  except ImportError:
+    return
+
+  class VanhaXmlSanoma(RestSanoma):
+    ''' Alkuperäinen, välivaiheen sanakirjaan perustuva muunnos. '''
+    @classmethod
+    def saapuva(cls, saapuva):
+      return super().saapuva({
+        etree.QName(lapsi.tag).localname: (
+          lapsi
+          if len(lapsi)
+          else lapsi.text
+        )
+        for lapsi in saapuva
+      })
+      # def saapuva
+    # class VanhaXmlSanoma
+
+  def _xml_sanomat(kanta: type) -> type:
+    # pylint: disable=redefined-outer-name
+
+    @dataclass(kw_only=True)
+    class XmlOsoite(kanta):
+      katuosoite: str
+      postinumero: str
+      kaupunki: str
+
+    @dataclass(kw_only=True)
+    class XmlHenkilo(kanta):
+      id: str
+      nimi: str
+      sahkopostiosoite: str
+      tila: str
+      pisteet: str
+      lisatiedot: Optional[str] = None
+      osoite: XmlOsoite
+
+    return XmlHenkilo
+    # def _xml_sanomat -> type
+
+  XmlHenkilo = _xml_sanomat(XmlSanoma)
+  VanhaXmlHenkilo = _xml_sanomat(VanhaXmlSanoma)
+
+  # Suuri, paikallisesti jäsennetty dokumentti.
+  dokumentti = etree.fromstring((
+    '<tietueet>'
+    + ''.join(xml_tietue(i) for i in range(10000))
+    + '</tietueet>'
+  ).encode())
+  assert [
+    asdict(XmlHenkilo.saapuva(alkio)) for alkio in dokumentti[:100]
+  ] == [
+    asdict(VanhaXmlHenkilo.saapuva(alkio)) for alkio in dokumentti[:100]
+  ]
+  for nimi, sanoma in (
+    ('XmlSanoma.saapuva (vanha)', VanhaXmlHenkilo),
+    ('XmlSanoma.saapuva', XmlHenkilo),
+  ):
+    mittari.synkroninen(
+      'xml',
+      f'{nimi}, 10000 tietuetta',
+      lambda: [sanoma.saapuva(alkio) for alkio in dokumentti],
+      operaatioita=len(dokumentti),
+      tietueita=len(dokumentti),
+    )
+    # for nimi, sanoma in
+  sanomat = [XmlHenkilo.saapuva(alkio) for alkio in dokumentti]
+
+  @dataclass(kw_only=True)
+  class XmlRyhma(XmlSanoma):
+    nimi: Optional[str] = None
+    tunnisteet: Optional[list[str]] = None
+    jasenet: list[XmlHenkilo] = field(default_factory=list)
+    vetaja: Optional[XmlHenkilo] = None
+
+  # `saapuva(lahteva())` palauttaa alkuperäisen sanoman.
+  for sanoma in (
+    *sanomat[:100],
+    XmlRyhma(),
+    XmlRyhma(nimi='a', tunnisteet=[], vetaja=sanomat[0]),
+    XmlRyhma(tunnisteet=['x', 'y'], jasenet=sanomat[:3]),
+  ):
+    assert type(sanoma).saapuva(sanoma.lahteva()) == sanoma, sanoma
+  for nimi, rutiini in (
+    ('XmlSanoma.lahteva', lambda: [
+      etree.tostring(sanoma.lahteva()) for sanoma in sanomat
+    ]),
+    ('XmlSanoma.lahteva_virta', lambda: b''.join(
+      XmlSanoma.lahteva_virta(sanomat)
+    )),
+  ):
+    mittari.synkroninen(
+      'xml',
+      f'{nimi}, 10000 tietuetta',
+      rutiini,
+      operaatioita=len(sanomat),
+      tietueita=len(sanomat),
+    )
+    # for nimi, rutiini in
+
+  params = {'koko': 1000, 'viive': asetukset.viive}
+  async with XmlYhteys(palvelin=asetukset.palvelin) as yhteys:
+    juuri = await yhteys.nouda_data('/xml/', params=params)
+    assert isinstance(juuri, etree._Element)
+    for rinnakkain in asetukset.rinnakkain:
+      await mittari.rinnakkainen(
+        'xml',
+        'nouda_data (1000 tietuetta)',
+        lambda: yhteys.nouda_data('/xml/', params=params),
+        kutsuja=max(1, asetukset.kutsuja // 4),
+        rinnakkain=rinnakkain,
+        **params,
+      )
+    # async with XmlYhteys
+  async with XmlYhteys(
+    palvelin=asetukset.palvelin,
+    virtautus=True,
+  ) as yhteys:
+
+    async def _virtaavasti():
+      return [
+        sanoma async for sanoma in XmlHenkilo.saapuva_virta(
+          yhteys.tuota_data('/xml/', params=params)
+        )
+      ]
+
+    await mittari.rinnakkainen(
+      'xml',
+      'tuota_data + saapuva_virta, virtautus',
+      _virtaavasti,
+      kutsuja=max(1, asetukset.kutsuja // 4),
+      operaatioita=params['koko'],
+      **params,
+    )
+    # async with XmlYhteys
+  # async def xml
+
+
+async def lisaa(mittari: Mittari, asetukset: Asetukset):
+  ''' `Rajapinta.lisaa` eri rinnakkaisuuksilla. '''
+  class ViiveellisetHenkilot(Henkilot):
+    class Meta(Henkilot.Meta):
+      rajapinta = f'/json/?viive={asetukset.viive}'
+
+  henkilo = Henkilo.saapuva(tietue(1))
+  async with JsonYhteys(palvelin=asetukset.palvelin) as yhteys:
+    rajapinta = ViiveellisetHenkilot(yhteys)
+    for rinnakkain in asetukset.rinnakkain:
+      await mittari.rinnakkainen(
+        'lisaa',
+        'Rajapinta.lisaa',
+        lambda: rajapinta.lisaa(henkilo),
+        kutsuja=asetukset.kutsuja,
+        rinnakkain=rinnakkain,
+        viive=asetukset.viive,
+      )
+    # async with JsonYhteys
+  # async def lisaa
+
+
+# Osiot suoritusjärjestyksessä.
+OSIOT: dict[str, Callable[[Mittari, Asetukset], Awaitable[Any]]] = {
+  'sanoma': sanoma,
+  'json': json_kirjastot,
+  'periyta': periytys,
+  'nouda': nouda,
+  'sivutus': sivutus,
+  'xml': xml,
+  'lisaa': lisaa,
+}
@@ -0,0 +1,250 @@
+import asyncio
+from dataclasses import dataclass, field
+import functools
+import json
+from typing import Any, Optional
+
+from aiohttp import web
+
+
+def tietue(indeksi: int) -> dict[str, Any]:
+  ''' Muodosta mittauksissa käytettävä, REST-muotoinen tietue. '''
+  return {
+    'id': indeksi,
+    'nimi': f'Henkilö {indeksi}',
+    'sahkopostiosoite': f'henkilo{indeksi}@testi.fi',
+    'tila': ('aktiivinen', 'passiivinen')[indeksi % 2],
+    'pisteet': indeksi * 1.5,
+    'lisatiedot': None if indeksi % 3 else f'Lisätieto {indeksi}',
+    'osoitteet': [
+      {
+        'katuosoite': f'Testikatu {indeksi + osoite}',
+        'postinumero': f'{33100 + osoite:05d}',
+        'kaupunki': 'Tampere',
+      }
+      for osoite in range(2)
+    ],
+  }
+  # def tietue -> dict[str, Any]
+
+
+def xml_tietue(indeksi: int) -> str:
+  ''' Muodosta mittauksissa käytettävä, XML-muotoinen tietue. '''
+  data = tietue(indeksi)
+  return (
+    '<tietue>'
+    + ''.join(
+      f'<{avain}>{arvo}</{avain}>'
+      for avain, arvo in data.items()
+      if avain != 'osoitteet' and arvo is not None
+    )
+    + '<osoite>'
+    + ''.join(
+      f'<{avain}>{arvo}</{avain}>'
+      for avain, arvo in data['osoitteet'][0].items()
+    )
+    + '</osoite>'
+    + '</tietue>'
+  )
+  # def xml_tietue -> str
+
+
+@dataclass(kw_only=True)
+class Vastinpalvelin:
+  '''
+  Paikallinen, REST-rajapintaa jäljittelevä aiohttp-palvelin.
+
+  Polut:
+  - GET `/json/?koko=N`: N tietueen JSON-luettelo;
+  - GET `/xml/?koko=N`: N tietueen XML-dokumentti;
+  - GET `/linkit/?page=N`: DRF-tyyppinen sivutus (`next`-linkit);
+  - GET `/sivut/?page=N`: sivunumeroihin perustuva sivutus;
+  - GET `/avaimet/?id__gt=N&limit=M`: avainjoukkoon perustuva sivutus
+    (pelkkä tulosten luettelo);
+  - POST `/json/`: palauttaa lähetetyn tietueen `id`-kentällä
+    täydennettynä.
+
+  Kunkin vastauksen viivettä voidaan säätää parametrilla `viive`
+  (sekunteja); oletuksena käytetään palvelimen `viive`-asetusta.
+
+  Vastaukset muodostetaan valmiiksi sarjallistetuista tavuista, jotta
+  samassa prosessissa ajettava palvelin kuormittaisi mittauksia
+  mahdollisimman vähän. Palvelin voidaan ajaa myös erikseen:
+  `python -m benchmark.palvelin --portti 8080`.
+
+  Käyttö seuraavasti:
+  >>> async with Vastinpalvelin(viive=0.01) as palvelin:
+  ...   async with JsonYhteys(palvelin=palvelin.osoite) as yhteys:
+  ...     await yhteys.nouda_data('/json/', params={'koko': 10})
+  '''
+
+  # Sivutettujen tietueiden kokonaismäärä ja sivun koko.
+  tietueita: int = 1000
+  sivukoko: int = 100
+
+  # Vastausten oletusviive sekunteina.
+  viive: float = 0.0
+
+  # Kuunneltava portti (0 = vapaa portti).
+  portti: int = 0
+
+  # Palvelimen osoite; asetetaan käynnistettäessä.
+  osoite: Optional[str] = field(default=None, init=False)
+
+  # Käsiteltyjen pyyntöjen määrä.
+  pyyntoja: int = field(default=0, init=False)
+
+  def __post_init__(self):
+    # pylint: disable=attribute-defined-outside-init
+    self._sovellus = web.Application()
+    self._sovellus.router.add_get('/json/', self._json)
+    self._sovellus.router.add_post('/json/', self._lisaa)
+    self._sovellus.router.add_get('/xml/', self._xml)
+    self._sovellus.router.add_get('/linkit/', self._linkit)
+    self._sovellus.router.add_get('/sivut/', self._sivut)
+    self._sovellus.router.add_get('/avaimet/', self._avaimet)
+    self._kaynnistin = web.AppRunner(self._sovellus, access_log=None)
+    self._sivut_valmiina: dict[int, bytes] = {}
+    # def __post_init__
+
+  async def __aenter__(self):
+    await self._kaynnistin.setup()
+    await web.TCPSite(self._kaynnistin, '127.0.0.1', self.portti).start()
+    osoite, portti = self._kaynnistin.addresses[0][:2]
+    self.osoite = f'http://{osoite}:{portti}'
+    return self
+    # async def __aenter__
+
+  async def __aexit__(self, *exc_info):
+    await self._kaynnistin.cleanup()
+    # async def __aexit__
+
+  async def _odota(self, pyynto: web.Request):
+    self.pyyntoja += 1
+    if viive := float(pyynto.query.get('viive', self.viive)):
+      await asyncio.sleep(viive)
+    # async def _odota
+
+  @staticmethod
+  @functools.cache
+  def _json_luettelo(koko: int) -> bytes:
+    return json.dumps([tietue(i) for i in range(koko)]).encode()
+
+  @staticmethod
+  @functools.cache
+  def _xml_luettelo(koko: int) -> bytes:
+    return (
+      '<?xml version="1.0" encoding="utf-8"?><tietueet>'
+      + ''.join(xml_tietue(i) for i in range(koko))
+      + '</tietueet>'
+    ).encode()
+    # def _xml_luettelo -> bytes
+
+  async def _json(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    return web.Response(
+      body=self._json_luettelo(int(pyynto.query.get('koko', 100))),
+      content_type='application/json',
+    )
+    # async def _json -> web.Response
+
+  async def _xml(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    return web.Response(
+      body=self._xml_luettelo(int(pyynto.query.get('koko', 100))),
+      content_type='application/xml',
+    )
+    # async def _xml -> web.Response
+
+  async def _lisaa(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    return web.json_response(
+      {**await pyynto.json(), 'id': self.pyyntoja},
+      status=201,
+    )
+    # async def _lisaa -> web.Response
+
+  def _sivu(self, sivu: int) -> bytes:
+    ''' Sivun tulokset sarjallistettuna JSON-luettelona. '''
+    try:
+      return self._sivut_valmiina[sivu]
+    except KeyError:
+      pass
+    tulokset = self._sivut_valmiina[sivu] = json.dumps([
+      tietue(i)
+      for i in range(
+        (sivu - 1) * self.sivukoko,
+        min(sivu * self.sivukoko, self.tietueita),
+      )
+    ]).encode()
+    return tulokset
+    # def _sivu -> bytes
+
+  def _sivutettu(self, sivu: int, **muut) -> web.Response:
+    return web.Response(
+      body=b''.join((
+        json.dumps(muut).encode()[:-1],
+        b', "results": ',
+        self._sivu(sivu),
+        b'}',
+      )),
+      content_type='application/json',
+    )
+    # def _sivutettu -> web.Response
+
+  async def _linkit(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    sivu = int(pyynto.query.get('page', 1))
+    return self._sivutettu(
+      sivu,
+      count=self.tietueita,
+      next=(
+        str(pyynto.url.update_query(page=sivu + 1))
+        if sivu * self.sivukoko < self.tietueita
+        else None
+      ),
+      previous=None,
+    )
+    # async def _linkit -> web.Response
+
+  async def _sivut(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    return self._sivutettu(
+      int(pyynto.query.get('page', 1)),
+      count=self.tietueita,
+    )
+    # async def _sivut -> web.Response
+
+  async def _avaimet(self, pyynto: web.Request) -> web.Response:
+    await self._odota(pyynto)
+    alku = int(pyynto.query.get('id__gt', -1)) + 1
+    loppu = alku + int(pyynto.query.get('limit', self.sivukoko))
+    return web.Response(
+      body=json.dumps([
+        tietue(i) for i in range(alku, min(loppu, self.tietueita))
+      ]).encode(),
+      content_type='application/json',
+    )
+    # async def _avaimet -> web.Response
+
+  # class Vastinpalvelin
+
+
+async def _palvele(**asetukset):
+  async with Vastinpalvelin(**asetukset) as palvelin:
+    print('Vastinpalvelin:', palvelin.osoite)
+    await asyncio.Event().wait()
+  # async def _palvele
+
+
+if __name__ == '__main__':
+  import argparse
+  jasennin = argparse.ArgumentParser(description=Vastinpalvelin.__doc__)
+  jasennin.add_argument('--portti', type=int, default=8080)
+  jasennin.add_argument('--viive', type=float, default=0.0)
+  jasennin.add_argument('--tietueita', type=int, default=1000)
+  jasennin.add_argument('--sivukoko', type=int, default=100)
+  try:
+    asyncio.run(_palvele(**vars(jasennin.parse_args())))
+  except KeyboardInterrupt:
+    pass
@@ -0,0 +1,200 @@
+'''
+Yhteiset testiapuvälineet.
+
+Asynkroniset testit ajetaan omassa tapahtumasilmukassaan
+(`pytest_pyfunc_call`), joten erillistä pytest-liitännäistä ei tarvita.
+'''
+
+import asyncio
+from dataclasses import dataclass, field
+import inspect
+import json
+from typing import Any, Optional, Union
+
+from aiohttp import web
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+  ''' Aja `async def`-testi `asyncio.run`-kutsulla. '''
+  if not inspect.iscoroutinefunction(pyfuncitem.obj):
+    return None
+  parametrit = {
+    nimi: pyfuncitem.funcargs[nimi]
+    for nimi in pyfuncitem._fixtureinfo.argnames
+  }
+  asyncio.run(pyfuncitem.obj(**parametrit))
+  return True
+  # def pytest_pyfunc_call
+
+
+def tietue(indeksi: int) -> dict[str, Any]:
+  ''' Testeissä käytettävä, REST-muotoinen tietue. '''
+  return {'id': indeksi, 'nimi': f'Tietue {indeksi}', 'muokattu': indeksi}
+
+
+@dataclass(kw_only=True)
+class Testipalvelin:
+  '''
+  Paikallinen, muistissa olevia tietueita tarjoava REST-palvelin.
+
+  Polut:
+  - GET `/tietueet/`: tietueet luettelona;
+  - GET `/sivutetut/?page=N`: DRF-tyyppinen sivutus (`next`-linkit);
+  - GET, PATCH, DELETE `/tietueet/<pk>/`: yksittäinen tietue.
+
+  Luetteloita voidaan suodattaa parametreilla `id__in` (pilkuin
+  eroteltu luettelo) ja `muokattu__gte`.
+
+  Seuraaville pyynnöille voidaan asettaa virheitä `viat`-luetteloon:
+  HTTP-statuskoodi (kokonaisluku), `(statuskoodi, otsakkeet)`-pari tai
+  `'katkaise'`, jolloin luettelosta lähetetään vain alku ja yhteys
+  katkaistaan. Mikäli `pidata` on asetettu, GET-pyynnöt odottavat
+  sen asettamista ennen vastaamista.
+  '''
+
+  tietueet: dict[int, dict[str, Any]] = field(
+    default_factory=lambda: {i: tietue(i) for i in range(1, 11)}
+  )
+  sivukoko: int = 3
+
+  # Seuraaville pyynnöille aiheutettavat virheet.
+  viat: list[Union[int, tuple[int, dict], str]] = field(default_factory=list)
+
+  # GET-pyyntöjen vastaamista pidättävä tapahtuma.
+  pidata: Optional[asyncio.Event] = None
+
+  # Vastaanotetut pyynnöt muodossa `(metodi, polku, parametrit)`.
+  pyynnot: list[tuple[str, str, dict]] = field(
+    default_factory=list,
+    init=False,
+  )
+
+  osoite: Optional[str] = field(default=None, init=False)
+
+  async def __aenter__(self):
+    # pylint: disable=attribute-defined-outside-init
+    sovellus = web.Application()
+    sovellus.router.add_get('/tietueet/', self._luettelo)
+    sovellus.router.add_get('/sivutetut/', self._sivutettu)
+    sovellus.router.add_get('/tietueet/{pk}/', self._tietue)
+    sovellus.router.add_patch('/tietueet/{pk}/', self._muuta)
+    sovellus.router.add_delete('/tietueet/{pk}/', self._tuhoa)
+    self._kaynnistin = web.AppRunner(sovellus, access_log=None)
+    await self._kaynnistin.setup()
+    await web.TCPSite(self._kaynnistin, '127.0.0.1', 0).start()
+    osoite, portti = self._kaynnistin.addresses[0][:2]
+    self.osoite = f'http://{osoite}:{portti}'
+    return self
+    # async def __aenter__
+
+  async def __aexit__(self, *exc_info):
+    await self._kaynnistin.cleanup()
+
+  def pyyntoja(self, metodi: str = 'GET') -> int:
+    return sum(1 for pyynto in self.pyynnot if pyynto[0] == metodi)
+
+  async def _vastaanota(
+    self,
+    pyynto: web.Request,
+  ) -> Union[web.Response, str, None]:
+    '''
+    Kirjaa pyyntö ja palauta mahdollinen virhevastaus tai `'katkaise'`,
+    mikäli vastaus on katkaistava kesken.
+    '''
+    self.pyynnot.append((pyynto.method, pyynto.path, dict(pyynto.query)))
+    if pyynto.method == 'GET' and self.pidata is not None:
+      await self.pidata.wait()
+    if not self.viat:
+      return None
+    vika = self.viat.pop(0)
+    if vika == 'katkaise':
+      return vika
+    status, otsakkeet = vika if isinstance(vika, tuple) else (vika, {})
+    return web.json_response({}, status=status, headers=otsakkeet)
+    # async def _vastaanota -> Union[web.Response, str, None]
+
+  def _suodata(self, pyynto: web.Request) -> list[dict[str, Any]]:
+    tietueet = list(self.tietueet.values())
+    if (pkt := pyynto.query.get('id__in')) is not None:
+      pkt = {int(pk) for pk in pkt.split(',')}
+      tietueet = [t for t in tietueet if t['id'] in pkt]
+    if (alkaen := pyynto.query.get('muokattu__gte')) is not None:
+      tietueet = [t for t in tietueet if t['muokattu'] >= int(alkaen)]
+    return tietueet
+    # def _suodata -> list
+
+  async def _katkaise(
+    self,
+    pyynto: web.Request,
+    data: bytes,
+  ) -> web.StreamResponse:
+    ''' Lähetä vastauksesta alkuosa ja katkaise yhteys. '''
+    vastaus = web.StreamResponse(headers={
+      'Content-Type': 'application/json',
+      'Content-Length': str(len(data)),
+    })
+    await vastaus.prepare(pyynto)
+    await vastaus.write(data[:len(data) // 2])
+    await asyncio.sleep(0.05)
+    pyynto.transport.close()
+    return vastaus
+    # async def _katkaise -> web.StreamResponse
+
+  async def _luettelo(self, pyynto: web.Request) -> web.StreamResponse:
+    if isinstance(vika := await self._vastaanota(pyynto), web.Response):
+      return vika
+    data = json.dumps(self._suodata(pyynto)).encode()
+    if vika == 'katkaise':
+      return await self._katkaise(pyynto, data)
+    return web.Response(body=data, content_type='application/json')
+    # async def _luettelo -> web.StreamResponse
+
+  async def _sivutettu(self, pyynto: web.Request) -> web.Response:
+    if isinstance(vika := await self._vastaanota(pyynto), web.Response):
+      return vika
+    tietueet = self._suodata(pyynto)
+    sivu = int(pyynto.query.get('page', 1))
+    return web.json_response({
+      'count': len(tietueet),
+      'next': (
+        str(pyynto.url.update_query(page=sivu + 1))
+        if sivu * self.sivukoko < len(tietueet)
+        else None
+      ),
+      'previous': None,
+      'results': tietueet[(sivu - 1) * self.sivukoko:sivu * self.sivukoko],
+    })
+    # async def _sivutettu -> web.Response
+
+  async def _tietue(self, pyynto: web.Request) -> web.Response:
+    if isinstance(vika := await self._vastaanota(pyynto), web.Response):
+      return vika
+    try:
+      return web.json_response(self.tietueet[int(pyynto.match_info['pk'])])
+    except KeyError:
+      raise web.HTTPNotFound() from None
+    # async def _tietue -> web.Response
+
+  async def _muuta(self, pyynto: web.Request) -> web.Response:
+    if isinstance(vika := await self._vastaanota(pyynto), web.Response):
+      return vika
+    tietue_ = self.tietueet[int(pyynto.match_info['pk'])]
+    tietue_.update(await pyynto.json())
+    return web.json_response(tietue_)
+    # async def _muuta -> web.Response
+
+  async def _tuhoa(self, pyynto: web.Request) -> web.Response:
+    if isinstance(vika := await self._vastaanota(pyynto), web.Response):
+      return vika
+    return web.json_response(self.tietueet.pop(int(pyynto.match_info['pk'])))
+    # async def _tuhoa -> web.Response
+
+  # class Testipalvelin
+
+
+@pytest.fixture
+def palvelin() -> Testipalvelin:
+  ''' Käynnistämätön testipalvelin; käytä `async with palvelin:`. '''
+  return Testipalvelin()
@@ -0,0 +1,97 @@
+import asyncio
+from dataclasses import dataclass
+
+from aresti import JsonYhteys, RestSanoma, RestYhteys, SivutettuYhteys
+from aresti.rajapinta.tyokalut import (
+  LuettelomuotoinenRajapinta,
+  SuodatettuRajapinta,
+)
+
+
+@dataclass(kw_only=True)
+class Tietue(RestSanoma):
+  id: int
+  nimi: str
+  muokattu: int
+
+
+@dataclass(kw_only=True)
+class Suodatus(RestSanoma):
+  ''' Suodatus ilman `id__in`-kenttää. '''
+  nimi: str = None
+
+
+class Yhteys(RestYhteys, JsonYhteys):
+  class Tietueet(LuettelomuotoinenRajapinta, RestYhteys.Rajapinta):
+    Tuloste = Tietue
+    Suodatus = Suodatus
+
+    class Meta:
+      rajapinta = '/tietueet/'
+      rajapinta_pk = '/tietueet/%(pk)s/'
+      pk = 'id'
+      pk_joukko_parametri = 'id__in'
+      pk_joukko_pituus = 6
+
+
+class Sivutettu(SivutettuYhteys, JsonYhteys):
+  seuraava_sivu_avain = 'next'
+  tulokset_avain = 'results'
+
+  class Tietueet(SuodatettuRajapinta, SivutettuYhteys.Rajapinta):
+    Tuloste = Tietue
+    Suodatus = Suodatus
+
+    class Meta(SivutettuYhteys.Rajapinta.Meta):
+      rajapinta = '/sivutetut/'
+      pk_joukko_parametri = 'id__in'
+
+
+async def test_suodatus_ohitetaan(palvelin):
+  ''' Joukkoparametri ohittaa `Suodatus`-luokan, jossa sitä ei ole. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    tulokset = await yhteys.tietueet.nouda_monta([1, 2, '3', 2, 99])
+  assert {pk: t and t.nimi for pk, t in tulokset.items()} == {
+    1: 'Tietue 1', 2: 'Tietue 2', '3': 'Tietue 3', 99: None,
+  }
+  # Enintään 6 merkkiä parametria kohti: 1,2,3 ja 99.
+  assert palvelin.pyynnot == [
+    ('GET', '/tietueet/', {'id__in': '1,2,3'}),
+    ('GET', '/tietueet/', {'id__in': '99'}),
+  ]
+
+
+async def test_sivutettu_joukkohaku(palvelin):
+  ''' Sivutettu yhteys noutaa kaikki suodatetut sivut. '''
+  pkt = [1, 2, 3, 4, 5, 6, 7]
+  async with palvelin, Sivutettu(palvelin=palvelin.osoite) as yhteys:
+    tulokset = await yhteys.tietueet.nouda_monta(pkt)
+  assert [tulokset[pk].id for pk in pkt] == pkt
+  assert palvelin.pyyntoja() == 3
+
+
+async def test_kootusti(palvelin):
+  ''' Samanaikaiset haut kootaan yhdeksi pyynnöksi. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    tulokset = await asyncio.gather(*(
+      yhteys.tietueet.nouda_kootusti(pk) for pk in (1, 2, 1, 42)
+    ))
+    assert [t and t.id for t in tulokset] == [1, 2, 1, None]
+    assert palvelin.pyynnot == [('GET', '/tietueet/', {'id__in': '1,2,42'})]
+    assert not yhteys.tietueet._kokoajat
+    assert not yhteys.tietueet._kootut
+
+
+async def test_kootusti_virhe(palvelin):
+  ''' Epäonnistuneen pyynnön poikkeus välitetään kaikille odottajille. '''
+  palvelin.viat.append(500)
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    tulokset = await asyncio.gather(
+      yhteys.tietueet.nouda_kootusti(1),
+      yhteys.tietueet.nouda_kootusti(2),
+      return_exceptions=True,
+    )
+    assert all(isinstance(t, Yhteys.Poikkeus) for t in tulokset)
+    # Seuraava kokoaminen alkaa puhtaalta pöydältä.
+    assert (await yhteys.tietueet.nouda_kootusti(3)).id == 3
+    assert not yhteys.tietueet._kokoajat
@@ -0,0 +1,70 @@
+import pytest
+
+from aresti import JsonYhteys, MuistiTarkistuspisteet, SivutettuYhteys
+
+
+class Yhteys(SivutettuYhteys, JsonYhteys):
+  seuraava_sivu_avain = 'next'
+  tulokset_avain = 'results'
+
+
+async def test_sivut(palvelin):
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    alkiot = [
+      alkio['id']
+      async for alkio in yhteys.tuota_sivutettu_data('/sivutetut/')
+    ]
+  assert alkiot == list(range(1, 11))
+  assert palvelin.pyyntoja() == 4
+
+
+async def test_jatketaan_tarkistuspisteesta(palvelin):
+  ''' Keskeytynyt haku jatkuu ensimmäiseltä käsittelemättömältä sivulta. '''
+  pisteet = MuistiTarkistuspisteet()
+  params = {'muokattu__gte': '2'}
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    kasitellyt = []
+    with pytest.raises(RuntimeError):
+      async for alkio in yhteys.tuota_sivutettu_data(
+        '/sivutetut/', params=params, tarkistuspisteet=pisteet,
+      ):
+        if alkio['id'] == 6:
+          raise RuntimeError
+        kasitellyt.append(alkio['id'])
+    assert kasitellyt == [2, 3, 4, 5]
+    sijainti = pisteet.pisteet['/sivutetut/?muokattu__gte=2']
+    assert sijainti['sivu'] == 2
+    assert sijainti['haku'] == '/sivutetut/?muokattu__gte=2'
+
+    pyyntoja = palvelin.pyyntoja()
+    jatko = [
+      alkio['id']
+      async for alkio in yhteys.tuota_sivutettu_data(
+        '/sivutetut/', params=params, tarkistuspisteet=pisteet,
+      )
+    ]
+  # Kesken jäänyt sivu käsitellään uudelleen; ensimmäistä ei noudeta.
+  assert jatko == [5, 6, 7, 8, 9, 10]
+  assert palvelin.pyynnot[pyyntoja][2] == {'muokattu__gte': '2', 'page': '2'}
+  assert palvelin.pyyntoja() - pyyntoja == 2
+  # Päättynyt haku poistaa sijaintinsa.
+  assert pisteet.pisteet == {}
+
+
+async def test_eri_haun_sijainti(palvelin):
+  ''' Toiselle haulle tallennettua sijaintia ei käytetä. '''
+  pisteet = MuistiTarkistuspisteet(pisteet={'oma': {
+    'haku': '/sivutetut/?muokattu__gte=5',
+    'osoite': 'http://esim.fi/sivutetut/',
+    'params': {'page': '2'},
+    'sivu': 2,
+  }})
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    with pytest.raises(ValueError):
+      async for _ in yhteys.tuota_sivutettu_data(
+        '/sivutetut/',
+        tarkistuspisteet=pisteet,
+        tarkistuspiste_avain='oma',
+      ):
+        pass
+  assert palvelin.pyyntoja() == 0
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+
+import pytest
+
+from aresti import (
+  JsonYhteys,
+  MuistiTarkistuspisteet,
+  RestSanoma,
+  RestYhteys,
+  SqliteTarkistuspisteet,
+  TiedostoTarkistuspisteet,
+)
+
+
+@dataclass(kw_only=True)
+class Tietue(RestSanoma):
+  id: int
+  nimi: str
+  muokattu: int
+
+
+class Yhteys(RestYhteys, JsonYhteys):
+  class Tietueet(RestYhteys.Rajapinta):
+    Tuloste = Tietue
+
+    class Meta(RestYhteys.Rajapinta.Meta):
+      rajapinta = '/tietueet/'
+      muutos_kentta = 'muokattu'
+      muutos_parametri = 'muokattu__gte'
+
+
+async def test_synkronointi(palvelin):
+  ''' Toinen synkronointi noutaa vain tarkistuspisteen jälkeiset muutokset. '''
+  pisteet = MuistiTarkistuspisteet()
+  kohde = {}
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    assert await yhteys.tietueet.synkronoi(
+      kohde, tarkistuspisteet=pisteet
+    ) == 10
+    assert pisteet.pisteet == {'/tietueet/': 10}
+
+    palvelin.tietueet[3].update(nimi='Muutettu', muokattu=11)
+    palvelin.tietueet[11] = {'id': 11, 'nimi': 'Uusi', 'muokattu': 12}
+    assert await yhteys.tietueet.synkronoi(
+      kohde, tarkistuspisteet=pisteet
+    ) == 3
+  assert palvelin.pyynnot[-1][2] == {'muokattu__gte': '10'}
+  assert pisteet.pisteet == {'/tietueet/': 12}
+  assert len(kohde) == 11 and kohde[3].nimi == 'Muutettu'
+
+
+async def test_keskeytynyt_synkronointi(palvelin):
+  ''' Tarkistuspistettä ei siirretä, mikäli synkronointi keskeytyy. '''
+  pisteet = MuistiTarkistuspisteet(pisteet={'/tietueet/': 4})
+  viedyt = []
+
+  async def vie(tietue: Tietue):
+    if tietue.id == 8:
+      raise RuntimeError
+    viedyt.append(tietue.id)
+
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    with pytest.raises(RuntimeError):
+      await yhteys.tietueet.synkronoi(vie, tarkistuspisteet=pisteet)
+    assert pisteet.pisteet == {'/tietueet/': 4}
+    assert viedyt == [4, 5, 6, 7]
+    viedyt.clear()
+    assert await yhteys.tietueet.synkronoi(
+      viedyt.append, tarkistuspisteet=pisteet
+    ) == 7
+  assert [t.id for t in viedyt] == [4, 5, 6, 7, 8, 9, 10]
+  assert pisteet.pisteet == {'/tietueet/': 10}
+
+
+async def test_avain_hakuehdoista(palvelin):
+  pisteet = MuistiTarkistuspisteet()
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    await yhteys.tietueet.synkronoi({}, tarkistuspisteet=pisteet, nimi='x')
+    await yhteys.tietueet.synkronoi(
+      {}, tarkistuspisteet=pisteet, avain='oma',
+    )
+  # Testipalvelin ei suodata nimen mukaan.
+  assert pisteet.pisteet == {'/tietueet/?nimi=x': 10, 'oma': 10}
+
+
+async def test_maaritykset_puuttuvat(palvelin):
+  class Maarittelematon(RestYhteys, JsonYhteys):
+    class Tietueet(RestYhteys.Rajapinta):
+      Tuloste = Tietue
+
+      class Meta:
+        rajapinta = '/tietueet/'
+
+  async with palvelin, Maarittelematon(palvelin=palvelin.osoite) as yhteys:
+    with pytest.raises(ValueError):
+      await yhteys.tietueet.synkronoi(
+        {}, tarkistuspisteet=MuistiTarkistuspisteet(),
+      )
+
+
+@pytest.mark.parametrize('varasto', ['tiedosto', 'sqlite'])
+async def test_pysyvat_tarkistuspisteet(varasto, tmp_path):
+  if varasto == 'tiedosto':
+    pisteet = TiedostoTarkistuspisteet(polku=tmp_path / 'pisteet.json')
+  else:
+    pisteet = SqliteTarkistuspisteet(polku=tmp_path / 'pisteet.sqlite')
+  assert await pisteet.lue('a') is None
+  await pisteet.tallenna('a', {'sivu': 2, 'params': {'x': '1'}})
+  await pisteet.tallenna('b', 5)
+  assert await pisteet.lue('a') == {'sivu': 2, 'params': {'x': '1'}}
+  await pisteet.poista('a')
+  await pisteet.poista('a')
+  assert await pisteet.lue('a') is None
+  assert await pisteet.lue('b') == 5
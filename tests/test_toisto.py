@@ -0,0 +1,95 @@
+import pytest
+
+from aresti import JsonYhteys, Toistokaytanto
+
+
+def _toisto(**kwargs) -> Toistokaytanto:
+  return Toistokaytanto(odotus=0.01, satunnaisuus=0, **kwargs)
+
+
+async def test_toistetaan(palvelin):
+  ''' Epäonnistunut GET-pyyntö yritetään uudelleen. '''
+  palvelin.viat.extend([503, (429, {'Retry-After': '0'})])
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    toisto=_toisto(),
+  ) as yhteys:
+    data = await yhteys.nouda_data('/tietueet/')
+  assert len(data) == 10
+  assert palvelin.pyyntoja() == 3
+
+
+async def test_yritykset_loppuvat(palvelin):
+  palvelin.viat.extend([503] * 3)
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    toisto=_toisto(yrityksia=2),
+  ) as yhteys:
+    with pytest.raises(JsonYhteys.Poikkeus) as poikkeus:
+      await yhteys.nouda_data('/tietueet/')
+  assert poikkeus.value.status == 503
+  assert palvelin.pyyntoja() == 3
+
+
+async def test_retry_after_liian_pitka(palvelin):
+  ''' Sallittua pidempää `Retry-After`-aikaa ei jäädä odottamaan. '''
+  palvelin.viat.append((503, {'Retry-After': '3600'}))
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    toisto=_toisto(),
+  ) as yhteys:
+    with pytest.raises(JsonYhteys.Poikkeus):
+      await yhteys.nouda_data('/tietueet/')
+  assert palvelin.pyyntoja() == 1
+
+
+async def test_ei_toisteta_muita_statuksia(palvelin):
+  palvelin.viat.append(404)
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    toisto=_toisto(),
+  ) as yhteys:
+    with pytest.raises(JsonYhteys.Poikkeus):
+      await yhteys.nouda_data('/tietueet/')
+  assert palvelin.pyyntoja() == 1
+
+
+async def test_ei_toisteta_metodia(palvelin):
+  ''' PATCH-pyyntöä ei oletuksena yritetä uudelleen. '''
+  palvelin.viat.append(503)
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    toisto=_toisto(),
+  ) as yhteys:
+    with pytest.raises(JsonYhteys.Poikkeus):
+      await yhteys.muuta_data('/tietueet/1/', {'nimi': 'Uusi'})
+  assert palvelin.pyyntoja('PATCH') == 1
+
+
+async def test_virta_jatkuu(palvelin):
+  ''' Keskeytynyt virta jatkuu tuottamatta samoja alkioita uudelleen. '''
+  palvelin.viat.append('katkaise')
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    virtautus=True,
+    toisto=_toisto(),
+  ) as yhteys:
+    alkiot = [
+      alkio['id'] async for alkio in yhteys.tuota_data('/tietueet/')
+    ]
+  assert alkiot == list(range(1, 11))
+  assert palvelin.pyyntoja() == 2
+
+
+async def test_virta_ilman_toistoa(palvelin):
+  palvelin.viat.append('katkaise')
+  async with palvelin, JsonYhteys(
+    palvelin=palvelin.osoite,
+    virtautus=True,
+  ) as yhteys:
+    alkiot = []
+    with pytest.raises(JsonYhteys.Poikkeus):
+      async for alkio in yhteys.tuota_data('/tietueet/'):
+        alkiot.append(alkio['id'])
+  # Katkeamista edeltävät alkiot ehdittiin tuottaa.
+  assert alkiot and alkiot == list(range(1, len(alkiot) + 1))
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+
+from aresti import ei_syotetty, JsonYhteys, RestSanoma, RestYhteys
+
+
+@dataclass(kw_only=True)
+class Tietue(RestSanoma):
+  id: int
+  nimi: str
+  muokattu: int
+
+
+@dataclass(kw_only=True)
+class Paivitys(RestSanoma):
+  nimi: str
+
+
+class Yhteys(RestYhteys, JsonYhteys):
+  class Tietueet(RestYhteys.Rajapinta):
+    Tuloste = Tietue
+    Paivitys = Paivitys
+
+    class Meta(RestYhteys.Rajapinta.Meta):
+      rajapinta = '/tietueet/'
+      varasto_koko = 100
+
+
+async def test_haku_varastosta(palvelin):
+  ''' Noudettu tietue palautetaan toisella kerralla varastosta. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    eka = await yhteys.tietueet.nouda(pk=1)
+    assert await yhteys.tietueet.nouda(pk=1) is eka
+    # Luettelon tietueet tallennetaan myös.
+    await yhteys.tietueet.nouda()
+    assert (await yhteys.tietueet.nouda(pk=2)).id == 2
+  assert palvelin.pyyntoja() == 2
+
+
+async def test_muuta_poistaa(palvelin):
+  ''' Muutettu tietue poistetaan varastosta eikä vastausta tallenneta. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    await yhteys.tietueet.nouda(pk=1)
+    muutettu = await yhteys.tietueet.muuta(1, nimi='Uusi')
+    assert muutettu.nimi == 'Uusi'
+    assert yhteys.tietueet.varasto.hae(1) is not muutettu
+    assert len(yhteys.tietueet.varasto) == 0
+    palvelin.tietueet[1]['nimi'] = 'Uudempi'
+    assert (await yhteys.tietueet.nouda(pk=1)).nimi == 'Uudempi'
+  assert palvelin.pyyntoja() == 2
+
+
+async def test_muuta_virhe_poistaa(palvelin):
+  ''' Epäonnistunutkin muutos poistaa tietueen varastosta. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    await yhteys.tietueet.nouda(pk=1)
+    palvelin.viat.append(500)
+    try:
+      await yhteys.tietueet.muuta(1, nimi='Uusi')
+    except Yhteys.Poikkeus:
+      pass
+    else:
+      raise AssertionError('Muutoksen olisi pitänyt epäonnistua.')
+    assert len(yhteys.tietueet.varasto) == 0
+
+
+async def test_haku_muutoksen_aikana(palvelin):
+  ''' Muutoksen aikana päättyneen haun tietuetta ei jätetä varastoon. '''
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    alkuperainen = yhteys.muuta_data
+
+    async def muuta_data(*args, **kwargs):
+      # Vanha tietue tulkitaan ennen kuin muutoksen vastaus saapuu.
+      await yhteys.tietueet.nouda()
+      return await alkuperainen(*args, **kwargs)
+
+    yhteys.muuta_data = muuta_data
+    await yhteys.tietueet.muuta(1, nimi='Uusi')
+    assert yhteys.tietueet.varasto.hae(1) is ei_syotetty
+    assert yhteys.tietueet.varasto.hae(2) is not ei_syotetty
+
+
+async def test_tuhoa_poistaa(palvelin):
+  async with palvelin, Yhteys(palvelin=palvelin.osoite) as yhteys:
+    await yhteys.tietueet.nouda(pk=1)
+    await yhteys.tietueet.tuhoa(1)
+    assert len(yhteys.tietueet.varasto) == 0